@@ -0,0 +1,519 @@
+#!/usr/bin/env python3
+"""
+Alignment Daemon
+Long-running localhost service that keeps detectors, calibration and jig
+configs warm, with a thin client CLI
+
+Each align_tool.py run pays for interpreter startup, importing cv2/NumPy/PIL,
+parsing the jig and calibration files and building the detector before it
+does a few milliseconds of real work. The daemon pays that once; clients
+only send small JSON requests over HTTP.
+"""
+
+import inspect
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib import error, request
+
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+
+class AlignmentService:
+    """
+    Warm alignment resources behind align, export and send requests
+
+    One AlignmentCore is kept per (jig config, calibration, options) and
+    shared by all requests; every export gets a fresh AlignmentWorkflow
+    around the shared core, so requests never see each other's state.
+    """
+
+    def __init__(self, jig_config='config/jigs/default.json',
+                 camera_config='config/camera.yml',
+                 output_dir='output',
+                 dpi=300,
+                 undistort_mode='frame',
+                 pyramid=False,
+                 roi_tracking=False,
+                 reuse_stationary=False):
+        """
+        Initialize service
+
+        Args:
+            jig_config: Default jig configuration
+            camera_config: Camera calibration (ignored if missing)
+            output_dir: Default output directory for exports
+            dpi: Default export DPI
+            undistort_mode: 'frame' or 'points' (see ArucoAligner)
+            pyramid: Use coarse-to-fine marker detection
+            roi_tracking: Search around the jig's last known marker positions first
+            reuse_stationary: Reuse the cached homography while the jig is unchanged
+        """
+        # Heavy imports live here so the client side of this module stays light
+        from align_tool import AlignmentWorkflow
+        from aruco_align import AlignmentCore, ArucoAligner
+        from export_cache import ExportCache
+
+        self._workflow_class = AlignmentWorkflow
+        self._core_class = AlignmentCore
+        self._aligner_class = ArucoAligner
+
+        self.jig_config = str(Path(jig_config).resolve())
+        self.camera_config = str(Path(camera_config).resolve()) if Path(camera_config).exists() else None
+        self.output_dir = Path(output_dir).resolve()
+        self.dpi = dpi
+        self.undistort_mode = undistort_mode
+        self.pyramid = pyramid
+        self.roi_tracking = roi_tracking
+        self.reuse_stationary = reuse_stationary
+        self.export_cache = ExportCache(self.output_dir / '.export_cache')
+
+        self._cores = {}
+        self._cores_lock = threading.Lock()
+        # Exports share output files (alignment_data.json, preview.jpg)
+        self._export_lock = threading.Lock()
+
+        self.started_at = time.monotonic()
+        self.requests_served = 0
+
+    def get_core(self, jig_config=None):
+        """
+        Warm AlignmentCore for a jig, loaded on first use
+
+        Args:
+            jig_config: Jig configuration path (None = service default)
+
+        Returns:
+            AlignmentCore
+        """
+        jig_config = str(Path(jig_config).resolve()) if jig_config else self.jig_config
+        key = (jig_config, self.camera_config, self.undistort_mode, self.pyramid)
+
+        with self._cores_lock:
+            core = self._cores.get(key)
+            if core is None:
+                core = self._core_class.from_files(jig_config, self.camera_config,
+                                                   undistort_mode=self.undistort_mode,
+                                                   pyramid=self.pyramid)
+                self._cores[key] = core
+                print(f"✓ Loaded jig {core.jig_config['jig_name']} ({jig_config})")
+
+        return core
+
+    def count_request(self):
+        """Record a served request (handler threads run concurrently)"""
+        with self._cores_lock:
+            self.requests_served += 1
+
+    def status(self):
+        """Daemon status summary"""
+        with self._cores_lock:
+            requests_served = self.requests_served
+            jigs = sorted({key[0] for key in self._cores})
+
+        return {
+            'pid': os.getpid(),
+            'uptime_s': round(time.monotonic() - self.started_at, 1),
+            'requests_served': requests_served,
+            'jigs': jigs,
+            'undistort_mode': self.undistort_mode,
+            'pyramid': self.pyramid,
+            'export_cache': self.export_cache.stats(),
+        }
+
+    def align(self, camera_image, rect=None, jig_config=None):
+        """
+        Detect markers and calculate the homography for a snapshot
+
+        Args:
+            camera_image: Path to camera snapshot
+            rect: Optional (x, y, width, height) design rectangle in mm
+            jig_config: Jig configuration path (None = service default)
+
+        Returns:
+            dict with homography, marker lists and optional design alignment
+        """
+        core = self.get_core(jig_config)
+        aligner = self._aligner_class.from_core(core,
+                                                roi_tracking=self.roi_tracking,
+                                                reuse_stationary=self.reuse_stationary)
+        aligner.load_image(camera_image)
+        aligner.detect_markers()
+        homography = aligner.calculate_homography()
+
+        jig_markers = sorted(int(marker_id) for marker_id in core.jig_config['markers'])
+        return {
+            'homography': homography.tolist(),
+            'used_markers': [m for m in jig_markers if m in aligner.detected_markers],
+            'missing_markers': [m for m in jig_markers if m not in aligner.detected_markers],
+            'alignment': aligner.calculate_alignment_for_design(rect) if rect else None,
+        }
+
+    def export(self, camera_image, rect, design=None, text=None, format='png',
+               dpi=None, output_dir=None, send=False, start=False, jig_config=None,
+               mono=None, material='default'):
+        """
+        Run the complete workflow on an existing snapshot
+
+        Returns:
+            dict with export path and alignment data
+        """
+        workflow = self._workflow_class(
+            jig_config=jig_config or self.jig_config,
+            camera_config=self.camera_config,
+            output_dir=output_dir or self.output_dir,
+            dpi=dpi or self.dpi,
+            undistort_mode=self.undistort_mode,
+            pyramid=self.pyramid,
+            roi_tracking=self.roi_tracking,
+            reuse_stationary=self.reuse_stationary,
+            core=self.get_core(jig_config),
+            export_cache=self.export_cache,
+            mono=mono,
+            material=material,
+        )
+
+        with self._export_lock:
+            export_path = workflow.run_complete_workflow(
+                design_rect_mm=tuple(rect),
+                design_path=design,
+                text=text,
+                use_camera=False,
+                camera_image_path=camera_image,
+                send_to_lb=send,
+                auto_start=start,
+                format=format,
+            )
+
+        return {
+            'export_path': str(export_path) if export_path else None,
+            'alignment': workflow.alignment_data,
+        }
+
+    def send(self, file, start=False):
+        """
+        Load a file into LightBurn
+
+        Returns:
+            dict with 'sent' flag
+        """
+        workflow = self._workflow_class(output_dir=self.output_dir, core=self.get_core())
+        return {'sent': workflow.send_to_lightburn(file, auto_start=start)}
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """JSON over HTTP: GET /status, POST /align, /export, /send, /shutdown"""
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != '/status':
+            self._reply(404, {'ok': False, 'error': f'Unknown endpoint: {self.path}'})
+            return
+        self._reply(200, {'ok': True, **self.server.service.status()})
+
+    def do_POST(self):
+        service = self.server.service
+        handlers = {
+            '/align': service.align,
+            '/export': service.export,
+            '/send': service.send,
+        }
+
+        if self.path == '/shutdown':
+            self._reply(200, {'ok': True})
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+            return
+
+        handler = handlers.get(self.path)
+        if handler is None:
+            self._reply(404, {'ok': False, 'error': f'Unknown endpoint: {self.path}'})
+            return
+
+        start = time.perf_counter()
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            params = json.loads(self.rfile.read(length) or b'{}')
+            if not isinstance(params, dict):
+                raise ValueError("Request body must be a JSON object")
+
+            # Only parameters that don't fit the handler are the client's fault;
+            # a TypeError raised inside the handler is an internal error
+            try:
+                inspect.signature(handler).bind(**params)
+            except TypeError as e:
+                raise ValueError(f"Bad parameters: {e}") from None
+
+            result = handler(**params)
+        except (ValueError, FileNotFoundError) as e:
+            # Bad parameters, unreadable images, missing markers
+            self._reply(400, {'ok': False, 'error': str(e)})
+            return
+        except Exception as e:
+            self._reply(500, {'ok': False, 'error': f'{type(e).__name__}: {e}'})
+            return
+
+        service.count_request()
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        self._reply(200, {'ok': True, 'elapsed_ms': elapsed_ms, **result})
+
+
+class AlignmentDaemon(ThreadingHTTPServer):
+    """Localhost HTTP server around an AlignmentService"""
+
+    daemon_threads = True
+
+    def __init__(self, service, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """
+        Initialize daemon
+
+        Args:
+            service: AlignmentService holding the warm resources
+            host: Bind address (keep it on localhost, there is no authentication)
+            port: TCP port (0 = pick a free one)
+        """
+        self.service = service
+        super().__init__((host, port), _RequestHandler)
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+class DaemonClient:
+    """
+    Thin client for a running AlignmentDaemon
+
+    Paths are sent as absolute paths, since the daemon may run from another
+    working directory.
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, timeout=60.0):
+        self.url = f"http://{host}:{port}"
+        self.timeout = timeout
+
+    def _call(self, endpoint, params=None):
+        data = None if params is None else json.dumps(params).encode('utf-8')
+        req = request.Request(self.url + endpoint, data=data,
+                              headers={'Content-Type': 'application/json'})
+
+        try:
+            with request.urlopen(req, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except error.HTTPError as e:
+            reply = json.loads(e.read() or b'{}')
+            raise RuntimeError(reply.get('error', f'HTTP {e.code}')) from None
+        except error.URLError as e:
+            raise ConnectionError(f"Daemon not reachable at {self.url} ({e.reason})") from None
+
+    def status(self):
+        return self._call('/status')
+
+    def align(self, camera_image, rect=None, jig_config=None):
+        return self._call('/align', {
+            'camera_image': str(Path(camera_image).resolve()),
+            'rect': list(rect) if rect else None,
+            'jig_config': str(Path(jig_config).resolve()) if jig_config else None,
+        })
+
+    def export(self, camera_image, rect, design=None, text=None, format='png',
+               dpi=None, output_dir=None, send=False, start=False, jig_config=None,
+               mono=None, material='default'):
+        return self._call('/export', {
+            'camera_image': str(Path(camera_image).resolve()),
+            'rect': list(rect),
+            'design': str(Path(design).resolve()) if design else None,
+            'text': text,
+            'format': format,
+            'dpi': dpi,
+            'output_dir': str(Path(output_dir).resolve()) if output_dir else None,
+            'send': send,
+            'start': start,
+            'jig_config': str(Path(jig_config).resolve()) if jig_config else None,
+            'mono': mono,
+            'material': material,
+        })
+
+    def send(self, file, start=False):
+        return self._call('/send', {'file': str(Path(file).resolve()), 'start': start})
+
+    def shutdown(self):
+        return self._call('/shutdown', {})
+
+
+def serve(args):
+    """Run the daemon in the foreground"""
+    service = AlignmentService(
+        jig_config=args.jig_config,
+        camera_config=args.camera_calib,
+        output_dir=args.output_dir,
+        dpi=args.dpi,
+        undistort_mode='points' if args.undistort_points else 'frame',
+        pyramid=args.pyramid,
+        roi_tracking=args.roi_tracking,
+        reuse_stationary=args.reuse_stationary,
+    )
+    # Load the default jig up front so the first request is already warm
+    service.get_core()
+
+    daemon = AlignmentDaemon(service, host=args.host, port=args.port)
+    print(f"✓ Alignment daemon listening on {daemon.url} (Ctrl+C to stop)")
+
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.server_close()
+
+    print("✓ Alignment daemon stopped")
+    return 0
+
+
+def main():
+    """CLI interface"""
+    import argparse
+
+    connection = argparse.ArgumentParser(add_help=False)
+    connection.add_argument('--host', default=DEFAULT_HOST,
+                            help=f'Daemon address (default: {DEFAULT_HOST})')
+    connection.add_argument('--port', type=int, default=DEFAULT_PORT,
+                            help=f'Daemon port (default: {DEFAULT_PORT})')
+
+    parser = argparse.ArgumentParser(description='Persistent alignment daemon and client')
+    subparsers = parser.add_subparsers(dest='command', help='Command to execute')
+
+    serve_parser = subparsers.add_parser('serve', parents=[connection], help='Run the daemon')
+    serve_parser.add_argument('--jig-config', default='config/jigs/default.json',
+                              help='Default jig configuration file')
+    serve_parser.add_argument('--camera-calib', default='config/camera.yml',
+                              help='Camera calibration file')
+    serve_parser.add_argument('--output-dir', default='output',
+                              help='Default output directory (default: output/)')
+    serve_parser.add_argument('--dpi', type=int, default=300,
+                              help='Default export DPI (default: 300)')
+    serve_parser.add_argument('--undistort-points', action='store_true',
+                              help='Undistort only marker corners instead of the full frame')
+    serve_parser.add_argument('--pyramid', action='store_true',
+                              help='Coarse-to-fine marker detection (high-resolution cameras)')
+    serve_parser.add_argument('--roi-tracking', action='store_true',
+                              help="Search around each jig's last marker positions first")
+    serve_parser.add_argument('--reuse-stationary', action='store_true',
+                              help='Reuse the homography while the jig has not moved')
+
+    subparsers.add_parser('status', parents=[connection], help='Show daemon status')
+    subparsers.add_parser('stop', parents=[connection], help='Stop the daemon')
+
+    align_parser = subparsers.add_parser('align', parents=[connection], help='Align a snapshot')
+    align_parser.add_argument('camera_image', help='Camera snapshot image')
+    align_parser.add_argument('--rect', nargs=4, type=float,
+                              metavar=('X', 'Y', 'WIDTH', 'HEIGHT'),
+                              help='Design rectangle in mm')
+    align_parser.add_argument('--jig-config', help='Jig configuration (default: daemon default)')
+
+    export_parser = subparsers.add_parser('export', parents=[connection],
+                                          help='Align a snapshot and export a design')
+    export_parser.add_argument('--camera-image', required=True, help='Camera snapshot image')
+    export_parser.add_argument('--rect', nargs=4, type=float, required=True,
+                               metavar=('X', 'Y', 'WIDTH', 'HEIGHT'),
+                               help='Design rectangle in mm')
+    export_parser.add_argument('--design', help='Design file (PNG or SVG)')
+    export_parser.add_argument('--text', help='Text to engrave (alternative to --design)')
+    export_parser.add_argument('--format', choices=['png', 'svg'], default='png',
+                               help='Export format (default: png)')
+    export_parser.add_argument('--dpi', type=int, help='Export DPI (default: daemon default)')
+    export_parser.add_argument('--mono', choices=('threshold', 'dither'),
+                               help='Export a packed 1-bit PNG (threshold or ordered dither)')
+    export_parser.add_argument('--material', default='default',
+                               help='Material profile for the job time estimate (default: default)')
+    export_parser.add_argument('--output-dir', help='Output directory (default: daemon default)')
+    export_parser.add_argument('--jig-config', help='Jig configuration (default: daemon default)')
+    export_parser.add_argument('--send', action='store_true', help='Send to LightBurn after export')
+    export_parser.add_argument('--start', action='store_true',
+                               help='Auto-start job in LightBurn (requires --send)')
+
+    send_parser = subparsers.add_parser('send', parents=[connection], help='Load a file into LightBurn')
+    send_parser.add_argument('file', help='File to load')
+    send_parser.add_argument('--start', action='store_true', help='Start job after loading')
+
+    args = parser.parse_args()
+
+    if not args.command:
+        parser.print_help()
+        return 1
+
+    if args.command == 'serve':
+        return serve(args)
+
+    if args.command == 'export':
+        if not args.design and not args.text:
+            parser.error("Must specify either --design or --text")
+        if args.start and not args.send:
+            parser.error("--start requires --send")
+
+    client = DaemonClient(args.host, args.port)
+
+    try:
+        if args.command == 'status':
+            reply = client.status()
+            print(f"✓ Daemon pid {reply['pid']}, up {reply['uptime_s']}s, "
+                  f"{reply['requests_served']} requests served")
+            for jig in reply['jigs']:
+                print(f"  Warm jig: {jig}")
+            cache = reply['export_cache']
+            print(f"  Export cache: {cache['hits']} hits, {cache['misses']} misses, "
+                  f"{cache['size_bytes'] / 1e6:.1f}MB")
+
+        elif args.command == 'stop':
+            client.shutdown()
+            print("✓ Daemon stopping")
+
+        elif args.command == 'align':
+            reply = client.align(args.camera_image, rect=args.rect, jig_config=args.jig_config)
+            print(f"✓ Aligned with markers {reply['used_markers']} in {reply['elapsed_ms']:.1f}ms")
+            if reply['missing_markers']:
+                print(f"⚠ Missing markers: {reply['missing_markers']}")
+            print(json.dumps(reply['alignment'] or reply['homography'], indent=2))
+
+        elif args.command == 'export':
+            reply = client.export(args.camera_image, args.rect, design=args.design,
+                                  text=args.text, format=args.format, dpi=args.dpi,
+                                  output_dir=args.output_dir, send=args.send,
+                                  start=args.start, jig_config=args.jig_config,
+                                  mono=args.mono, material=args.material)
+            if reply['export_path'] is None:
+                print("✗ Export failed")
+                return 1
+            print(f"✓ Exported {reply['export_path']} in {reply['elapsed_ms']:.1f}ms")
+            estimate = reply['alignment'].get('job_estimate')
+            if estimate:
+                print(f"✓ Estimated job time: {estimate['duration']} ({estimate['seconds']:.1f}s)")
+
+        elif args.command == 'send':
+            reply = client.send(args.file, start=args.start)
+            if not reply['sent']:
+                print("✗ LightBurn did not accept the file (see daemon log)")
+                return 1
+            print(f"✓ Sent {args.file} to LightBurn")
+
+    except (ConnectionError, RuntimeError) as e:
+        print(f"✗ {e}")
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
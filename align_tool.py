@@ -6,14 +6,20 @@ Complete workflow for camera-based laser engraving alignment
 
 import sys
 import cv2
-import json
+import numpy as np
 from pathlib import Path
 import argparse
+from concurrent import futures
 
 # Import local modules
 from aruco_align import ArucoAligner
-from design_warp import DesignWarper
+from artifact_writer import default_writer, save_image
+from export_cache import ExportCache
+from design_warp import DesignWarper, LiveOverlay
+from job_estimate import MATERIALS, load_materials
 from lightburn_udp import LightBurnController
+from png_writer import MONO_METHODS
+from stage_timer import StageTimer, stage, timed
 
 
 class AlignmentWorkflow:
@@ -24,7 +30,25 @@ class AlignmentWorkflow:
     def __init__(self, jig_config='config/jigs/default.json',
                  camera_config='config/camera.yml',
                  output_dir='output',
-                 dpi=300):
+                 dpi=300,
+                 undistort_mode='frame',
+                 pyramid=False,
+                 roi_tracking=False,
+                 reuse_stationary=False,
+                 core=None,
+                 timings=False,
+                 writer=None,
+                 save_snapshot=True,
+                 export_cache=None,
+                 mono=None,
+                 png_level=6,
+                 raster_text=False,
+                 vectorize_mm=None,
+                 trim=False,
+                 scan_plan=None,
+                 material='default',
+                 materials=None,
+                 optimize_paths=False):
         """
         Initialize workflow
 
@@ -33,24 +57,103 @@ class AlignmentWorkflow:
             camera_config: Path to camera calibration
             output_dir: Output directory for exports
             dpi: Export DPI
+            undistort_mode: 'frame' or 'points' (see ArucoAligner)
+            pyramid: Use coarse-to-fine marker detection
+            roi_tracking: Search around the jig's last known marker positions first
+            reuse_stationary: Reuse the cached homography while the jig's
+                              marker regions are unchanged between jobs
+            core: Optional shared AlignmentCore (detector and calibration
+                  already loaded); built on first use otherwise
+            timings: Record per-stage duration and peak memory of each run
+                     (timings.json in the output dir plus a summary table)
+            writer: ArtifactWriter for visualization, preview and JSON files
+                    (default: the process-wide background writer)
+            save_snapshot: Persist captured camera frames in the background
+                           (frames are always processed from memory)
+            export_cache: Optional ExportCache for repeated identical exports
+            mono: None for colour PNG exports, or 'threshold' / 'dither' for
+                  packed 1-bit PNGs
+            png_level: PNG zlib compression level 0-9
+            raster_text: Draw text designs with cv2.putText instead of
+                         vector stroke-font paths
+            vectorize_mm: Trace raster designs into filled vector paths with
+                          this outline tolerance in mm (None: keep rasters)
+            trim: Crop empty design margins on export (the shifted placement
+                  is saved as export_rect_mm in alignment_data.json)
+            scan_plan: None, 'recommend' or 'bake' (see
+                       DesignWarper.export_for_lightburn)
+            material: Material profile name (or MaterialProfile) for the
+                      job time estimate saved in alignment_data.json
+                      (None: no estimate)
+            materials: Profiles to look material names up in (default
+                       job_estimate.MATERIALS)
+            optimize_paths: Reorder vector SVG cut paths for shorter travel
         """
         self.jig_config = Path(jig_config)
-        self.camera_config = Path(camera_config) if Path(camera_config).exists() else None
+        self.camera_config = Path(camera_config) if camera_config and Path(camera_config).exists() else None
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.dpi = dpi
+        self.undistort_mode = undistort_mode
+        self.pyramid = pyramid
+        self.roi_tracking = roi_tracking
+        self.reuse_stationary = reuse_stationary
+        self._core = core
+        self.timings = timings
+        self.timer = None
+        self.writer = writer or default_writer()
+        self.save_snapshot = save_snapshot
+        self.export_cache = export_cache
+        self.mono = mono
+        self.png_level = png_level
+        self.raster_text = raster_text
+        self.vectorize_mm = vectorize_mm
+        self.trim = trim
+        self.scan_plan = scan_plan
+        self.material = material
+        self.materials = materials
+        self.optimize_paths = optimize_paths
 
         # Workflow state
         self.camera_image_path = None
+        self.camera_image = None
         self.alignment_data = None
+        self._alignment_json_write = None
         self.export_path = None
 
+    def get_core(self):
+        """
+        AlignmentCore for this workflow, loading jig config, calibration and
+        detector only once across runs
+
+        Returns:
+            AlignmentCore
+        """
+        if self._core is None:
+            self._core = ArucoAligner(self.jig_config, self.camera_config,
+                                      undistort_mode=self.undistort_mode,
+                                      pyramid=self.pyramid).core
+        return self._core
+
+    def _persist_snapshot(self, frame, output_name):
+        """Queue a captured frame for writing (if snapshots are saved)"""
+        if not self.save_snapshot:
+            return None
+
+        self.camera_image_path = self.output_dir / output_name
+        self.writer.write_image(self.camera_image_path, frame)
+        return self.camera_image_path
+
+    @timed('capture_camera_image')
     def capture_camera_image(self, output_name='camera_snapshot.jpg'):
         """
         Capture image from camera
 
+        The frame is returned in memory; persisting it is a background side
+        effect (see save_snapshot).
+
         Returns:
-            Path to captured image
+            Captured BGR frame, or None if cancelled
         """
         print(f"\n{'='*60}")
         print("Camera Capture")
@@ -78,23 +181,97 @@ class AlignmentWorkflow:
                 return None
 
             elif key == 32:  # SPACE
-                output_path = self.output_dir / output_name
-                cv2.imwrite(str(output_path), frame)
-                print(f"✓ Captured: {output_path}")
+                print(f"✓ Captured: {frame.shape[1]}x{frame.shape[0]}")
+                if self._persist_snapshot(frame, output_name):
+                    print(f"✓ Snapshot queued: {self.camera_image_path}")
                 cap.release()
                 cv2.destroyAllWindows()
-                return output_path
+                return frame
 
         cap.release()
         cv2.destroyAllWindows()
         return None
 
-    def detect_alignment(self, camera_image_path, design_rect_mm=None):
+    @timed('capture_live_alignment')
+    def capture_live_alignment(self, design_rect_mm, source=0,
+                               output_name='camera_snapshot.jpg', design_overlay=None):
+        """
+        Align continuously from the camera stream; SPACE takes the live result
+
+        The homography is already computed when the operator triggers, so
+        there is no capture-then-process delay.
+
+        Args:
+            design_rect_mm: (x, y, width, height) in mm
+            source: Camera index or video source
+            design_overlay: Optional LiveOverlay projecting the design onto the feed
+
+        Returns:
+            Alignment data dict, or None if cancelled
+        """
+        from live_align import LiveAligner, draw_live_overlay
+
+        print(f"\n{'='*60}")
+        print("Live Camera Alignment")
+        print(f"{'='*60}\n")
+        print("Press SPACE to use the live alignment, ESC to cancel")
+
+        live = LiveAligner(self.get_core(), source=source)
+        board_size_mm = live.core.jig_config['board_size_mm']
+
+        alignment = None
+        with live:
+            shown_index = -1
+            while live.grabber.running:
+                grabbed = live.grabber.read_latest(after_index=shown_index, timeout=1.0)
+                if grabbed is None:
+                    continue
+
+                shown_index = grabbed[0]
+                cv2.imshow('Camera Preview', draw_live_overlay(grabbed[2], live.latest(), board_size_mm,
+                                                               design_overlay))
+
+                key = cv2.waitKey(1) & 0xFF
+
+                if key == 27:  # ESC
+                    break
+
+                elif key == 32:  # SPACE
+                    alignment = live.latest()
+                    if alignment is None:
+                        print("⚠ No alignment yet, markers not detected")
+                        continue
+                    break
+
+        cv2.destroyAllWindows()
+
+        if alignment is None:
+            print("Capture cancelled")
+            return None
+
+        print(f"✓ Live alignment from frame {alignment.frame_index} "
+              f"(latency {alignment.latency_ms:.0f}ms, {live.frames_dropped} frames dropped)")
+
+        # Keep the aligned frame for the preview
+        self.camera_image = alignment.frame
+        self._persist_snapshot(alignment.frame, output_name)
+
+        alignment_data = alignment.result.alignment_for_design(design_rect_mm)
+
+        alignment_json = self.output_dir / 'alignment_data.json'
+        self._alignment_json_write = self.writer.write_json(alignment_json, alignment_data)
+
+        print(f"✓ Alignment data queued: {alignment_json}")
+
+        return alignment_data
+
+    @timed('detect_alignment')
+    def detect_alignment(self, camera_image, design_rect_mm=None):
         """
         Detect ArUco markers and calculate alignment
 
         Args:
-            camera_image_path: Path to camera snapshot
+            camera_image: Path to camera snapshot, or the BGR frame in memory
             design_rect_mm: Optional (x, y, width, height) in mm
 
         Returns:
@@ -104,22 +281,28 @@ class AlignmentWorkflow:
         print("ArUco Detection & Alignment")
         print(f"{'='*60}\n")
 
-        aligner = ArucoAligner(self.jig_config, self.camera_config)
+        aligner = ArucoAligner.from_core(self.get_core(),
+                                         roi_tracking=self.roi_tracking,
+                                         reuse_stationary=self.reuse_stationary)
         alignment_data = aligner.process(
-            camera_image_path,
+            camera_image,
             design_rect_mm=design_rect_mm,
-            visualize=True
+            visualize=True,
+            writer=self.writer,
+            visualization_path=(self.output_dir / 'camera_snapshot_aligned.jpg'
+                                if isinstance(camera_image, np.ndarray) else None)
         )
+        self.camera_image = aligner.raw_image
 
         # Save alignment data
         alignment_json = self.output_dir / 'alignment_data.json'
-        with open(alignment_json, 'w') as f:
-            json.dump(alignment_data, f, indent=2)
+        self._alignment_json_write = self.writer.write_json(alignment_json, alignment_data)
 
-        print(f"✓ Alignment data saved: {alignment_json}")
+        print(f"✓ Alignment data queued: {alignment_json}")
 
         return alignment_data
 
+    @timed('warp_and_export')
     def warp_and_export(self, alignment_data, design_path=None, text=None,
                        format='png', output_name=None):
         """
@@ -145,12 +328,15 @@ class AlignmentWorkflow:
         if text:
             design_rect = alignment_data['design_rect_mm']
             size_mm = (design_rect[2], design_rect[3])
-            warper.create_design_from_text(text, size_mm)
+            warper.create_design_from_text(text, size_mm, raster=self.raster_text)
         elif design_path:
             warper.load_design(design_path)
         else:
             raise ValueError("Must provide either design_path or text")
 
+        if self.vectorize_mm is not None and warper.vector_design is None:
+            warper.vectorize_design(tolerance_mm=self.vectorize_mm)
+
         # Generate output filename
         if output_name is None:
             output_name = f'aligned_design.{format}'
@@ -158,19 +344,35 @@ class AlignmentWorkflow:
         export_path = self.output_dir / output_name
 
         # Export
-        warper.export_for_lightburn(export_path, format=format)
-
-        # Create preview
-        if self.camera_image_path and Path(self.camera_image_path).exists():
+        warper.export_for_lightburn(export_path, format=format, cache=self.export_cache,
+                                    mono=self.mono, png_level=self.png_level, trim=self.trim,
+                                    scan_plan=self.scan_plan, material=self.material,
+                                    materials=self.materials, optimize_paths=self.optimize_paths)
+
+        if any(key in alignment_data for key in ('trim', 'scan_plan', 'job_estimate', 'path_order')):
+            # Record the export placement and job estimates, after the
+            # queued first write so the two can't land out of order
+            if self._alignment_json_write is not None:
+                futures.wait([self._alignment_json_write])
+            self._alignment_json_write = self.writer.write_json(self.output_dir / 'alignment_data.json',
+                                                                alignment_data)
+
+        # Create preview in the background, only the export blocks the send
+        camera_img = self.camera_image
+        if camera_img is None and self.camera_image_path and Path(self.camera_image_path).exists():
             camera_img = cv2.imread(str(self.camera_image_path))
-            if camera_img is not None:
-                preview = warper.warp_to_alignment(camera_img)
-                preview_path = self.output_dir / 'preview.jpg'
-                cv2.imwrite(str(preview_path), preview)
-                print(f"✓ Preview saved: {preview_path}")
+        if camera_img is not None:
+            preview_path = self.output_dir / 'preview.jpg'
+            self.writer.submit(str(preview_path), self._write_preview, warper, camera_img, preview_path)
+            print(f"✓ Preview queued: {preview_path}")
 
         return export_path
 
+    def _write_preview(self, warper, camera_img, preview_path):
+        """Render and write the preview (runs on the artifact writer)"""
+        save_image(preview_path, warper.warp_to_alignment(camera_img))
+
+    @timed('send_to_lightburn')
     def send_to_lightburn(self, file_path, auto_start=False):
         """
         Send file to LightBurn via UDP
@@ -209,7 +411,8 @@ class AlignmentWorkflow:
 
     def run_complete_workflow(self, design_rect_mm, design_path=None, text=None,
                              use_camera=True, camera_image_path=None,
-                             send_to_lb=False, auto_start=False, format='png'):
+                             send_to_lb=False, auto_start=False, format='png',
+                             live=False, camera_frame=None):
         """
         Run the complete workflow from start to finish
 
@@ -222,30 +425,68 @@ class AlignmentWorkflow:
             send_to_lb: Send to LightBurn
             auto_start: Auto-start job in LightBurn
             format: Export format
+            live: Align continuously from the camera stream (use_camera only)
+            camera_frame: BGR frame already in memory (instead of capture or file)
 
         Returns:
             Path to exported file
         """
+        if auto_start and self.scan_plan == 'bake':
+            raise ValueError("Auto-start can't be combined with scan_plan='bake': the export may be "
+                             "turned a quarter turn, so the workpiece has to be turned to match first")
+
+        if not self.timings:
+            return self._run_workflow(design_rect_mm, design_path, text, use_camera,
+                                      camera_image_path, send_to_lb, auto_start, format, live,
+                                      camera_frame)
+
+        self.timer = StageTimer()
+        try:
+            with self.timer.activate():
+                return self._run_workflow(design_rect_mm, design_path, text, use_camera,
+                                          camera_image_path, send_to_lb, auto_start, format, live,
+                                          camera_frame)
+        finally:
+            timings_path = self.timer.save(self.output_dir / 'timings.json')
+            print(self.timer.summary())
+            print(f"\n✓ Stage timings saved: {timings_path}")
+
+    def _run_workflow(self, design_rect_mm, design_path, text, use_camera,
+                      camera_image_path, send_to_lb, auto_start, format, live,
+                      camera_frame):
+        """Workflow steps of run_complete_workflow()"""
         print(f"\n{'='*60}")
         print("LightBurn Auto-Align - Complete Workflow")
         print(f"{'='*60}\n")
 
-        # Step 1: Get camera image
-        if use_camera:
-            self.camera_image_path = self.capture_camera_image()
-            if self.camera_image_path is None:
+        # Steps 1-2 (live): Align from the camera stream, ready when triggered
+        if use_camera and live:
+            design_overlay = LiveOverlay.from_design(design_rect_mm, design_path=design_path, text=text)
+            self.alignment_data = self.capture_live_alignment(design_rect_mm,
+                                                              design_overlay=design_overlay)
+            if self.alignment_data is None:
                 print("Workflow cancelled")
                 return None
-        elif camera_image_path:
-            self.camera_image_path = Path(camera_image_path)
-        else:
-            raise ValueError("Must provide camera image or enable camera capture")
 
-        # Step 2: Detect markers and calculate alignment
-        self.alignment_data = self.detect_alignment(
-            self.camera_image_path,
-            design_rect_mm=design_rect_mm
-        )
+        else:
+            # Step 1: Get camera image (frames stay in memory)
+            if camera_frame is not None:
+                camera_image = camera_frame
+            elif use_camera:
+                camera_image = self.capture_camera_image()
+                if camera_image is None:
+                    print("Workflow cancelled")
+                    return None
+            elif camera_image_path:
+                self.camera_image_path = camera_image = Path(camera_image_path)
+            else:
+                raise ValueError("Must provide camera image or enable camera capture")
+
+            # Step 2: Detect markers and calculate alignment
+            self.alignment_data = self.detect_alignment(
+                camera_image,
+                design_rect_mm=design_rect_mm
+            )
 
         if self.alignment_data is None:
             print("Alignment failed")
@@ -265,12 +506,20 @@ class AlignmentWorkflow:
             if not success:
                 print("\n⚠ Failed to send to LightBurn, but file is exported")
 
+        # Visualization, preview and JSON were written in the background
+        with stage('flush_artifacts'):
+            self.writer.flush()
+
         print(f"\n{'='*60}")
         print("Workflow Complete!")
         print(f"{'='*60}")
         print(f"\nExported file: {self.export_path}")
-        print(f"Design position: ({design_rect_mm[0]:.1f}, {design_rect_mm[1]:.1f})mm")
-        print(f"Design size: {design_rect_mm[2]:.1f}x{design_rect_mm[3]:.1f}mm")
+        export_rect = self.alignment_data.get('export_rect_mm', design_rect_mm)
+        print(f"Design position: ({export_rect[0]:.1f}, {export_rect[1]:.1f})mm")
+        print(f"Design size: {export_rect[2]:.1f}x{export_rect[3]:.1f}mm")
+        if 'job_estimate' in self.alignment_data:
+            estimate = self.alignment_data['job_estimate']
+            print(f"Estimated job time: {estimate['duration']} ({estimate['material']['name']})")
         print(f"\n{'='*60}\n")
 
         return self.export_path
@@ -305,13 +554,20 @@ Design placement:
                             help='Capture from camera (default if no --camera-image)')
     input_group.add_argument('--camera-image', type=str,
                             help='Use existing camera snapshot')
+    input_group.add_argument('--live', action='store_true',
+                            help='Align continuously from the camera stream')
 
     # Design options
     design_group = parser.add_argument_group('Design')
     design_group.add_argument('--design', type=str,
-                             help='Design image file (PNG)')
+                             help='Design file (PNG or SVG)')
     design_group.add_argument('--text', type=str,
                              help='Text to engrave (alternative to --design)')
+    design_group.add_argument('--raster-text', action='store_true',
+                             help='Draw text as a raster (cv2.putText) instead of vector strokes')
+    design_group.add_argument('--vectorize', type=float, nargs='?', const=0.05, metavar='TOL_MM',
+                             help='Trace a raster line-art design into filled vector paths '
+                                  '(outline tolerance in mm, default: 0.05)')
     design_group.add_argument('--rect', nargs=4, type=float, required=True,
                              metavar=('X', 'Y', 'WIDTH', 'HEIGHT'),
                              help='Design rectangle in mm (x y width height)')
@@ -322,8 +578,29 @@ Design placement:
                              help='Export format (default: png)')
     export_group.add_argument('--dpi', type=int, default=300,
                              help='Export DPI (default: 300)')
+    export_group.add_argument('--mono', choices=MONO_METHODS,
+                             help='Export a packed 1-bit PNG (threshold or ordered dither)')
+    export_group.add_argument('--png-level', type=int, default=6, choices=range(10), metavar='0-9',
+                             help='PNG zlib compression level (default: 6)')
+    export_group.add_argument('--trim', action='store_true',
+                             help='Crop empty design margins and shift the placement to match')
+    export_group.add_argument('--scan-plan', choices=['recommend', 'bake'],
+                             help='Estimate the fastest scan angle (bake: rotate the export '
+                                  'a quarter turn when that is faster)')
+    export_group.add_argument('--optimize-paths', action='store_true',
+                             help='Reorder vector SVG cut paths to shorten travel moves')
+    export_group.add_argument('--material', default='default',
+                             help=f"Material profile for the job time estimate ({', '.join(MATERIALS)})")
+    export_group.add_argument('--material-config',
+                             help='JSON file of material profiles (speeds in mm/s) adding to or '
+                                  'overriding the built-ins')
     export_group.add_argument('--output-dir', default='output',
                              help='Output directory (default: output/)')
+    export_group.add_argument('--no-snapshot', action='store_true',
+                             help="Don't save captured camera frames to the output directory")
+    export_group.add_argument('--no-export-cache', action='store_true',
+                             help='Always re-encode the export (default: reuse identical '
+                                  'exports from <output-dir>/.export_cache)')
 
     # Configuration
     config_group = parser.add_argument_group('Configuration')
@@ -331,6 +608,12 @@ Design placement:
                              help='Jig configuration file')
     config_group.add_argument('--camera-calib', default='config/camera.yml',
                              help='Camera calibration file')
+    config_group.add_argument('--undistort-points', action='store_true',
+                             help='Undistort only marker corners instead of the full frame')
+    config_group.add_argument('--pyramid', action='store_true',
+                             help='Coarse-to-fine marker detection (high-resolution cameras)')
+    config_group.add_argument('--timings', action='store_true',
+                             help='Record per-stage timing and memory (timings.json + summary)')
 
     # LightBurn integration
     lb_group = parser.add_argument_group('LightBurn')
@@ -348,6 +631,10 @@ Design placement:
     if args.start and not args.send:
         parser.error("--start requires --send")
 
+    if args.start and args.scan_plan == 'bake':
+        parser.error("--start can't be combined with --scan-plan bake "
+                     "(turn the workpiece to match the export, then start the job in LightBurn)")
+
     # Determine if using camera
     use_camera = args.camera or (args.camera_image is None)
 
@@ -357,7 +644,22 @@ Design placement:
             jig_config=args.jig_config,
             camera_config=args.camera_calib,
             output_dir=args.output_dir,
-            dpi=args.dpi
+            dpi=args.dpi,
+            undistort_mode='points' if args.undistort_points else 'frame',
+            pyramid=args.pyramid,
+            timings=args.timings,
+            save_snapshot=not args.no_snapshot,
+            export_cache=None if args.no_export_cache else
+                         ExportCache(Path(args.output_dir) / '.export_cache'),
+            mono=args.mono,
+            png_level=args.png_level,
+            raster_text=args.raster_text,
+            vectorize_mm=args.vectorize,
+            trim=args.trim,
+            scan_plan=args.scan_plan,
+            material=args.material,
+            materials=load_materials(args.material_config) if args.material_config else None,
+            optimize_paths=args.optimize_paths
         )
 
         # Run workflow
@@ -369,7 +671,8 @@ Design placement:
             camera_image_path=args.camera_image,
             send_to_lb=args.send,
             auto_start=args.start,
-            format=args.format
+            format=args.format,
+            live=args.live
         )
 
         return 0 if export_path else 1
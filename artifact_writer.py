@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Artifact Writer
+Background encoding and writing of side artifacts (visualizations, previews,
+JSON) so disk I/O stays off the alignment critical path
+"""
+
+import atexit
+import cv2
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+
+class ArtifactWriter:
+    """
+    Bounded thread pool for artifact writes
+
+    At most max_pending writes are queued or running; further submissions
+    block until one finishes, so a slow disk applies backpressure instead of
+    piling up frames in memory. Files are written to a temporary name and
+    renamed into place, so readers never see a partial file.
+
+    Images are encoded in the worker and must not be modified after they are
+    submitted. JSON documents are serialized when submitted, so the caller
+    may keep updating the data.
+    """
+
+    def __init__(self, max_workers=2, max_pending=8):
+        """
+        Initialize writer
+
+        Args:
+            max_workers: Writer threads
+            max_pending: Max queued + running writes before submit() blocks
+        """
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='ArtifactWriter')
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._pending = set()
+        self.failures = []  # (description, error)
+
+    def submit(self, description, func, *args, **kwargs):
+        """
+        Run func(*args, **kwargs) in the background
+
+        Args:
+            description: Artifact description for error reports (usually its path)
+
+        Returns:
+            concurrent.futures.Future
+        """
+        self._slots.acquire()
+
+        try:
+            future = self._executor.submit(func, *args, **kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._pending.add(future)
+
+        def done(future):
+            with self._lock:
+                self._pending.discard(future)
+                if future.exception() is not None:
+                    self.failures.append((description, future.exception()))
+            self._slots.release()
+
+        future.add_done_callback(done)
+        return future
+
+    def write_image(self, output_path, image):
+        """Encode and write an image (format from the file extension)"""
+        return self.submit(str(output_path), save_image, Path(output_path), image)
+
+    def write_json(self, output_path, data):
+        """Write a JSON document (serialized now, written in the background)"""
+        text = json.dumps(data, indent=2)
+        return self.submit(str(output_path), _replace_atomically, Path(output_path), text, 'w')
+
+    def flush(self, timeout=None):
+        """
+        Wait for all pending writes and report failures
+
+        Returns:
+            bool: True if every write since the last flush succeeded
+        """
+        with self._lock:
+            pending = list(self._pending)
+
+        for future in pending:
+            try:
+                future.result(timeout=timeout)
+            except Exception:
+                pass  # Reported below via self.failures
+
+        with self._lock:
+            failures, self.failures = self.failures, []
+
+        for description, error in failures:
+            print(f"⚠ Could not write {description}: {error}")
+
+        return not failures
+
+    def close(self):
+        """Flush and stop the writer threads"""
+        ok = self.flush()
+        self._executor.shutdown(wait=True)
+        return ok
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _replace_atomically(output_path, data, mode):
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_name(f".{output_path.name}.tmp")
+
+    with open(tmp_path, mode) as f:
+        f.write(data)
+    os.replace(tmp_path, output_path)
+
+
+def save_image(output_path, image):
+    """Encode an image (format from the extension) and write it atomically"""
+    output_path = Path(output_path)
+    ok, buffer = cv2.imencode(output_path.suffix, image)
+    if not ok:
+        raise ValueError(f"Could not encode image as {output_path.suffix}")
+    _replace_atomically(output_path, buffer.tobytes(), 'wb')
+
+
+def save_json(output_path, data):
+    """Write a JSON document atomically"""
+    output_path = Path(output_path)
+    _replace_atomically(output_path, json.dumps(data, indent=2), 'w')
+
+
+_default_writer = None
+_default_lock = threading.Lock()
+
+
+def default_writer():
+    """Process-wide ArtifactWriter, flushed automatically at interpreter exit"""
+    global _default_writer
+
+    with _default_lock:
+        if _default_writer is None:
+            _default_writer = ArtifactWriter()
+            atexit.register(_default_writer.close)
+
+    return _default_writer
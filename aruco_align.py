@@ -7,28 +7,243 @@ Precise laser engraving alignment using ArUco markers and homography mapping
 import cv2
 import numpy as np
 from pathlib import Path
+from dataclasses import dataclass, field
+from collections import deque
+import hashlib
 import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
+from undistort import UndistortionEngine
+from stage_timer import stage, timed
 
-class ArucoAligner:
+
+def load_jig_config(config_path):
+    """Load jig configuration (marker positions)"""
+    with open(config_path, 'r') as f:
+        return json.load(f)
+
+
+def transform_rect_px(homography, rect_mm):
     """
-    Detects ArUco markers and calculates precise alignment using homography
+    Transform a rectangle from mm coordinates to pixel coordinates
+
+    Args:
+        homography: 3x3 mm -> pixel homography
+        rect_mm: (x, y, width, height) in millimeters
+
+    Returns:
+        4 corner points in pixels
+    """
+    x, y, w, h = rect_mm
+
+    # Define rectangle corners in mm
+    corners_mm = np.array([
+        [[x, y]],
+        [[x + w, y]],
+        [[x + w, y + h]],
+        [[x, y + h]]
+    ], dtype=np.float32)
+
+    # Transform to pixels
+    corners_px = cv2.perspectiveTransform(corners_mm, homography)
+
+    return corners_px.reshape(-1, 2)
+
+
+def alignment_for_design(homography, design_rect_mm, image_size):
+    """
+    Calculate alignment data for a design
+
+    Args:
+        homography: 3x3 mm -> pixel homography
+        design_rect_mm: (x, y, width, height) in millimeters
+                       where (0,0) is bottom-left of engraving area
+        image_size: (width, height) of the camera image
+
+    Returns:
+        dict with alignment data
+    """
+    # Transform design corners to pixels
+    corners_px = transform_rect_px(homography, design_rect_mm)
+
+    # Calculate center
+    center_px = np.mean(corners_px, axis=0)
+
+    # Calculate rotation (angle of bottom edge)
+    bottom_left = corners_px[0]
+    bottom_right = corners_px[1]
+    angle_rad = np.arctan2(
+        bottom_right[1] - bottom_left[1],
+        bottom_right[0] - bottom_left[0]
+    )
+    angle_deg = np.degrees(angle_rad)
+
+    # Calculate size in pixels
+    width_px = np.linalg.norm(bottom_right - bottom_left)
+    height_px = np.linalg.norm(corners_px[3] - bottom_left)
+
+    result = {
+        'design_rect_mm': design_rect_mm,
+        'center_px': center_px.tolist(),
+        'corners_px': corners_px.tolist(),
+        'angle_deg': float(angle_deg),
+        'size_px': [float(width_px), float(height_px)],
+        'image_size': [int(image_size[0]), int(image_size[1])]
+    }
+
+    return result
+
+
+def alignment_for_designs(homography, design_rects_mm, image_size):
+    """
+    Vectorized alignment for many designs with a single transform call
+
+    Args:
+        homography: 3x3 mm -> pixel homography
+        design_rects_mm: (N, 4) array of (x, y, width, height) in millimeters
+        image_size: (width, height) of the camera image
+
+    Returns:
+        dict of arrays: design_rects_mm (N, 4), centers_px (N, 2),
+        corners_px (N, 4, 2), angles_deg (N,), sizes_px (N, 2), image_size
+    """
+    rects = np.asarray(design_rects_mm, dtype=np.float64).reshape(-1, 4)
+    x, y, w, h = rects.T
+
+    # Corners in the same order as transform_rect_px: BL, BR, TR, TL
+    corners_mm = np.stack([
+        np.stack([x, y], axis=1),
+        np.stack([x + w, y], axis=1),
+        np.stack([x + w, y + h], axis=1),
+        np.stack([x, y + h], axis=1),
+    ], axis=1).astype(np.float32)
+
+    corners_px = cv2.perspectiveTransform(corners_mm.reshape(-1, 1, 2), homography).reshape(-1, 4, 2)
+
+    bottom_edge = corners_px[:, 1] - corners_px[:, 0]
+    left_edge = corners_px[:, 3] - corners_px[:, 0]
+
+    return {
+        'design_rects_mm': rects,
+        'centers_px': corners_px.mean(axis=1),
+        'corners_px': corners_px,
+        'angles_deg': np.degrees(np.arctan2(bottom_edge[:, 1], bottom_edge[:, 0])),
+        'sizes_px': np.stack([np.linalg.norm(bottom_edge, axis=1),
+                              np.linalg.norm(left_edge, axis=1)], axis=1),
+        'image_size': [int(image_size[0]), int(image_size[1])],
+    }
+
+
+def split_design_alignments(batch):
+    """
+    Per-design alignment dicts (alignment_for_design format) from a batch
+
+    Args:
+        batch: Result of alignment_for_designs
+
+    Returns:
+        list of dicts
+    """
+    return [
+        {
+            'design_rect_mm': rect.tolist(),
+            'center_px': center.tolist(),
+            'corners_px': corners.tolist(),
+            'angle_deg': float(angle),
+            'size_px': size.tolist(),
+            'image_size': list(batch['image_size']),
+        }
+        for rect, center, corners, angle, size in zip(
+            batch['design_rects_mm'], batch['centers_px'], batch['corners_px'],
+            batch['angles_deg'], batch['sizes_px']
+        )
+    ]
+
+
+@dataclass(frozen=True)
+class MarkerDetection:
+    """Markers found in one frame (pixel coordinates of the undistorted image)"""
+
+    image_size: tuple
+    markers: dict                # marker_id -> center
+    marker_corners: dict         # marker_id -> 4x2 corners
+    quads: dict                  # marker_id -> 4x2 corners in the searched frame
+    marker_side_px: float
+    method: str                  # 'roi', 'full', 'pyramid' or 'pyramid-fallback'
+    detect_ms: float
+    roi_missed: bool = False
+    roi_ms: float = 0.0
+
+
+@dataclass(frozen=True)
+class AlignmentResult:
+    """Detection plus the mm -> pixel homography computed from it"""
+
+    detection: MarkerDetection
+    homography: np.ndarray
+    used_markers: tuple
+    missing_markers: tuple = field(default=())
+
+    @property
+    def image_size(self):
+        return self.detection.image_size
+
+    def transform_rect(self, rect_mm):
+        """4 pixel corners of a mm rectangle"""
+        return transform_rect_px(self.homography, rect_mm)
+
+    def alignment_for_design(self, design_rect_mm):
+        """Alignment data dict for a design rectangle (see alignment_for_design)"""
+        return alignment_for_design(self.homography, design_rect_mm, self.image_size)
+
+    def alignment_for_designs(self, design_rects_mm):
+        """Vectorized alignment for an (N, 4) array of mm rects (see alignment_for_designs)"""
+        return alignment_for_designs(self.homography, design_rects_mm, self.image_size)
+
+
+class AlignmentCore:
     """
+    Stateless alignment core: frame in, MarkerDetection / AlignmentResult out
 
-    def __init__(self, jig_config_path, camera_config_path=None):
+    Holds only resources that never change after construction (jig config,
+    ArUco detector, undistortion tables), so one instance can be shared by
+    a thread pool serving several stations.
+    """
+
+    UNDISTORT_MODES = ('frame', 'points')
+
+    # Target marker side (px) on the coarse pyramid level
+    PYRAMID_MARKER_PX = 64
+
+    def __init__(self, jig_config, undistorter=None, undistort_mode='frame', pyramid=False):
         """
-        Initialize aligner
+        Initialize core
 
         Args:
-            jig_config_path: Path to jig configuration JSON
-            camera_config_path: Optional path to camera calibration YAML
+            jig_config: Jig configuration dict
+            undistorter: Optional UndistortionEngine
+            undistort_mode: 'frame' or 'points' (see ArucoAligner)
+            pyramid: Use coarse-to-fine detection
         """
-        self.jig_config = self.load_jig_config(jig_config_path)
-        self.camera_matrix = None
-        self.dist_coeffs = None
-
-        if camera_config_path:
-            self.load_camera_calibration(camera_config_path)
+        if undistort_mode not in self.UNDISTORT_MODES:
+            raise ValueError(f"Unsupported undistort mode: {undistort_mode}")
+
+        self.jig_config = jig_config
+        self.undistorter = undistorter
+        self.undistort_mode = undistort_mode
+        self.pyramid = pyramid
+        self.expected_ids = tuple(int(marker_id) for marker_id in jig_config['markers'])
+
+        # Identifies everything a result depends on: jig contents, calibration and options
+        digest = hashlib.sha1(json.dumps(jig_config, sort_keys=True).encode())
+        if undistorter is not None:
+            digest.update(f"{undistorter.calib_hash}|{undistorter.alpha}".encode())
+        digest.update(f"{undistort_mode}|{pyramid}".encode())
+        self.fingerprint = digest.hexdigest()[:16]
 
         # Initialize ArUco detector
         aruco_dict_name = self.jig_config.get('dictionary', 'DICT_4X4_50')
@@ -39,15 +254,496 @@ class ArucoAligner:
         self.detector_params = cv2.aruco.DetectorParameters()
         self.detector = cv2.aruco.ArucoDetector(self.aruco_dict, self.detector_params)
 
+    @classmethod
+    def from_files(cls, jig_config_path, camera_config_path=None, **options):
+        """
+        Build a core from a jig config and optional calibration file
+
+        Returns:
+            AlignmentCore
+        """
+        undistorter = None
+        if camera_config_path:
+            undistorter = UndistortionEngine.from_file(camera_config_path)
+
+        return cls(load_jig_config(jig_config_path), undistorter=undistorter, **options)
+
+    @property
+    def points_only(self):
+        """True if only marker corners (not frames) are undistorted"""
+        return self.undistort_mode == 'points' and self.undistorter is not None
+
+    def undistort(self, frame):
+        """Full-frame undistortion (identity without calibration)"""
+        if self.undistorter is None:
+            return frame
+        return self.undistorter.undistort(frame)
+
+    def detection_frame(self, frame):
+        """Frame that markers are searched in (undistorted unless points-only)"""
+        return frame if self.points_only else self.undistort(frame)
+
+    def undistort_points(self, points_px, image_size):
+        """
+        Map raw-image pixel coordinates into the undistorted image
+
+        Args:
+            points_px: (N, 2) pixel coordinates in the raw image
+            image_size: (width, height) of the raw image
+
+        Returns:
+            (N, 2) pixel coordinates in the undistorted image
+        """
+        points_px = np.asarray(points_px, dtype=np.float32).reshape(-1, 1, 2)
+
+        if self.undistorter is None:
+            return points_px.reshape(-1, 2)
+
+        new_camera_matrix = self.undistorter.new_camera_matrix(image_size)
+        undistorted = cv2.undistortPoints(
+            points_px, self.undistorter.camera_matrix, self.undistorter.dist_coeffs,
+            P=new_camera_matrix
+        )
+
+        return undistorted.reshape(-1, 2)
+
+    def pyramid_scale(self, image_size, marker_side_px=None):
+        """
+        Downscale factor for coarse detection
+
+        Sized so markers span about PYRAMID_MARKER_PX pixels. The marker size
+        is taken from a previous detection, or estimated from the jig's
+        marker_size_mm assuming the board roughly fills the frame.
+
+        Args:
+            image_size: (width, height) in pixels
+            marker_side_px: Marker side measured on a previous frame
+
+        Returns:
+            float: Scale factor (<= 1.0)
+        """
+        if marker_side_px is None:
+            marker_mm = self.jig_config.get('marker_size_mm', 40)
+            extent_mm = self.jig_config['board_size_mm'] + marker_mm
+            px_per_mm = min(image_size) / extent_mm
+            marker_side_px = marker_mm * px_per_mm
+
+        return min(1.0, self.PYRAMID_MARKER_PX / marker_side_px)
+
+    def _detect_pyramid(self, gray, marker_side_px=None):
+        """
+        Coarse-to-fine marker detection
+
+        Detects on a downscaled copy, maps corners back to full resolution and
+        refines them with cornerSubPix in small windows. Falls back to a
+        full-resolution search if any jig marker is missed at the coarse level.
+
+        Returns:
+            (corners, ids, method)
+        """
+        scale = self.pyramid_scale((gray.shape[1], gray.shape[0]), marker_side_px)
+
+        if scale > 0.9:
+            corners, ids, rejected = self.detector.detectMarkers(gray)
+            return corners, ids, 'full'
+
+        small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        corners, ids, rejected = self.detector.detectMarkers(small)
+
+        found = set() if ids is None else {int(marker_id) for marker_id in ids.flatten()}
+
+        if not set(self.expected_ids).issubset(found):
+            corners, ids, rejected = self.detector.detectMarkers(gray)
+            return corners, ids, 'pyramid-fallback'
+
+        # Pixel-center aware upscale, then refine inside windows covering the upscale error
+        points = ((np.concatenate(corners).reshape(-1, 2) + 0.5) / scale - 0.5).astype(np.float32)
+        win = int(np.ceil(1.5 / scale)) + 2
+        criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_COUNT, 30, 0.01)
+        cv2.cornerSubPix(gray, points.reshape(-1, 1, 2), (win, win), (-1, -1), criteria)
+
+        return points.reshape(-1, 1, 4, 2), ids, 'pyramid'
+
+    def _detect_windows(self, gray, quads, padding):
+        """
+        Search for each jig marker only in a padded window around its quad
+
+        Window coordinates are mapped back to the frame.
+
+        Returns:
+            (corners, ids), or (None, None) if any jig marker is not found
+        """
+        height, width = gray.shape[:2]
+
+        found_corners = []
+        for marker_id in self.expected_ids:
+            quad = quads.get(marker_id)
+            if quad is None:
+                return None, None
+
+            side = np.linalg.norm(np.diff(quad, axis=0, append=quad[:1]), axis=1).mean()
+            pad = side * padding + 4
+            x0, y0 = np.floor(quad.min(axis=0) - pad).astype(int)
+            x1, y1 = np.ceil(quad.max(axis=0) + pad).astype(int)
+            x0, y0 = max(x0, 0), max(y0, 0)
+            x1, y1 = min(x1, width), min(y1, height)
+
+            corners, ids, rejected = self.detector.detectMarkers(gray[y0:y1, x0:x1])
+            if ids is None or marker_id not in ids.flatten():
+                return None, None
+
+            index = list(ids.flatten()).index(marker_id)
+            found_corners.append(corners[index].reshape(1, 4, 2) + np.float32([x0, y0]))
+
+        return np.array(found_corners, dtype=np.float32), np.array(self.expected_ids).reshape(-1, 1)
+
+    def detect(self, frame, undistorted=False, search_quads=None, roi_padding=0.5,
+               marker_side_px=None):
+        """
+        Detect markers in a frame
+
+        Args:
+            frame: BGR camera frame
+            undistorted: True if frame is already undistorted ('frame' mode)
+            search_quads: Optional {marker_id: 4x2} quads from a previous
+                          detection; windows around them are searched first
+            roi_padding: Window padding as a fraction of the marker side
+            marker_side_px: Marker side from a previous detection (sizes the pyramid)
+
+        Returns:
+            MarkerDetection
+        """
+        if not undistorted:
+            frame = self.detection_frame(frame)
+
+        image_size = (frame.shape[1], frame.shape[0])
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+
+        start = time.perf_counter()
+        corners, ids, method = None, None, 'roi'
+        roi_missed, roi_ms = False, 0.0
+
+        if search_quads:
+            corners, ids = self._detect_windows(gray, search_quads, roi_padding)
+            roi_ms = (time.perf_counter() - start) * 1000.0
+            roi_missed = ids is None
+
+        if ids is None:
+            if self.pyramid:
+                corners, ids, method = self._detect_pyramid(gray, marker_side_px)
+            else:
+                corners, ids, rejected = self.detector.detectMarkers(gray)
+                method = 'full'
+
+        detect_ms = (time.perf_counter() - start) * 1000.0
+
+        if ids is None or len(ids) == 0:
+            raise ValueError("No ArUco markers detected in image")
+
+        quads = np.concatenate(corners).reshape(-1, 4, 2).astype(np.float32)
+        sides = np.linalg.norm(np.diff(quads, axis=1), axis=2)
+
+        # Correct only the detected corners instead of the whole frame
+        corrected = quads
+        if self.points_only:
+            corrected = self.undistort_points(quads.reshape(-1, 2), image_size).reshape(-1, 4, 2)
+
+        marker_ids = [int(marker_id) for marker_id in ids.flatten()]
+
+        return MarkerDetection(
+            image_size=image_size,
+            markers={marker_id: corrected[i].mean(axis=0) for i, marker_id in enumerate(marker_ids)},
+            marker_corners={marker_id: corrected[i] for i, marker_id in enumerate(marker_ids)},
+            quads={marker_id: quads[i] for i, marker_id in enumerate(marker_ids)},
+            marker_side_px=float(sides.mean()),
+            method=method,
+            detect_ms=detect_ms,
+            roi_missed=roi_missed,
+            roi_ms=roi_ms,
+        )
+
+    def compute_homography(self, markers):
+        """
+        Calculate homography from detected marker centers to jig coordinates
+
+        Args:
+            markers: {marker_id: center_px}
+
+        Returns:
+            (homography, used_marker_ids, missing_marker_ids)
+        """
+        # Build point correspondences
+        src_points = []  # Real-world mm coordinates
+        dst_points = []  # Image pixel coordinates
+        used = []
+        missing = []
+
+        for marker_id_str, marker_info in self.jig_config['markers'].items():
+            marker_id = int(marker_id_str)
+
+            if marker_id not in markers:
+                missing.append(marker_id)
+                continue
+
+            # Get real-world position (in mm)
+            src_points.append(marker_info['position_mm'])
+
+            # Get detected position (in pixels)
+            dst_points.append(markers[marker_id])
+            used.append(marker_id)
+
+        if len(src_points) < 4:
+            raise ValueError(f"Need at least 4 markers for accurate homography (found {len(src_points)})")
+
+        src_points = np.array(src_points, dtype=np.float32)
+        dst_points = np.array(dst_points, dtype=np.float32)
+
+        # Calculate homography: maps from mm coordinates to pixel coordinates
+        homography, mask = cv2.findHomography(src_points, dst_points, cv2.RANSAC, 5.0)
+
+        if homography is None:
+            raise ValueError("Failed to calculate homography")
+
+        return homography, tuple(used), tuple(missing)
+
+    def align(self, frame, undistorted=False, search_quads=None, roi_padding=0.5,
+              marker_side_px=None):
+        """
+        Detect markers and compute the homography for one frame
+
+        Args:
+            frame: BGR camera frame (see detect() for the other arguments)
+
+        Returns:
+            AlignmentResult
+        """
+        detection = self.detect(frame, undistorted=undistorted, search_quads=search_quads,
+                                roi_padding=roi_padding, marker_side_px=marker_side_px)
+        homography, used, missing = self.compute_homography(detection.markers)
+
+        return AlignmentResult(detection=detection, homography=homography,
+                               used_markers=used, missing_markers=missing)
+
+
+class MarkerRegionCache:
+    """
+    Jig-stationary fast path: reuse the last alignment while the marker
+    regions of the frame are unchanged
+
+    Low-resolution thumbnails of the padded marker regions are compared with
+    those of the last aligned frame. Within tolerance the cached
+    AlignmentResult is reused (no detection, no RANSAC); any change
+    invalidates the cache. Every lookup is recorded in an audit trail.
+    Lookups, stores and invalidations are serialized with a lock, so one
+    cache can serve concurrent requests (see align_daemon).
+    """
+
+    THUMBNAIL_SIZE = (16, 16)
+
+    def __init__(self, tolerance=3.0, padding=0.25, audit_size=100):
+        """
+        Initialize cache
+
+        Args:
+            tolerance: Max mean absolute thumbnail difference (grey levels)
+            padding: Region padding as a fraction of the marker side
+            audit_size: Number of lookups kept in the audit trail
+        """
+        self.tolerance = tolerance
+        self.padding = padding
+
+        self.result = None
+        self._regions = None
+        self._thumbnails = None
+
+        self.hits = 0
+        self.misses = 0
+        self.audit = deque(maxlen=audit_size)  # (unix time, max diff, hit)
+
+        self._lock = threading.Lock()
+
+    def _thumbnails_for(self, frame):
+        thumbnails = []
+        for x0, y0, x1, y1 in self._regions:
+            region = frame[y0:y1, x0:x1]
+            if region.ndim == 3:
+                region = cv2.cvtColor(region, cv2.COLOR_BGR2GRAY)
+            thumbnails.append(cv2.resize(region, self.THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA))
+
+        return np.stack(thumbnails).astype(np.int16)
+
+    def lookup(self, frame):
+        """
+        Cached result if the marker regions are unchanged
+
+        Args:
+            frame: Frame markers are searched in (see AlignmentCore.detection_frame)
+
+        Returns:
+            AlignmentResult or None (cache invalidated)
+        """
+        with self._lock:
+            if self.result is None:
+                return None
+
+            if (frame.shape[1], frame.shape[0]) != tuple(self.result.image_size):
+                self._clear()
+                return None
+
+            diff = np.abs(self._thumbnails_for(frame) - self._thumbnails).mean(axis=(1, 2)).max()
+            hit = bool(diff <= self.tolerance)
+            self.audit.append((time.time(), float(diff), hit))
+
+            if hit:
+                self.hits += 1
+                return self.result
+
+            self.misses += 1
+            self._clear()
+            return None
+
+    def store(self, frame, result):
+        """Remember an alignment and the marker-region thumbnails of its frame"""
+        height, width = frame.shape[:2]
+
+        regions = []
+        for quad in result.detection.quads.values():
+            side = np.linalg.norm(np.diff(quad, axis=0, append=quad[:1]), axis=1).mean()
+            pad = side * self.padding
+            x0, y0 = np.floor(quad.min(axis=0) - pad).astype(int)
+            x1, y1 = np.ceil(quad.max(axis=0) + pad).astype(int)
+            regions.append((max(x0, 0), max(y0, 0), min(x1, width), min(y1, height)))
+
+        with self._lock:
+            self._regions = regions
+            self._thumbnails = self._thumbnails_for(frame)
+            self.result = result
+
+    def invalidate(self):
+        """Forget the cached alignment"""
+        with self._lock:
+            self._clear()
+
+    def _clear(self):
+        self.result = None
+        self._regions = None
+        self._thumbnails = None
+
+    @property
+    def last_diff(self):
+        return self.audit[-1][1] if self.audit else None
+
+
+class ArucoAligner:
+    """
+    Detects ArUco markers and calculates precise alignment using homography
+
+    Stateful wrapper around AlignmentCore that keeps the current image and
+    results, and per-jig ROI tracks for stationary jigs.
+    """
+
+    UNDISTORT_MODES = AlignmentCore.UNDISTORT_MODES
+
+    # jig_name -> {'image_size', 'quads': {marker_id: 4x2 corners}} from the last detection
+    _roi_tracks = {}
+
+    # jig_name -> ROI hit/miss statistics
+    _roi_stats = {}
+
+    # (AlignmentCore.fingerprint, tolerance) -> MarkerRegionCache for the
+    # jig-stationary fast path
+    _stationary_caches = {}
+    _stationary_caches_lock = threading.Lock()
+
+    def __init__(self, jig_config_path, camera_config_path=None, undistort_mode='frame',
+                 pyramid=False, roi_tracking=False, roi_padding=0.5,
+                 reuse_stationary=False, stationary_tolerance=3.0):
+        """
+        Initialize aligner
+
+        Args:
+            jig_config_path: Path to jig configuration JSON
+            camera_config_path: Optional path to camera calibration YAML
+            undistort_mode: 'frame' undistorts the whole image before detection,
+                            'points' detects on the raw image and undistorts only
+                            the marker corners (full frame is undistorted lazily)
+            pyramid: Detect on a downscaled copy sized from marker_size_mm,
+                     then refine corners at full resolution
+            roi_tracking: Search first in windows around the jig's last known
+                          marker positions, falling back to a full-frame search
+            roi_padding: Window padding around each marker, as a fraction of
+                         the marker side length
+            reuse_stationary: Reuse the jig's cached homography while its
+                              marker regions are unchanged (MarkerRegionCache)
+            stationary_tolerance: Max mean thumbnail difference (grey levels)
+        """
+        if undistort_mode not in self.UNDISTORT_MODES:
+            raise ValueError(f"Unsupported undistort mode: {undistort_mode}")
+
+        jig_config = self.load_jig_config(jig_config_path)
+        undistorter = None
+        if camera_config_path:
+            undistorter = self.load_camera_calibration(camera_config_path)
+
+        core = AlignmentCore(jig_config, undistorter=undistorter,
+                             undistort_mode=undistort_mode, pyramid=pyramid)
+
+        self._init_state(core, roi_tracking, roi_padding)
+        self.reuse_stationary = reuse_stationary
+        self.stationary_tolerance = stationary_tolerance
+        self.jig_config_path = jig_config_path
+        self.camera_config_path = camera_config_path
+
+    @classmethod
+    def from_core(cls, core, roi_tracking=False, roi_padding=0.5,
+                  reuse_stationary=False, stationary_tolerance=3.0):
+        """
+        Wrap an existing (shared) AlignmentCore without reloading anything
+
+        Returns:
+            ArucoAligner
+        """
+        aligner = cls.__new__(cls)
+        aligner._init_state(core, roi_tracking, roi_padding)
+        aligner.reuse_stationary = reuse_stationary
+        aligner.stationary_tolerance = stationary_tolerance
+        aligner.jig_config_path = None
+        aligner.camera_config_path = None
+        return aligner
+
+    def _init_state(self, core, roi_tracking, roi_padding):
+        self.core = core
+        self.roi_tracking = roi_tracking
+        self.roi_padding = roi_padding
+
+        # Immutable resources live on the core
+        self.jig_config = core.jig_config
+        self.undistorter = core.undistorter
+        self.undistort_mode = core.undistort_mode
+        self.pyramid = core.pyramid
+        self.aruco_dict = core.aruco_dict
+        self.detector_params = core.detector_params
+        self.detector = core.detector
+        self.camera_matrix = core.undistorter.camera_matrix if core.undistorter else None
+        self.dist_coeffs = core.undistorter.dist_coeffs if core.undistorter else None
+
         # Storage for detection results
-        self.image = None
+        self.raw_image = None
+        self.image_size = None
+        self._image = None
         self.detected_markers = {}
+        self.marker_corners = {}
         self.homography = None
+        self.detection = None
+        self._cached_result = None
+        self._detection_frame = None
+
+        # Measured marker side (px) from the last detection, sizes the pyramid
+        self._marker_side_px = None
 
     def load_jig_config(self, config_path):
         """Load jig configuration (marker positions)"""
-        with open(config_path, 'r') as f:
-            config = json.load(f)
+        config = load_jig_config(config_path)
 
         print(f"✓ Loaded jig config: {config['jig_name']}")
         print(f"  Board size: {config['board_size_mm']}mm")
@@ -56,38 +752,77 @@ class ArucoAligner:
         return config
 
     def load_camera_calibration(self, calib_path):
-        """Load camera calibration data"""
-        fs = cv2.FileStorage(str(calib_path), cv2.FILE_STORAGE_READ)
+        """Load camera calibration data and its cached undistortion tables"""
+        undistorter = UndistortionEngine.from_file(calib_path)
 
-        if not fs.isOpened():
+        if undistorter is None:
             print(f"⚠ Could not load camera calibration: {calib_path}")
-            return
-
-        self.camera_matrix = fs.getNode('camera_matrix').mat()
-        self.dist_coeffs = fs.getNode('distortion_coefficients').mat()
-        fs.release()
+            return None
 
         print(f"✓ Loaded camera calibration: {calib_path}")
 
-    def load_image(self, image_path):
-        """Load camera snapshot image"""
-        self.image = cv2.imread(str(image_path))
-        if self.image is None:
-            raise ValueError(f"Could not load image: {image_path}")
-
-        # Undistort if calibration is available
-        if self.camera_matrix is not None:
-            h, w = self.image.shape[:2]
-            new_camera_matrix, roi = cv2.getOptimalNewCameraMatrix(
-                self.camera_matrix, self.dist_coeffs, (w, h), 1, (w, h)
-            )
-            self.image = cv2.undistort(
-                self.image, self.camera_matrix, self.dist_coeffs, None, new_camera_matrix
-            )
+        return undistorter
+
+    @property
+    def image(self):
+        """
+        Undistorted camera image
+
+        In 'points' mode the full frame is only undistorted on first access
+        (visualization/preview); alignment itself never needs it.
+        """
+        if self._image is None and self.raw_image is not None:
+            if self.undistorter is None:
+                self._image = self.raw_image
+            else:
+                with stage('undistort'):
+                    self._image = self.core.undistort(self.raw_image)
+        return self._image
+
+    @image.setter
+    def image(self, value):
+        self._image = value
+
+    @timed('load_image')
+    def load_image(self, image):
+        """
+        Load camera snapshot image
+
+        Args:
+            image: Path to the snapshot, or a BGR frame already in memory
+                   (used as is, no encode/decode round-trip)
+        """
+        if isinstance(image, np.ndarray):
+            self.raw_image = image
+        else:
+            self.raw_image = cv2.imread(str(image))
+            if self.raw_image is None:
+                raise ValueError(f"Could not load image: {image}")
+
+        self.image_size = (self.raw_image.shape[1], self.raw_image.shape[0])
+        self._image = None
+
+        # Undistort if calibration is available (single remap with cached tables)
+        if self.undistorter is not None and self.undistort_mode == 'frame':
+            with stage('undistort'):
+                self._image = self.core.undistort(self.raw_image)
             print("✓ Image undistorted using camera calibration")
 
-        print(f"✓ Loaded image: {self.image.shape[1]}x{self.image.shape[0]}")
+        print(f"✓ Loaded image: {self.image_size[0]}x{self.image_size[1]}")
 
+    def undistort_points(self, points_px):
+        """
+        Map raw-image pixel coordinates into the undistorted image
+
+        Args:
+            points_px: (N, 2) pixel coordinates in the raw image
+
+        Returns:
+            (N, 2) pixel coordinates in the undistorted image
+        """
+        return self.core.undistort_points(points_px, self.image_size)
+
+    @timed('detect_markers')
     def detect_markers(self):
         """
         Detect ArUco markers in the image
@@ -95,67 +830,155 @@ class ArucoAligner:
         Returns:
             dict: {marker_id: center_point}
         """
-        gray = cv2.cvtColor(self.image, cv2.COLOR_BGR2GRAY)
-
-        # Detect markers
-        corners, ids, rejected = self.detector.detectMarkers(gray)
+        jig_name = self.jig_config['jig_name']
+        search_quads = None
+
+        if self.roi_tracking:
+            track = self._roi_tracks.get(jig_name)
+            if track is not None and track['image_size'] == self.image_size:
+                search_quads = track['quads']
+
+        if self.core.points_only:
+            frame = self.raw_image
+        else:
+            frame = self.image
+
+        self._detection_frame = frame
+        self._cached_result = None
+
+        # Jig-stationary fast path: skip detection while marker regions are unchanged
+        if self.reuse_stationary:
+            cache = self._stationary_cache()
+            cached = cache.lookup(frame)
+
+            if cached is not None:
+                print(f"✓ Jig unchanged (marker region diff {cache.last_diff:.2f}), "
+                      f"reusing cached homography [{cache.hits} hits / {cache.misses} misses]")
+                self._cached_result = cached
+                self._set_detection(cached.detection)
+                return self.detected_markers
+
+            if cache.last_diff is not None and not cache.audit[-1][2]:
+                print(f"  Marker regions changed (diff {cache.last_diff:.2f}), re-detecting")
+
+        detection = self.core.detect(
+            frame, undistorted=True, search_quads=search_quads,
+            roi_padding=self.roi_padding, marker_side_px=self._marker_side_px
+        )
 
-        if ids is None or len(ids) == 0:
-            raise ValueError("No ArUco markers detected in image")
+        if detection.method == 'pyramid-fallback':
+            print("⚠ Pyramid level missed markers, retried at full resolution")
 
-        # Calculate center points of detected markers
-        self.detected_markers = {}
-        for i, marker_id in enumerate(ids.flatten()):
-            marker_id = int(marker_id)
-            corner_points = corners[i][0]
+        if self.roi_tracking:
+            self._record_roi(jig_name, detection)
 
-            # Calculate center point
-            center = np.mean(corner_points, axis=0)
-            self.detected_markers[marker_id] = center
+        self._set_detection(detection)
 
         print(f"✓ Detected {len(self.detected_markers)} markers: {list(self.detected_markers.keys())}")
 
         return self.detected_markers
 
-    def calculate_homography(self):
-        """
-        Calculate homography matrix from detected markers to jig coordinates
+    def _set_detection(self, detection):
+        self.detection = detection
+        self._marker_side_px = detection.marker_side_px
+        self.detected_markers = dict(detection.markers)
+        self.marker_corners = dict(detection.marker_corners)
+
+    def _stationary_cache(self):
+        # Another jig file, calibration or option never shares a cached result
+        key = (self.core.fingerprint, self.stationary_tolerance)
+
+        with self._stationary_caches_lock:
+            cache = self._stationary_caches.get(key)
+            if cache is None:
+                cache = self._stationary_caches[key] = MarkerRegionCache(tolerance=self.stationary_tolerance)
+            return cache
+
+    def pyramid_scale(self, image_size):
+        """Downscale factor for coarse detection (see AlignmentCore.pyramid_scale)"""
+        return self.core.pyramid_scale(image_size, self._marker_side_px)
+
+    def _jig_roi_stats(self, jig_name):
+        return self._roi_stats.setdefault(jig_name, {
+            'hits': 0, 'misses': 0, 'saved_ms': 0.0, 'full_ms': None,
+        })
+
+    def _record_roi(self, jig_name, detection):
+        """Update the jig's ROI track and hit/miss statistics"""
+        stats = self._jig_roi_stats(jig_name)
+
+        if detection.method == 'roi':
+            stats['hits'] += 1
+            if stats['full_ms'] is not None:
+                stats['saved_ms'] += stats['full_ms'] - detection.detect_ms
+
+            total = stats['hits'] + stats['misses']
+            print(f"✓ ROI tracking hit ({stats['hits']}/{total}), "
+                  f"{detection.detect_ms:.1f}ms, saved {stats['saved_ms']:.0f}ms so far")
+        else:
+            if detection.roi_missed:
+                stats['misses'] += 1
+                stats['saved_ms'] -= detection.roi_ms
+                print("⚠ ROI search missed a marker, falling back to full-frame search")
+            stats['full_ms'] = detection.detect_ms - detection.roi_ms
+
+        self._roi_tracks[jig_name] = {
+            'image_size': detection.image_size,
+            'quads': detection.quads,
+        }
 
-        Returns:
-            np.ndarray: 3x3 homography matrix
+    @classmethod
+    def roi_stats(cls, jig_name=None):
         """
-        # Build point correspondences
-        src_points = []  # Real-world mm coordinates
-        dst_points = []  # Image pixel coordinates
+        ROI tracking statistics, for tuning roi_padding
 
-        for marker_id_str, marker_info in self.jig_config['markers'].items():
-            marker_id = int(marker_id_str)
+        Args:
+            jig_name: Jig to report (default: all jigs)
 
-            if marker_id not in self.detected_markers:
-                print(f"⚠ Marker {marker_id} not detected, skipping")
+        Returns:
+            dict: {jig_name: {hits, misses, hit_ratio, saved_ms}}
+        """
+        report = {}
+        for name, stats in cls._roi_stats.items():
+            if jig_name is not None and name != jig_name:
                 continue
 
-            # Get real-world position (in mm)
-            real_pos = marker_info['position_mm']
-            src_points.append(real_pos)
+            total = stats['hits'] + stats['misses']
+            report[name] = {
+                'hits': stats['hits'],
+                'misses': stats['misses'],
+                'hit_ratio': stats['hits'] / total if total else 0.0,
+                'saved_ms': stats['saved_ms'],
+            }
 
-            # Get detected position (in pixels)
-            detected_pos = self.detected_markers[marker_id]
-            dst_points.append(detected_pos)
+        return report
 
-        if len(src_points) < 4:
-            raise ValueError(f"Need at least 4 markers for accurate homography (found {len(src_points)})")
+    @timed('calculate_homography')
+    def calculate_homography(self):
+        """
+        Calculate homography matrix from detected markers to jig coordinates
 
-        src_points = np.array(src_points, dtype=np.float32)
-        dst_points = np.array(dst_points, dtype=np.float32)
+        Returns:
+            np.ndarray: 3x3 homography matrix
+        """
+        if self._cached_result is not None:
+            self.homography = self._cached_result.homography
+            print("✓ Homography reused from jig-stationary cache")
+            return self.homography
 
-        # Calculate homography: maps from mm coordinates to pixel coordinates
-        self.homography, mask = cv2.findHomography(src_points, dst_points, cv2.RANSAC, 5.0)
+        for marker_id_str in self.jig_config['markers']:
+            if int(marker_id_str) not in self.detected_markers:
+                print(f"⚠ Marker {int(marker_id_str)} not detected, skipping")
 
-        if self.homography is None:
-            raise ValueError("Failed to calculate homography")
+        self.homography, used, missing = self.core.compute_homography(self.detected_markers)
+
+        print(f"✓ Homography calculated from {len(used)} markers")
 
-        print(f"✓ Homography calculated from {len(src_points)} markers")
+        if self.reuse_stationary and self.detection is not None:
+            self._stationary_cache().store(self._detection_frame, AlignmentResult(
+                detection=self.detection, homography=self.homography,
+                used_markers=used, missing_markers=missing
+            ))
 
         return self.homography
 
@@ -187,20 +1010,7 @@ class ArucoAligner:
         Returns:
             4 corner points in pixels
         """
-        x, y, w, h = rect_mm
-
-        # Define rectangle corners in mm
-        corners_mm = np.array([
-            [[x, y]],
-            [[x + w, y]],
-            [[x + w, y + h]],
-            [[x, y + h]]
-        ], dtype=np.float32)
-
-        # Transform to pixels
-        corners_px = cv2.perspectiveTransform(corners_mm, self.homography)
-
-        return corners_px.reshape(-1, 2)
+        return transform_rect_px(self.homography, rect_mm)
 
     def get_board_bounds_px(self):
         """
@@ -223,43 +1033,35 @@ class ArucoAligner:
         Returns:
             dict with alignment data
         """
-        # Transform design corners to pixels
-        corners_px = self.transform_rect(design_rect_mm)
+        return alignment_for_design(self.homography, design_rect_mm, self.image_size)
 
-        # Calculate center
-        center_px = np.mean(corners_px, axis=0)
+    def calculate_alignment_for_designs(self, design_rects_mm):
+        """
+        Calculate alignment data for many designs at once
 
-        # Calculate rotation (angle of bottom edge)
-        bottom_left = corners_px[0]
-        bottom_right = corners_px[1]
-        angle_rad = np.arctan2(
-            bottom_right[1] - bottom_left[1],
-            bottom_right[0] - bottom_left[0]
-        )
-        angle_deg = np.degrees(angle_rad)
-
-        # Calculate size in pixels
-        width_px = np.linalg.norm(bottom_right - bottom_left)
-        height_px = np.linalg.norm(corners_px[3] - bottom_left)
-
-        result = {
-            'design_rect_mm': design_rect_mm,
-            'center_px': center_px.tolist(),
-            'corners_px': corners_px.tolist(),
-            'angle_deg': float(angle_deg),
-            'size_px': [float(width_px), float(height_px)],
-            'image_size': [self.image.shape[1], self.image.shape[0]]
-        }
+        One vectorized transform for all rects; use split_design_alignments()
+        for per-design dicts.
+
+        Args:
+            design_rects_mm: (N, 4) array of (x, y, width, height) in millimeters
 
-        return result
+        Returns:
+            dict of arrays (see alignment_for_designs)
+        """
+        if self.homography is None:
+            raise ValueError("Homography not calculated yet")
+
+        return alignment_for_designs(self.homography, design_rects_mm, self.image_size)
 
-    def visualize_detection(self, output_path=None, design_rect_mm=None):
+    @timed('visualize_detection')
+    def visualize_detection(self, output_path=None, design_rect_mm=None, writer=None):
         """
         Visualize detected markers and alignment
 
         Args:
             output_path: Optional path to save visualization
             design_rect_mm: Optional design rectangle to overlay
+            writer: Optional ArtifactWriter to save in the background
         """
         vis_img = self.image.copy()
 
@@ -315,20 +1117,27 @@ class ArucoAligner:
             cv2.putText(vis_img, "Design", (design_center[0] + 10, design_center[1]),
                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 0, 255), 2)
 
-        if output_path:
+        if output_path and writer is not None:
+            writer.write_image(output_path, vis_img)
+            print(f"✓ Visualization queued: {output_path}")
+        elif output_path:
             cv2.imwrite(str(output_path), vis_img)
             print(f"✓ Visualization saved: {output_path}")
 
         return vis_img
 
-    def process(self, image_path, design_rect_mm=None, visualize=True):
+    def process(self, image_path, design_rect_mm=None, visualize=True, writer=None,
+                visualization_path=None):
         """
         Complete alignment process
 
         Args:
-            image_path: Path to camera snapshot
+            image_path: Path to camera snapshot (or an in-memory BGR frame)
             design_rect_mm: Optional (x, y, width, height) of design in mm
             visualize: Create visualization output
+            writer: Optional ArtifactWriter to save the visualization in the background
+            visualization_path: Where to save the visualization (default: next
+                                to the snapshot; not saved for in-memory frames)
 
         Returns:
             dict with alignment data
@@ -353,8 +1162,9 @@ class ArucoAligner:
             print(f"  Size: {alignment_data['size_px'][0]:.1f}x{alignment_data['size_px'][1]:.1f} px")
 
         if visualize:
-            vis_path = Path(image_path).parent / f"{Path(image_path).stem}_aligned.jpg"
-            self.visualize_detection(vis_path, design_rect_mm)
+            if visualization_path is None and not isinstance(image_path, np.ndarray):
+                visualization_path = Path(image_path).parent / f"{Path(image_path).stem}_aligned.jpg"
+            self.visualize_detection(visualization_path, design_rect_mm, writer=writer)
 
         print(f"\n{'='*60}")
         print(f"Alignment Complete")
@@ -362,13 +1172,134 @@ class ArucoAligner:
 
         return alignment_data
 
+    def process_batch(self, image_paths, workers=None, design_rect_mm=None, visualize=False):
+        """
+        Align many snapshots in a process pool
+
+        Each worker builds its own ArucoAligner from this aligner's jig
+        config and calibration (sent to the worker, so aligners made with
+        from_core work too) with OpenCV threading capped to one thread.
+        Failures are reported per image without aborting the batch.
+
+        Args:
+            image_paths: Iterable of snapshot paths
+            workers: Number of worker processes (default: CPU count)
+            design_rect_mm: Optional (x, y, width, height) of design in mm
+            visualize: Write *_aligned.jpg next to each snapshot
+
+        Yields:
+            dict per image, in completion order
+        """
+        image_paths = [str(path) for path in image_paths]
+        workers = workers or os.cpu_count() or 1
+
+        core_options = {
+            'undistort_mode': self.undistort_mode,
+            'pyramid': self.pyramid,
+        }
+        aligner_options = {
+            'roi_tracking': self.roi_tracking,
+            'roi_padding': self.roi_padding,
+            'reuse_stationary': self.reuse_stationary,
+            'stationary_tolerance': self.stationary_tolerance,
+        }
+
+        with ProcessPoolExecutor(
+            max_workers=min(workers, max(len(image_paths), 1)),
+            initializer=_init_batch_worker,
+            initargs=(self.jig_config, self.undistorter, core_options, aligner_options)
+        ) as pool:
+            futures = [
+                pool.submit(_align_batch_image, path, design_rect_mm, visualize)
+                for path in image_paths
+            ]
+
+            for future in as_completed(futures):
+                yield future.result()
+
+
+# Per-process aligner used by process_batch workers
+_batch_aligner = None
+
+
+def _init_batch_worker(jig_config, undistorter, core_options, aligner_options):
+    """Build the worker's aligner once and keep OpenCV single-threaded"""
+    global _batch_aligner
+
+    cv2.setNumThreads(1)
+
+    # Progress output from workers would interleave with streamed results
+    sys.stdout = open(os.devnull, 'w')
+
+    core = AlignmentCore(jig_config, undistorter=undistorter, **core_options)
+    _batch_aligner = ArucoAligner.from_core(core, **aligner_options)
+
+
+def _align_batch_image(image_path, design_rect_mm, visualize):
+    """Align one batch image, returning a JSON-serializable result"""
+    start = time.perf_counter()
+
+    try:
+        alignment_data = _batch_aligner.process(
+            image_path, design_rect_mm=design_rect_mm, visualize=visualize
+        )
+
+        return {
+            'image': image_path,
+            'ok': True,
+            'markers': sorted(_batch_aligner.detected_markers),
+            'homography': _batch_aligner.homography.tolist(),
+            'alignment': alignment_data,
+            'elapsed_ms': (time.perf_counter() - start) * 1000.0,
+        }
+
+    except Exception as e:
+        return {
+            'image': image_path,
+            'ok': False,
+            'error': f"{type(e).__name__}: {e}",
+            'elapsed_ms': (time.perf_counter() - start) * 1000.0,
+        }
+
+
+def run_batch(aligner, pattern, workers=None, design_rect_mm=None, visualize=False):
+    """
+    Align all images matching a glob, streaming JSON Lines to stdout
+
+    Returns:
+        int: Number of failed images
+    """
+    import glob
+
+    image_paths = sorted(glob.glob(pattern, recursive=True))
+    if not image_paths:
+        print(f"⚠ No images match: {pattern}", file=sys.stderr)
+        return 0
+
+    print(f"Aligning {len(image_paths)} images with {workers or os.cpu_count()} workers...",
+          file=sys.stderr)
+
+    failures = 0
+    for result in aligner.process_batch(image_paths, workers=workers,
+                                        design_rect_mm=design_rect_mm, visualize=visualize):
+        failures += not result['ok']
+        print(json.dumps(result), flush=True)
+
+    print(f"✓ Aligned {len(image_paths) - failures}/{len(image_paths)} images", file=sys.stderr)
+
+    return failures
+
 
 def main():
     """CLI interface"""
     import argparse
 
     parser = argparse.ArgumentParser(description='ArUco-based laser engraving alignment')
-    parser.add_argument('image', help='Camera snapshot image')
+    parser.add_argument('image', nargs='?', help='Camera snapshot image')
+    parser.add_argument('--batch', metavar='GLOB',
+                       help='Align all snapshots matching GLOB, streaming JSON Lines')
+    parser.add_argument('--workers', type=int,
+                       help='Worker processes for --batch (default: CPU count)')
     parser.add_argument('--jig-config', default='config/jigs/default.json',
                        help='Jig configuration file')
     parser.add_argument('--camera-calib', default='config/camera.yml',
@@ -377,18 +1308,43 @@ def main():
                        help='Design rectangle in mm (x y width height)')
     parser.add_argument('--no-viz', action='store_true',
                        help='Skip visualization output')
+    parser.add_argument('--undistort-points', action='store_true',
+                       help='Detect on the raw image and undistort only marker corners')
+    parser.add_argument('--pyramid', action='store_true',
+                       help='Coarse-to-fine detection for high-resolution cameras')
 
     args = parser.parse_args()
 
+    if not args.image and not args.batch:
+        parser.error("Must specify an image or --batch GLOB")
+
     # Check if camera calibration exists
     camera_calib = args.camera_calib if Path(args.camera_calib).exists() else None
 
-    try:
-        aligner = ArucoAligner(args.jig_config, camera_calib)
+    design_rect = None
+    if args.design:
+        design_rect = tuple(args.design)
 
-        design_rect = None
-        if args.design:
-            design_rect = tuple(args.design)
+    try:
+        if args.batch:
+            # Keep stdout clean for the JSON Lines stream
+            import contextlib
+            with contextlib.redirect_stdout(sys.stderr):
+                aligner = ArucoAligner(
+                    args.jig_config, camera_calib,
+                    undistort_mode='points' if args.undistort_points else 'frame',
+                    pyramid=args.pyramid
+                )
+
+            failures = run_batch(aligner, args.batch, workers=args.workers,
+                                 design_rect_mm=design_rect, visualize=not args.no_viz)
+            return 1 if failures else 0
+
+        aligner = ArucoAligner(
+            args.jig_config, camera_calib,
+            undistort_mode='points' if args.undistort_points else 'frame',
+            pyramid=args.pyramid
+        )
 
         alignment_data = aligner.process(
             args.image,
@@ -0,0 +1,876 @@
+#!/usr/bin/env python3
+"""
+Performance Benchmarks
+Measure per-stage latency of the alignment pipeline on synthetic frames
+"""
+
+import cv2
+import numpy as np
+from pathlib import Path
+import contextlib
+import io
+import tempfile
+import time
+
+
+RESOLUTIONS = {
+    '1080p': (1920, 1080),
+    '4K': (3840, 2160),
+    '12MP': (4000, 3000),
+}
+
+
+def time_call(func, repeat=10, warmup=1):
+    """
+    Time a callable
+
+    Args:
+        func: Callable with no arguments
+        repeat: Number of timed runs
+        warmup: Number of untimed runs first
+
+    Returns:
+        Median duration in milliseconds
+    """
+    for _ in range(warmup):
+        func()
+
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1000.0)
+
+    return float(np.median(durations))
+
+
+def quiet(func):
+    """Wrap a callable so its progress output is discarded"""
+    def wrapper():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return func()
+    return wrapper
+
+
+def synthetic_frame(image_size, work_dir):
+    """Create a synthetic jig frame (see test_alignment.py) at the given size"""
+    from test_alignment import create_test_image_with_markers
+
+    base_path = create_test_image_with_markers(Path(work_dir) / 'bench_frame.jpg')
+    frame = cv2.imread(str(base_path))
+
+    if (frame.shape[1], frame.shape[0]) != tuple(image_size):
+        frame = cv2.resize(frame, tuple(image_size), interpolation=cv2.INTER_LINEAR)
+
+    return frame
+
+
+def synthetic_calibration(image_size):
+    """Plausible wide-angle calibration for an image size"""
+    w, h = image_size
+    camera_matrix = np.array([
+        [0.9 * w, 0, w / 2.0],
+        [0, 0.9 * w, h / 2.0],
+        [0, 0, 1]
+    ], dtype=np.float64)
+    dist_coeffs = np.array([[-0.25, 0.08, 0.001, -0.001, 0.0]], dtype=np.float64)
+
+    return camera_matrix, dist_coeffs
+
+
+def bench_undistort(args):
+    """Per-frame undistortion: cv2.undistort vs cached remap tables"""
+    from undistort import UndistortionEngine
+
+    print(f"\n{'='*60}")
+    print("Benchmark: Undistortion")
+    print(f"{'='*60}\n")
+
+    rows = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for name in args.resolutions:
+            size = RESOLUTIONS[name]
+            frame = synthetic_frame(size, work_dir)
+            camera_matrix, dist_coeffs = synthetic_calibration(size)
+
+            def legacy():
+                new_camera_matrix, roi = cv2.getOptimalNewCameraMatrix(
+                    camera_matrix, dist_coeffs, size, 1, size
+                )
+                return cv2.undistort(frame, camera_matrix, dist_coeffs, None, new_camera_matrix)
+
+            engine = UndistortionEngine(camera_matrix, dist_coeffs, cache_dir=work_dir)
+
+            # First frame builds and persists the tables
+            start = time.perf_counter()
+            engine.undistort(frame)
+            cold_ms = (time.perf_counter() - start) * 1000.0
+
+            # Fresh process equivalent: tables come from disk
+            UndistortionEngine.clear_memory_cache()
+            start = time.perf_counter()
+            engine.undistort(frame)
+            disk_ms = (time.perf_counter() - start) * 1000.0
+
+            legacy_ms = time_call(legacy, repeat=args.repeat)
+            remap_ms = time_call(lambda: engine.undistort(frame), repeat=args.repeat)
+
+            rows.append((name, legacy_ms, cold_ms, disk_ms, remap_ms))
+
+    print(f"\n{'Resolution':<12}{'undistort':>12}{'build':>12}{'disk load':>12}{'remap':>12}{'speedup':>10}")
+    for name, legacy_ms, cold_ms, disk_ms, remap_ms in rows:
+        print(f"{name:<12}{legacy_ms:>10.1f}ms{cold_ms:>10.1f}ms{disk_ms:>10.1f}ms"
+              f"{remap_ms:>10.1f}ms{legacy_ms / remap_ms:>9.1f}x")
+
+    return rows
+
+
+def write_calibration(calib_path, image_size):
+    """Write synthetic_calibration() in calibrate.py's YAML format"""
+    camera_matrix, dist_coeffs = synthetic_calibration(image_size)
+
+    fs = cv2.FileStorage(str(calib_path), cv2.FILE_STORAGE_WRITE)
+    fs.write('camera_matrix', camera_matrix)
+    fs.write('distortion_coefficients', dist_coeffs)
+    fs.release()
+
+    return calib_path
+
+
+def bench_points(args):
+    """Alignment latency: full-frame undistortion vs points-only undistortion"""
+    from aruco_align import ArucoAligner
+
+    print(f"\n{'='*60}")
+    print("Benchmark: Points-Only Undistortion")
+    print(f"{'='*60}\n")
+
+    rows = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for name in args.resolutions:
+            size = RESOLUTIONS[name]
+            frame_path = Path(work_dir) / f'{name}.png'
+            cv2.imwrite(str(frame_path), synthetic_frame(size, work_dir))
+            calib_path = write_calibration(Path(work_dir) / f'camera_{name}.yml', size)
+
+            timings = {}
+            for mode in ArucoAligner.UNDISTORT_MODES:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    aligner = ArucoAligner(args.jig_config, calib_path, undistort_mode=mode)
+
+                def align():
+                    aligner.load_image(frame_path)
+                    aligner.detect_markers()
+                    aligner.calculate_homography()
+
+                timings[mode] = time_call(quiet(align), repeat=args.repeat)
+
+            rows.append((name, timings['frame'], timings['points']))
+
+    print(f"\n{'Resolution':<12}{'frame':>12}{'points':>12}{'speedup':>10}")
+    for name, frame_ms, points_ms in rows:
+        print(f"{name:<12}{frame_ms:>10.1f}ms{points_ms:>10.1f}ms{frame_ms / points_ms:>9.1f}x")
+
+    return rows
+
+
+def bench_pyramid(args):
+    """Marker detection: full resolution vs coarse-to-fine pyramid"""
+    from aruco_align import ArucoAligner
+
+    print(f"\n{'='*60}")
+    print("Benchmark: Pyramid Detection")
+    print(f"{'='*60}\n")
+
+    rows = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for name in args.resolutions:
+            size = RESOLUTIONS[name]
+            frame_path = Path(work_dir) / f'{name}.png'
+            cv2.imwrite(str(frame_path), synthetic_frame(size, work_dir))
+
+            timings = {}
+            centers = {}
+            for pyramid in (False, True):
+                with contextlib.redirect_stdout(io.StringIO()):
+                    aligner = ArucoAligner(args.jig_config, pyramid=pyramid)
+                    aligner.load_image(frame_path)
+
+                timings[pyramid] = time_call(quiet(aligner.detect_markers), repeat=args.repeat)
+                centers[pyramid] = aligner.detected_markers
+
+            deviation = max(
+                np.linalg.norm(centers[True][marker_id] - center)
+                for marker_id, center in centers[False].items()
+            )
+            rows.append((name, timings[False], timings[True], deviation))
+
+    print(f"\n{'Resolution':<12}{'full':>12}{'pyramid':>12}{'speedup':>10}{'max dev':>12}")
+    for name, full_ms, pyramid_ms, deviation in rows:
+        print(f"{name:<12}{full_ms:>10.1f}ms{pyramid_ms:>10.1f}ms"
+              f"{full_ms / pyramid_ms:>9.1f}x{deviation:>10.3f}px")
+
+    return rows
+
+
+def bench_roi(args):
+    """ROI-tracked detection: hit ratio and time saved per window padding"""
+    from aruco_align import ArucoAligner
+
+    print(f"\n{'='*60}")
+    print("Benchmark: ROI Tracking")
+    print(f"{'='*60}\n")
+
+    rng = np.random.default_rng(0)
+    paddings = (0.1, 0.25, 0.5, 1.0)
+
+    rows = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for name in args.resolutions:
+            frame = synthetic_frame(RESOLUTIONS[name], work_dir)
+
+            # Stationary jig with small bumps between shots
+            shifts = rng.integers(-40, 41, size=(args.repeat, 2))
+            frames = [np.roll(frame, (int(dy), int(dx)), axis=(0, 1)) for dy, dx in shifts]
+
+            for padding in paddings:
+                ArucoAligner._roi_tracks.clear()
+                ArucoAligner._roi_stats.clear()
+
+                with contextlib.redirect_stdout(io.StringIO()):
+                    aligner = ArucoAligner(args.jig_config, roi_tracking=True, roi_padding=padding)
+                    for shot in [frame] + frames:
+                        aligner.raw_image = aligner.image = shot
+                        aligner.image_size = (shot.shape[1], shot.shape[0])
+                        aligner.detect_markers()
+
+                stats = ArucoAligner.roi_stats()[aligner.jig_config['jig_name']]
+                rows.append((name, padding, stats['hit_ratio'], stats['saved_ms'] / args.repeat))
+
+    print(f"\n{'Resolution':<12}{'padding':>10}{'hit ratio':>12}{'saved/shot':>14}")
+    for name, padding, hit_ratio, saved_ms in rows:
+        print(f"{name:<12}{padding:>10.2f}{hit_ratio:>12.2f}{saved_ms:>12.1f}ms")
+
+    return rows
+
+
+def bench_designs(args):
+    """Design alignment throughput: per-rect calls vs one vectorized call"""
+    from aruco_align import AlignmentCore
+
+    print(f"\n{'='*60}")
+    print("Benchmark: Multi-Design Alignment")
+    print(f"{'='*60}\n")
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        frame = synthetic_frame(RESOLUTIONS['1080p'], work_dir)
+
+    result = AlignmentCore.from_files(args.jig_config).align(frame)
+    rng = np.random.default_rng(0)
+
+    rows = []
+    for count in (20, 60, 1000, 10000):
+        rects = np.column_stack([
+            rng.uniform(0, 150, count), rng.uniform(0, 150, count),
+            rng.uniform(10, 50, count), rng.uniform(10, 50, count),
+        ])
+
+        loop_ms = time_call(lambda: [result.alignment_for_design(tuple(rect)) for rect in rects],
+                            repeat=max(1, args.repeat // 5))
+        batch_ms = time_call(lambda: result.alignment_for_designs(rects), repeat=args.repeat)
+        rows.append((count, loop_ms, batch_ms))
+
+    print(f"\n{'Designs':<10}{'per-rect':>12}{'batch':>12}{'placements/s':>16}{'speedup':>10}")
+    for count, loop_ms, batch_ms in rows:
+        print(f"{count:<10}{loop_ms:>10.2f}ms{batch_ms:>10.3f}ms"
+              f"{count / batch_ms * 1000.0:>16,.0f}{loop_ms / batch_ms:>9.1f}x")
+
+    return rows
+
+
+def bench_frames(args):
+    """Capture-to-alignment: JPEG snapshot round-trip vs in-memory frame"""
+    from aruco_align import ArucoAligner
+
+    print(f"\n{'='*60}")
+    print("Benchmark: In-Memory Frames")
+    print(f"{'='*60}\n")
+
+    rows = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        snapshot_path = Path(work_dir) / 'camera_snapshot.jpg'
+
+        for name in args.resolutions:
+            frame = synthetic_frame(RESOLUTIONS[name], work_dir)
+            with contextlib.redirect_stdout(io.StringIO()):
+                aligner = ArucoAligner(args.jig_config)
+
+            def round_trip():
+                # Old path: encode snapshot, decode for detection and again for the preview
+                cv2.imwrite(str(snapshot_path), frame)
+                aligner.load_image(snapshot_path)
+                aligner.detect_markers()
+                aligner.calculate_homography()
+                cv2.imread(str(snapshot_path))
+
+            def in_memory():
+                aligner.load_image(frame)
+                aligner.detect_markers()
+                aligner.calculate_homography()
+
+            file_ms = time_call(quiet(round_trip), repeat=args.repeat)
+            memory_ms = time_call(quiet(in_memory), repeat=args.repeat)
+            rows.append((name, file_ms, memory_ms))
+
+    print(f"\n{'Resolution':<12}{'JPEG file':>12}{'in memory':>12}{'saved':>12}")
+    for name, file_ms, memory_ms in rows:
+        print(f"{name:<12}{file_ms:>10.1f}ms{memory_ms:>10.1f}ms{file_ms - memory_ms:>10.1f}ms")
+
+    return rows
+
+
+def bench_warp(args):
+    """Preview warp: full-frame warp and float blend vs region-limited warp"""
+    import tracemalloc
+    from aruco_align import AlignmentCore
+    from design_warp import DesignWarper
+
+    print(f"\n{'='*60}")
+    print("Benchmark: Preview Warp")
+    print(f"{'='*60}\n")
+
+    rgba = np.zeros((944, 1181, 4), dtype=np.uint8)  # 100x80mm @ 300 DPI
+    rgba[:, :, 3] = np.linspace(0, 255, rgba.shape[1], dtype=np.uint8)[np.newaxis, :]
+
+    def peak_mb(func):
+        tracemalloc.start()
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return peak / 1e6
+
+    rows = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for name in args.resolutions:
+            frame = synthetic_frame(RESOLUTIONS[name], work_dir)
+            alignment_data = AlignmentCore.from_files(args.jig_config).align(frame) \
+                .alignment_for_design((50, 50, 100, 80))
+
+            warper = DesignWarper(alignment_data)
+            warper.design_image = rgba
+
+            def legacy():
+                # Previous implementation: full-frame warp, float64 alpha blend
+                h, w = rgba.shape[:2]
+                src = np.array([[0, 0], [w, 0], [w, h], [0, h]], dtype=np.float32)
+                M = cv2.getPerspectiveTransform(src, np.array(alignment_data['corners_px'], dtype=np.float32))
+                warped = cv2.warpPerspective(rgba, M, (frame.shape[1], frame.shape[0]),
+                                             flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_CONSTANT,
+                                             borderValue=(255, 255, 255, 0))
+                alpha = np.expand_dims(warped[:, :, 3] / 255.0, axis=2)
+                return (alpha * warped[:, :, :3] + (1 - alpha) * frame).astype(np.uint8)
+
+            roi = quiet(lambda: warper.warp_to_alignment(frame))
+
+            rows.append((name, time_call(legacy, repeat=args.repeat), peak_mb(legacy),
+                         time_call(roi, repeat=args.repeat), peak_mb(roi)))
+
+    print(f"\n{'Resolution':<12}{'full frame':>12}{'peak':>10}{'ROI':>12}{'peak':>10}{'speedup':>10}")
+    for name, full_ms, full_mb, roi_ms, roi_mb in rows:
+        print(f"{name:<12}{full_ms:>10.1f}ms{full_mb:>8.0f}MB{roi_ms:>10.1f}ms{roi_mb:>8.0f}MB"
+              f"{full_ms / roi_ms:>9.1f}x")
+
+    return rows
+
+
+def bench_overlay(args):
+    """Live design overlay: per-frame warp_to_alignment vs cached LiveOverlay"""
+    from aruco_align import AlignmentCore
+    from design_warp import DesignWarper, LiveOverlay
+
+    print(f"\n{'='*60}")
+    print("Benchmark: Live Design Overlay")
+    print(f"{'='*60}\n")
+
+    rect = (50, 50, 100, 80)
+    nudge = np.array([[1, 0, 3], [0, 1, -2], [0, 0, 1]], dtype=np.float64)
+
+    rows = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for name in args.resolutions:
+            frame = synthetic_frame(RESOLUTIONS[name], work_dir)
+            frame_size = (frame.shape[1], frame.shape[0])
+            H = AlignmentCore.from_files(args.jig_config).align(frame).homography
+
+            overlay = quiet(lambda: LiveOverlay.from_design(rect, text="LIVE"))()
+            warper = DesignWarper(AlignmentCore.from_files(args.jig_config).align(frame)
+                                  .alignment_for_design(rect), dpi=100)
+            warper.design_image = overlay.design_image
+
+            def steady():
+                overlay.update(H, frame_size)
+                return overlay.compose(frame)
+
+            homographies = [H, nudge @ H]
+            moving_index = [0]
+
+            def moving():
+                # Jig nudged every frame: cached ROI is shifted, not re-warped
+                moving_index[0] += 1
+                overlay.update(homographies[moving_index[0] % 2], frame_size)
+                return overlay.compose(frame)
+
+            warp_ms = time_call(quiet(lambda: warper.warp_to_alignment(frame)), repeat=args.repeat)
+            steady_ms = time_call(steady, repeat=args.repeat * 10)
+            moving_ms = time_call(moving, repeat=args.repeat * 10)
+            rows.append((name, warp_ms, steady_ms, moving_ms))
+
+    print(f"\n{'Resolution':<12}{'warp/frame':>12}{'steady':>12}{'nudged':>12}{'steady fps':>12}")
+    for name, warp_ms, steady_ms, moving_ms in rows:
+        print(f"{name:<12}{warp_ms:>10.2f}ms{steady_ms:>10.2f}ms{moving_ms:>10.2f}ms{1000.0 / steady_ms:>12.0f}")
+
+    return rows
+
+
+def bench_export_cache(args):
+    """Export stage: full resize + PNG encode vs content-addressed cache hit"""
+    from design_warp import DesignWarper
+    from export_cache import ExportCache
+
+    print(f"\n{'='*60}")
+    print("Benchmark: Export Cache")
+    print(f"{'='*60}\n")
+
+    rows = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        output_path = Path(work_dir) / 'aligned_design.png'
+
+        for dpi in (300, 600):
+            warper = DesignWarper({'design_rect_mm': [0, 0, 100, 80]}, dpi=dpi)
+            quiet(lambda: warper.create_design_from_text("Serial #12345", (100, 80)))()
+            cache = ExportCache(Path(work_dir) / f'cache_{dpi}')
+
+            export_ms = time_call(quiet(lambda: warper.export_for_lightburn(output_path)),
+                                  repeat=args.repeat)
+            hit_ms = time_call(quiet(lambda: warper.export_for_lightburn(output_path, cache=cache)),
+                               repeat=args.repeat)
+            rows.append((dpi, export_ms, hit_ms))
+
+    print(f"\n{'DPI':<8}{'export':>12}{'cache hit':>12}{'speedup':>10}")
+    for dpi, export_ms, hit_ms in rows:
+        print(f"{dpi:<8}{export_ms:>10.1f}ms{hit_ms:>10.1f}ms{export_ms / hit_ms:>9.1f}x")
+
+    return rows
+
+
+def bench_png(args):
+    """PNG encode time and size: PIL optimize (previous path) vs direct colour vs 1-bit"""
+    from PIL import Image
+    from design_warp import DesignWarper
+    from png_writer import encode_png, encode_png_1bit, to_monochrome
+
+    print(f"\n{'='*60}")
+    print("Benchmark: PNG Export Encoding")
+    print(f"{'='*60}\n")
+
+    def encode_pil(image, dpi):
+        buffer = io.BytesIO()
+        Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB)).save(buffer, format='PNG',
+                                                                      dpi=(dpi, dpi), optimize=True)
+        return buffer.getvalue()
+
+    encoders = [
+        ('PIL optimize', lambda image, dpi: encode_pil(image, dpi)),
+        ('colour L6', lambda image, dpi: encode_png(image, dpi, level=6, strategy='default')),
+        ('colour L6 rle', lambda image, dpi: encode_png(image, dpi, level=6)),
+        ('1-bit L6 up', lambda image, dpi: encode_png_1bit(to_monochrome(image), dpi, level=6,
+                                                            strategy='default')),
+        ('1-bit L6 up rle', lambda image, dpi: encode_png_1bit(to_monochrome(image), dpi, level=6)),
+        ('1-bit L9 adaptive', lambda image, dpi: encode_png_1bit(to_monochrome(image), dpi, level=9,
+                                                                  png_filter='adaptive')),
+        ('1-bit dither L6', lambda image, dpi: encode_png_1bit(to_monochrome(image, 'dither'), dpi,
+                                                                level=6)),
+    ]
+
+    rows = []
+    for dpi in (300, 600, 1000):
+        warper = DesignWarper({'design_rect_mm': [0, 0, 100, 80]}, dpi=dpi)
+        quiet(lambda: warper.create_design_from_text("Serial #12345", (100, 80)))()
+        image = warper.design_image
+
+        for name, encode in encoders:
+            encode_ms = time_call(lambda: encode(image, dpi), repeat=args.repeat)
+            rows.append((dpi, name, encode_ms, len(encode(image, dpi))))
+
+    print(f"\n{'DPI':<8}{'Encoder':<20}{'encode':>12}{'size':>12}")
+    for dpi, name, encode_ms, size in rows:
+        print(f"{dpi:<8}{name:<20}{encode_ms:>10.1f}ms{size / 1024.0:>10.1f}KB")
+
+    return rows
+
+
+def bench_stream(args):
+    """Large-panel export: full-buffer resize + encode vs strip-wise streaming"""
+    import tracemalloc
+    from design_warp import DesignWarper
+
+    print(f"\n{'='*60}")
+    print("Benchmark: Streaming Export (600x400mm panel)")
+    print(f"{'='*60}\n")
+
+    # 150 DPI source artwork, exported at increasing DPI
+    panel_mm = (600, 400)
+    source = DesignWarper({'design_rect_mm': [0, 0, *panel_mm]}, dpi=150)
+    quiet(lambda: source.create_design_from_text("PANEL 600x400", panel_mm, raster=True,
+                                                 font_scale=60, thickness=90))()
+
+    def measure(func):
+        tracemalloc.start()
+        start = time.perf_counter()
+        quiet(func)()
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return elapsed_ms, peak / (1024.0 * 1024.0)
+
+    rows = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        output_path = Path(work_dir) / 'panel.png'
+
+        for dpi in (300, 600, 1000):
+            warper = DesignWarper({'design_rect_mm': [0, 0, *panel_mm]}, dpi=dpi)
+            warper.design_image = source.design_image
+
+            for mono in (None, 'threshold'):
+                result = []
+                for streaming in (False, True):
+                    result.extend(measure(lambda: warper.export_for_lightburn(
+                        output_path, mono=mono, streaming=streaming)))
+                rows.append((dpi, mono or 'colour', *result))
+
+    print(f"\n{'DPI':<8}{'mode':<12}{'full':>12}{'peak':>10}{'streamed':>12}{'peak':>10}")
+    for dpi, mode, full_ms, full_mb, stream_ms, stream_mb in rows:
+        print(f"{dpi:<8}{mode:<12}{full_ms:>10.0f}ms{full_mb:>8.0f}MB{stream_ms:>10.0f}ms{stream_mb:>8.0f}MB")
+
+    return rows
+
+
+def synthetic_svg(count=200):
+    """Line-art SVG with circles, rounded rectangles and arc paths (200x150 units)"""
+    rng = np.random.default_rng(0)
+    shapes = []
+    for i in range(count):
+        x, y = rng.uniform(10, 190), rng.uniform(10, 140)
+        r = rng.uniform(1, 6)
+        kind = i % 3
+        if kind == 0:
+            shapes.append(f'<circle cx="{x:.2f}" cy="{y:.2f}" r="{r:.2f}" fill="none" stroke="black" />')
+        elif kind == 1:
+            shapes.append(f'<rect x="{x:.2f}" y="{y:.2f}" width="{2 * r:.2f}" height="{r:.2f}" '
+                          f'rx="{r / 4:.2f}" fill="black" />')
+        else:
+            shapes.append(f'<path d="M{x:.2f},{y:.2f} a{r:.2f},{r:.2f} 0 1,1 {r:.2f},{r:.2f} '
+                          f'q{r:.2f},{-r:.2f} {2 * r:.2f},0 z" fill="black" />')
+
+    return ('<svg xmlns="http://www.w3.org/2000/svg" width="200mm" height="150mm" '
+            'viewBox="0 0 200 150">\n' + '\n'.join(shapes) + '\n</svg>\n')
+
+
+def bench_vector(args):
+    """SVG export of line art: native vector paths vs raster embedded in SVG"""
+    from design_warp import DesignWarper
+    from vector_design import VectorDesign
+
+    print(f"\n{'='*60}")
+    print("Benchmark: Vector SVG Export (200x150mm, 200 shapes)")
+    print(f"{'='*60}\n")
+
+    rows = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        svg_path = Path(work_dir) / 'design.svg'
+        svg_path.write_text(synthetic_svg())
+        output_path = Path(work_dir) / 'export.svg'
+
+        parse_ms = time_call(lambda: VectorDesign.from_svg(svg_path), repeat=args.repeat)
+
+        for dpi in (300, 600):
+            warper = DesignWarper({'design_rect_mm': [0, 0, 200, 150]}, dpi=dpi)
+            quiet(lambda: warper.load_design(svg_path))()
+            vector_ms = time_call(quiet(lambda: warper.export_for_lightburn(output_path, format='svg')),
+                                  repeat=args.repeat)
+            vector_kb = output_path.stat().st_size / 1024.0
+
+            # Previous path: artwork rasterized at export DPI, PNG embedded in the SVG
+            raster = DesignWarper({'design_rect_mm': [0, 0, 200, 150]}, dpi=dpi)
+            raster.design_image = warper.vector_design.rasterize(int(200 * raster.px_per_mm),
+                                                                 int(150 * raster.px_per_mm))
+            raster_ms = time_call(quiet(lambda: raster.export_for_lightburn(output_path, format='svg')),
+                                  repeat=args.repeat)
+            raster_kb = output_path.stat().st_size / 1024.0
+
+            rows.append((dpi, raster_ms, raster_kb, vector_ms, vector_kb))
+
+    print(f"\nSVG parse: {parse_ms:.1f}ms")
+    print(f"\n{'DPI':<8}{'raster SVG':>12}{'size':>10}{'vector SVG':>12}{'size':>10}")
+    for dpi, raster_ms, raster_kb, vector_ms, vector_kb in rows:
+        print(f"{dpi:<8}{raster_ms:>10.1f}ms{raster_kb:>8.0f}KB{vector_ms:>10.1f}ms{vector_kb:>8.0f}KB")
+
+    return rows
+
+
+def bench_text(args):
+    """Text designs: cv2.putText raster vs stroke-font vector paths"""
+    from design_warp import DesignWarper
+
+    print(f"\n{'='*60}")
+    print("Benchmark: Text Design (100x30mm, SVG export)")
+    print(f"{'='*60}\n")
+
+    text, size_mm = "Serial #12345", (100, 30)
+
+    rows = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        output_path = Path(work_dir) / 'text.svg'
+
+        for dpi in (300, 600, 1000):
+            results = []
+            for raster in (True, False):
+                warper = DesignWarper({'design_rect_mm': [0, 0, *size_mm]}, dpi=dpi)
+                create_ms = time_call(quiet(lambda: warper.create_design_from_text(text, size_mm, raster=raster)),
+                                      repeat=args.repeat)
+                export_ms = time_call(quiet(lambda: warper.export_for_lightburn(output_path, format='svg')),
+                                      repeat=args.repeat)
+                results += [create_ms + export_ms, output_path.stat().st_size / 1024.0]
+
+            rows.append((dpi, *results))
+
+    print(f"{'DPI':<8}{'raster':>12}{'size':>10}{'vector':>12}{'size':>10}")
+    for dpi, raster_ms, raster_kb, vector_ms, vector_kb in rows:
+        print(f"{dpi:<8}{raster_ms:>10.1f}ms{raster_kb:>8.0f}KB{vector_ms:>10.1f}ms{vector_kb:>8.1f}KB")
+
+    return rows
+
+
+def bench_trace(args):
+    """Line-art logo: raster export vs traced vector paths"""
+    from design_warp import DesignWarper
+    from vector_design import VectorDesign
+
+    print(f"\n{'='*60}")
+    print("Benchmark: Raster Vectorization (100x100mm line-art logo)")
+    print(f"{'='*60}\n")
+
+    # 1200x1200 px line art: rings, a bar and lettering
+    logo = np.full((1200, 1200, 3), 255, dtype=np.uint8)
+    for radius in (500, 380, 260):
+        cv2.circle(logo, (600, 600), radius, (0, 0, 0), 30, cv2.LINE_AA)
+    cv2.rectangle(logo, (250, 560), (950, 640), (0, 0, 0), -1)
+    cv2.putText(logo, "ACME", (380, 900), cv2.FONT_HERSHEY_SIMPLEX, 5, (0, 0, 0), 20, cv2.LINE_AA)
+    logo_px_per_mm = 1200 / 100
+
+    rows = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for tolerance_mm in (0.02, 0.05, 0.1):
+            warper = DesignWarper({'design_rect_mm': [0, 0, 100, 100]}, dpi=300)
+            warper.design_image = logo
+            stats = quiet(lambda: warper.vectorize_design(tolerance_mm=tolerance_mm))()
+            trace_ms = time_call(lambda: VectorDesign.from_raster(logo, tolerance_mm * logo_px_per_mm),
+                                 repeat=args.repeat)
+
+            svg_path = Path(work_dir) / 'traced.svg'
+            quiet(lambda: warper.export_for_lightburn(svg_path, format='svg'))()
+            rows.append((tolerance_mm, stats['contours'], stats['points'], trace_ms,
+                         svg_path.stat().st_size / 1024.0))
+
+        raster = DesignWarper({'design_rect_mm': [0, 0, 100, 100]}, dpi=300)
+        raster.design_image = logo
+        png_path = Path(work_dir) / 'raster.png'
+        raster_ms = time_call(quiet(lambda: raster.export_for_lightburn(png_path, mono='threshold')),
+                              repeat=args.repeat)
+        raster_kb = png_path.stat().st_size / 1024.0
+
+    ink_rows = int((logo.min(axis=2) < 128).any(axis=1).sum() * raster.px_per_mm / logo_px_per_mm)
+    print(f"Raster (1-bit PNG @ 300 DPI): {raster_ms:.1f}ms, {raster_kb:.0f}KB, "
+          f"{ink_rows} scan lines with ink")
+    print(f"\n{'tolerance':<12}{'contours':>10}{'points':>10}{'trace':>12}{'SVG':>10}")
+    for tolerance_mm, contours, points, trace_ms, svg_kb in rows:
+        print(f"{tolerance_mm:<8.2f}mm  {contours:>10}{points:>10}{trace_ms:>10.1f}ms{svg_kb:>8.1f}KB")
+
+    return rows
+
+
+def bench_order(args):
+    """Cut-path ordering: document order vs nearest neighbour vs 2-opt"""
+    from path_order import order_paths, travel_length
+
+    print(f"\n{'='*60}")
+    print("Benchmark: Path Ordering (600x400mm bed, half closed outlines)")
+    print(f"{'='*60}\n")
+
+    rng = np.random.default_rng(0)
+    repeat = min(args.repeat, 3)
+
+    rows = []
+    for count in (1000, 10000, 30000):
+        starts = rng.uniform(0, (600, 400), (count, 2))
+        ends = starts + rng.normal(0, 3, (count, 2))
+        closed = rng.random(count) < 0.5
+        ends[closed] = starts[closed]
+
+        unordered = travel_length(starts, ends, np.arange(count), np.zeros(count, dtype=bool), (0.0, 0.0))
+        seed_ms = time_call(lambda: order_paths(starts, ends, closed, two_opt=False), repeat=repeat)
+        seed = travel_length(starts, ends, *order_paths(starts, ends, closed, two_opt=False), (0.0, 0.0))
+        full_ms = time_call(lambda: order_paths(starts, ends, closed), repeat=repeat)
+        full = travel_length(starts, ends, *order_paths(starts, ends, closed), (0.0, 0.0))
+        rows.append((count, unordered, seed, seed_ms, full, full_ms))
+
+    print(f"{'paths':>8}{'unordered':>12}{'nearest':>12}{'time':>10}{'+ 2-opt':>12}{'time':>10}")
+    for count, unordered, seed, seed_ms, full, full_ms in rows:
+        print(f"{count:>8}{unordered / 1000:>10.1f}m {seed / 1000:>10.2f}m {seed_ms:>8.0f}ms"
+              f"{full / 1000:>10.2f}m {full_ms:>8.0f}ms")
+
+    return rows
+
+
+def bench_daemon(args):
+    """Request latency: cold CLI process vs warm daemon (client CLI and HTTP)"""
+    import subprocess
+    import sys
+    import threading
+    from align_daemon import AlignmentService, AlignmentDaemon, DaemonClient
+
+    print(f"\n{'='*60}")
+    print("Benchmark: Alignment Daemon")
+    print(f"{'='*60}\n")
+
+    repeat = max(1, args.repeat // 2)
+    rect = ['50', '50', '100', '80']
+
+    rows = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        with contextlib.redirect_stdout(io.StringIO()):
+            service = AlignmentService(jig_config=args.jig_config, output_dir=work_dir)
+            service.get_core()
+        daemon = AlignmentDaemon(service, port=0)
+        threading.Thread(target=daemon.serve_forever, daemon=True).start()
+        port = str(daemon.server_address[1])
+        client = DaemonClient(port=daemon.server_address[1])
+
+        def run(command):
+            subprocess.run([sys.executable] + command, check=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        try:
+            for name in args.resolutions:
+                frame_path = Path(work_dir) / f'{name}.png'
+                cv2.imwrite(str(frame_path), synthetic_frame(RESOLUTIONS[name], work_dir))
+
+                # Every cold run pays interpreter startup, imports and config loading
+                cold_ms = time_call(lambda: run([
+                    'align_tool.py', '--camera-image', str(frame_path), '--text', 'TEST',
+                    '--rect', *rect, '--jig-config', args.jig_config, '--output-dir', work_dir,
+                ]), repeat=repeat, warmup=1)
+
+                client_ms = time_call(lambda: run([
+                    'align_daemon.py', 'export', '--port', port, '--camera-image', str(frame_path),
+                    '--text', 'TEST', '--rect', *rect,
+                ]), repeat=repeat, warmup=1)
+
+                with contextlib.redirect_stdout(io.StringIO()):
+                    http_ms = time_call(lambda: client.export(frame_path, [50, 50, 100, 80], text='TEST'),
+                                        repeat=args.repeat)
+                    align_ms = time_call(lambda: client.align(frame_path), repeat=args.repeat)
+
+                rows.append((name, cold_ms, client_ms, http_ms, align_ms))
+
+        finally:
+            daemon.shutdown()
+            daemon.server_close()
+
+    print(f"\n{'Resolution':<12}{'cold CLI':>12}{'client CLI':>12}{'HTTP':>12}{'align only':>12}{'speedup':>10}")
+    for name, cold_ms, client_ms, http_ms, align_ms in rows:
+        print(f"{name:<12}{cold_ms:>10.1f}ms{client_ms:>10.1f}ms{http_ms:>10.1f}ms"
+              f"{align_ms:>10.1f}ms{cold_ms / http_ms:>9.1f}x")
+
+    return rows
+
+
+def main():
+    """CLI interface"""
+    import argparse
+
+    # Options shared by every benchmark
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--repeat', type=int, default=10,
+                       help='Timed runs per measurement (default: 10)')
+    common.add_argument('--jig-config', default='config/jigs/default.json',
+                       help='Jig configuration file')
+    common.add_argument('--resolutions', nargs='+', choices=list(RESOLUTIONS),
+                       default=list(RESOLUTIONS), help='Frame sizes to benchmark')
+
+    parser = argparse.ArgumentParser(description='Alignment pipeline benchmarks')
+    subparsers = parser.add_subparsers(dest='benchmark', help='Benchmark to run')
+    subparsers.add_parser('undistort', parents=[common],
+                          help='Full-frame undistortion latency')
+    subparsers.add_parser('points', parents=[common],
+                          help='Full-frame vs points-only undistortion')
+    subparsers.add_parser('pyramid', parents=[common],
+                          help='Full-resolution vs pyramid marker detection')
+    subparsers.add_parser('roi', parents=[common],
+                          help='ROI tracking hit ratio per window padding')
+    subparsers.add_parser('designs', parents=[common],
+                          help='Per-rect vs vectorized multi-design alignment')
+    subparsers.add_parser('frames', parents=[common],
+                          help='JPEG snapshot round-trip vs in-memory frames')
+    subparsers.add_parser('warp', parents=[common],
+                          help='Full-frame vs region-limited preview warp')
+    subparsers.add_parser('overlay', parents=[common],
+                          help='Per-frame preview warp vs cached live overlay')
+    subparsers.add_parser('export-cache', parents=[common],
+                          help='Export encode vs export cache hit')
+    subparsers.add_parser('png', parents=[common],
+                          help='PNG export encode time and size (colour vs 1-bit)')
+    subparsers.add_parser('stream', parents=[common],
+                          help='Large-panel export: full buffer vs streaming')
+    subparsers.add_parser('vector', parents=[common],
+                          help='SVG export: vector paths vs embedded raster')
+    subparsers.add_parser('text', parents=[common],
+                          help='Text designs: putText raster vs stroke-font vectors')
+    subparsers.add_parser('trace', parents=[common],
+                          help='Line-art logo: raster export vs traced vector paths')
+    subparsers.add_parser('order', parents=[common],
+                          help='Cut-path ordering: nearest neighbour vs 2-opt travel and time')
+    subparsers.add_parser('daemon', parents=[common],
+                          help='Cold CLI vs warm daemon request latency')
+
+    args = parser.parse_args()
+
+    benchmarks = {
+        'undistort': bench_undistort,
+        'points': bench_points,
+        'pyramid': bench_pyramid,
+        'roi': bench_roi,
+        'designs': bench_designs,
+        'frames': bench_frames,
+        'warp': bench_warp,
+        'overlay': bench_overlay,
+        'export-cache': bench_export_cache,
+        'png': bench_png,
+        'stream': bench_stream,
+        'vector': bench_vector,
+        'text': bench_text,
+        'trace': bench_trace,
+        'order': bench_order,
+        'daemon': bench_daemon,
+    }
+
+    if not args.benchmark:
+        parser.print_help()
+        return 1
+
+    benchmarks[args.benchmark](args)
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
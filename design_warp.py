@@ -6,9 +6,156 @@ Warps designs to aligned positions and exports for LightBurn
 
 import cv2
 import numpy as np
+import os
 from pathlib import Path
-from PIL import Image
 import json
+import time
+from dataclasses import asdict, replace
+
+from job_estimate import (MATERIALS, MaterialProfile, estimate_raster, estimate_vector, format_duration,
+                          load_materials)
+from png_writer import (MONO_METHODS, PNG_FILTERS, PngStreamWriter, encode_png, encode_png_1bit,
+                        to_monochrome)
+from scan_plan import DEFAULT_OVERSCAN_MM, SCAN_ANGLES, analyze_scan_angles
+from stage_timer import timed
+from stroke_font import text_design
+from vector_design import VectorDesign, parse_colour
+
+
+# Exports at or above this size are resized and encoded in strips (~150MB of BGR)
+STREAMING_MIN_PIXELS = 50_000_000
+
+# Default strip size; strips get fewer rows as exports get wider
+STRIP_PIXELS = 1 << 18
+
+# Vector designs are rasterized at this DPI (at most) for the preview overlay
+VECTOR_PREVIEW_DPI = 150
+
+# Scan planning analyses the ink mask at this DPI (at most)
+SCAN_PLAN_MAX_DPI = 150
+
+# Job time estimates analyse the ink mask at this DPI (at most)
+ESTIMATE_MAX_DPI = 150
+
+
+def warp_design_roi(design, corners_px, frame_size):
+    """
+    Warp a design into the bounding box of its corners in the camera frame
+
+    Args:
+        design: Design image (grey, BGR or BGRA)
+        corners_px: 4 design corners in the camera frame
+                    (design top-left, top-right, bottom-right, bottom-left)
+        frame_size: (width, height) of the camera frame
+
+    Returns:
+        (warped ROI image, (x0, y0, x1, y1) frame position), or (None, None)
+        if the design lies outside the frame
+    """
+    if design.ndim == 2:
+        design = cv2.cvtColor(design, cv2.COLOR_GRAY2BGR)
+
+    corners_px = np.asarray(corners_px, dtype=np.float32)
+
+    # Source corners (design image corners)
+    h, w = design.shape[:2]
+    src_corners = np.array([
+        [0, 0],
+        [w, 0],
+        [w, h],
+        [0, h]
+    ], dtype=np.float32)
+
+    # Bounding box of the design in the camera frame
+    x0, y0 = np.maximum(np.floor(corners_px.min(axis=0)).astype(int), 0)
+    x1, y1 = np.minimum(np.ceil(corners_px.max(axis=0)).astype(int) + 1, frame_size)
+
+    if x1 <= x0 or y1 <= y0:
+        return None, None
+
+    # Perspective transform into the ROI (corners shifted by the ROI origin)
+    M = cv2.getPerspectiveTransform(src_corners, corners_px - np.float32([x0, y0]))
+
+    warped = cv2.warpPerspective(
+        design,
+        M,
+        (int(x1 - x0), int(y1 - y0)),
+        flags=cv2.INTER_LINEAR,
+        borderMode=cv2.BORDER_CONSTANT,
+        borderValue=(255, 255, 255, 0)
+    )
+
+    return warped, (int(x0), int(y0), int(x1), int(y1))
+
+
+def _linear_taps(src_len, dst_len):
+    """
+    Source indices and 8-bit fixed-point weights of cv2.INTER_LINEAR_EXACT
+
+    Returns:
+        (index0, index1, weight0, weight1), weights summing to 256
+    """
+    scale = 1.0 / (dst_len / src_len)
+    position = (np.arange(dst_len) + 0.5) * scale - 0.5
+    index = np.floor(position)
+    weight1 = np.rint((position - index) * 256).astype(np.int32)
+    index = index.astype(np.int64)
+
+    # Clamping both taps to the edge pixel reproduces OpenCV's border handling
+    return (np.clip(index, 0, src_len - 1), np.clip(index + 1, 0, src_len - 1),
+            256 - weight1, weight1)
+
+
+def resize_strips(image, size, strip_rows=64):
+    """
+    Resize an image strip by strip
+
+    Bit-exact with cv2.resize(image, size, interpolation=cv2.INTER_LINEAR_EXACT)
+    while only one strip of output rows (and the source rows it samples) is
+    held in memory.
+
+    Args:
+        image: Source image (grey or multi-channel uint8)
+        size: (width, height) of the resized image
+        strip_rows: Output rows per strip
+
+    Yields:
+        (first output row, resized strip)
+    """
+    width, height = size
+    channels = image.shape[2] if image.ndim == 3 else 1
+    x0, x1, wx0, wx1 = _linear_taps(image.shape[1], width)
+    y0, y1, wy0, wy1 = _linear_taps(image.shape[0], height)
+
+    # Work on rows flattened to (width * channels) values: plain 1-D gathers
+    offsets = np.arange(channels)
+    x0 = (x0[:, np.newaxis] * channels + offsets).ravel()
+    x1 = (x1[:, np.newaxis] * channels + offsets).ravel()
+    wx0, wx1 = np.repeat(wx0, channels), np.repeat(wx1, channels)
+    flat = image.reshape(image.shape[0], -1)
+
+    for start in range(0, height, strip_rows):
+        stop = min(start + strip_rows, height)
+
+        # Horizontal pass over just the source rows this strip samples
+        rows, inverse = np.unique(np.concatenate([y0[start:stop], y1[start:stop]]), return_inverse=True)
+        source = flat[rows]
+        horizontal = np.take(source, x0, axis=1).astype(np.int32)
+        horizontal *= wx0
+        right = np.take(source, x1, axis=1).astype(np.int32)
+        right *= wx1
+        horizontal += right
+
+        # Vertical pass, rounded from 16 fractional bits (in place, max 255 << 16)
+        strip = np.take(horizontal, inverse[:stop - start], axis=0)
+        strip *= wy0[start:stop, np.newaxis]
+        below = np.take(horizontal, inverse[stop - start:], axis=0)
+        below *= wy1[start:stop, np.newaxis]
+        strip += below
+        strip += 1 << 15
+        strip >>= 16
+
+        yield start, strip.astype(np.uint8).reshape((stop - start, width) + image.shape[2:])
 
 
 class DesignWarper:
@@ -29,11 +176,17 @@ class DesignWarper:
         self.px_per_mm = dpi / 25.4
 
         self.design_image = None
+        self.vector_design = None
         self.warped_design = None
+        self.warped_roi = None
 
+    @timed('load_design')
     def load_design(self, design_path):
         """
-        Load design image (PNG, JPG, or simple SVG rasterization)
+        Load design (PNG, JPG or SVG)
+
+        SVG designs are kept as vector paths (self.vector_design) and exported
+        as vector SVG; design_image then only holds a preview rasterization.
 
         Args:
             design_path: Path to design file
@@ -41,14 +194,10 @@ class DesignWarper:
         design_path = Path(design_path)
 
         if design_path.suffix.lower() == '.svg':
-            # For SVG, we'll use cairosvg or simple rasterization
-            # For now, raise an error and ask for PNG
-            raise NotImplementedError(
-                "SVG loading requires cairosvg. "
-                "Please convert to PNG first or provide PNG design."
-            )
+            return self.load_vector_design(VectorDesign.from_svg(design_path))
 
         # Load as image
+        self.vector_design = None
         self.design_image = cv2.imread(str(design_path), cv2.IMREAD_UNCHANGED)
 
         if self.design_image is None:
@@ -59,24 +208,114 @@ class DesignWarper:
 
         return self.design_image
 
-    def create_design_from_text(self, text, size_mm, font_scale=2, thickness=3):
+    def load_vector_design(self, vector_design, size_mm=None):
+        """
+        Use vector artwork as the design
+
+        Args:
+            vector_design: VectorDesign (its canvas maps onto design_rect_mm)
+            size_mm: (width, height) of the preview (default: design_rect_mm)
+
+        Returns:
+            Preview rasterization (BGR)
+        """
+        if vector_design.skipped:
+            print(f"⚠ Skipped unsupported SVG elements: {', '.join(vector_design.skipped)}")
+
+        self.vector_design = vector_design
+
+        # Raster only for the preview overlay
+        size_mm = size_mm or self.alignment_data['design_rect_mm'][2:]
+        px_per_mm = min(self.dpi, VECTOR_PREVIEW_DPI) / 25.4
+        self.design_image = vector_design.rasterize(max(1, int(size_mm[0] * px_per_mm)),
+                                                    max(1, int(size_mm[1] * px_per_mm)))
+
+        print(f"✓ Loaded vector design: {len(vector_design.paths)} paths, "
+              f"{vector_design.subpath_count} subpaths, {vector_design.segment_count} segments")
+
+        return self.design_image
+
+    @timed('vectorize_design')
+    def vectorize_design(self, tolerance_mm=0.05, threshold=128):
+        """
+        Trace the loaded raster design into filled vector paths
+
+        Suits line art: the laser then fills or cuts the outlines instead of
+        scanning every row of the bounding box.
+
+        Args:
+            tolerance_mm: Max deviation of the simplified outlines in mm
+            threshold: Grey level below which a pixel is ink
+
+        Returns:
+            dict with contour, outline point and ink pixel counts and
+            conversion time
         """
-        Create a simple text design
+        if self.design_image is None:
+            raise ValueError("No design loaded")
+        if self.vector_design is not None:
+            raise ValueError("Design is already a vector design")
+
+        start = time.perf_counter()
+
+        # Tolerance in design pixels along the axis with fewer pixels per mm
+        design_rect_mm = self.alignment_data['design_rect_mm']
+        h, w = self.design_image.shape[:2]
+        design_px_per_mm = min(w / design_rect_mm[2], h / design_rect_mm[3])
+        traced = VectorDesign.from_raster(self.design_image, tolerance_mm * design_px_per_mm, threshold)
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        ink_pixels = int(cv2.countNonZero(to_monochrome(self.design_image, threshold=threshold).view(np.uint8)))
+
+        if not traced.paths:
+            raise ValueError("Nothing to vectorize: design has no dark pixels")
+
+        self.load_vector_design(traced)
+
+        stats = {
+            'contours': traced.subpath_count,
+            'points': traced.segment_count,
+            'ink_pixels': ink_pixels,
+            'elapsed_ms': elapsed_ms,
+        }
+        print(f"✓ Vectorized design: {stats['contours']} contours, {stats['points']} points "
+              f"(from {ink_pixels} ink pixels) in {elapsed_ms:.1f}ms")
+
+        return stats
+
+    @timed('create_design_from_text')
+    def create_design_from_text(self, text, size_mm, raster=False, font_scale=2, thickness=3,
+                                stroke_width_mm=None):
+        """
+        Create a text design
+
+        By default the text is set in a single-stroke font as vector paths
+        scaled to fit size_mm (O(glyphs), exported as SVG paths the laser can
+        cut or score); design_image then only holds a preview rasterization.
 
         Args:
-            text: Text to render
+            text: Text to render ('\\n' separates lines)
             size_mm: (width, height) in mm
-            font_scale: Font scale factor
-            thickness: Text thickness
+            raster: Draw with cv2.putText on a full-DPI canvas instead
+            font_scale: Font scale factor (raster only)
+            thickness: Text thickness (raster only)
+            stroke_width_mm: Line width of vector text (default: 1/10 of the cap height)
 
         Returns:
             Design image
         """
+        if not raster:
+            self.load_vector_design(text_design(text, size_mm, stroke_width_mm=stroke_width_mm),
+                                    size_mm)
+            print(f"✓ Created vector text design: '{text}' ({size_mm[0]}x{size_mm[1]}mm)")
+            return self.design_image
+
         # Calculate size in pixels at target DPI
         width_px = int(size_mm[0] * self.px_per_mm)
         height_px = int(size_mm[1] * self.px_per_mm)
 
         # Create white canvas
+        self.vector_design = None
         self.design_image = np.ones((height_px, width_px, 3), dtype=np.uint8) * 255
 
         # Get text size
@@ -100,10 +339,16 @@ class DesignWarper:
 
         return self.design_image
 
+    @timed('warp_to_alignment')
     def warp_to_alignment(self, camera_image):
         """
         Warp design to match the aligned position in camera view
 
+        Only the bounding box of the design corners is warped and blended,
+        so time and memory scale with the design footprint, not the camera
+        resolution. The warped ROI is kept in self.warped_design and its
+        (x0, y0, x1, y1) frame position in self.warped_roi.
+
         Args:
             camera_image: Camera snapshot image
 
@@ -113,62 +358,75 @@ class DesignWarper:
         if self.design_image is None:
             raise ValueError("No design loaded")
 
-        # Get alignment corners
-        corners_px = np.array(self.alignment_data['corners_px'], dtype=np.float32)
+        composite = camera_image.copy()
 
-        # Source corners (design image corners)
-        h, w = self.design_image.shape[:2]
-        src_corners = np.array([
-            [0, 0],
-            [w, 0],
-            [w, h],
-            [0, h]
-        ], dtype=np.float32)
-
-        # Calculate perspective transform
-        M = cv2.getPerspectiveTransform(src_corners, corners_px)
-
-        # Warp design to camera view
-        warped = cv2.warpPerspective(
-            self.design_image,
-            M,
-            (camera_image.shape[1], camera_image.shape[0]),
-            flags=cv2.INTER_LINEAR,
-            borderMode=cv2.BORDER_CONSTANT,
-            borderValue=(255, 255, 255, 0)
-        )
+        frame_size = (camera_image.shape[1], camera_image.shape[0])
+        warped, bbox = warp_design_roi(self.design_image, self.alignment_data['corners_px'], frame_size)
+        self.warped_design, self.warped_roi = warped, bbox
 
-        # Create composite
-        composite = camera_image.copy()
+        if warped is None:
+            print("⚠ Design lies outside the camera view")
+            return composite
 
-        # Handle alpha channel if present
-        if len(warped.shape) == 3 and warped.shape[2] == 4:
-            # Extract alpha channel
-            alpha = warped[:, :, 3] / 255.0
-            alpha = np.expand_dims(alpha, axis=2)
+        # Blend in place over the ROI view of the composite
+        x0, y0, x1, y1 = bbox
+        roi = composite[y0:y1, x0:x1]
 
-            # Blend with alpha
-            composite = (alpha * warped[:, :, :3] + (1 - alpha) * composite).astype(np.uint8)
+        if warped.shape[2] == 4:
+            # Integer alpha blend, rounded: (a * design + (255 - a) * camera) / 255
+            alpha = warped[:, :, 3:4].astype(np.uint16)
+            blended = alpha * warped[:, :, :3] + (255 - alpha) * roi + 127
+            roi[:] = (blended // 255).astype(np.uint8)
         else:
-            # Simple overlay (white = transparent)
-            mask = cv2.cvtColor(warped, cv2.COLOR_BGR2GRAY)
-            mask = cv2.threshold(mask, 250, 255, cv2.THRESH_BINARY_INV)[1]
-            composite = cv2.bitwise_and(composite, composite, mask=cv2.bitwise_not(mask))
-            composite = cv2.add(composite, warped)
-
-        self.warped_design = warped
+            # White = transparent, camera shows through
+            mask = cv2.cvtColor(warped, cv2.COLOR_BGR2GRAY) <= 250
+            np.copyto(roi, warped, where=mask[:, :, np.newaxis])
 
         print(f"✓ Design warped to alignment")
 
         return composite
 
-    def export_for_lightburn(self, output_path, format='png'):
+    @timed('export_for_lightburn')
+    def export_for_lightburn(self, output_path, format='png', cache=None, mono=None,
+                             png_level=6, png_filter='up', png_strategy='rle',
+                             streaming=None, strip_rows=None, trim=False, scan_plan=None,
+                             material=None, materials=None, optimize_paths=False):
         """
         Export design at correct physical size for LightBurn
 
         Args:
             output_path: Output file path
             format: 'png' or 'svg'
+            cache: Optional ExportCache; identical exports are linked from it
+            mono: None for a colour PNG, or 'threshold' / 'dither' for a
+                  packed 1-bit PNG (PNG only)
+            png_level: zlib compression level 0-9
+            png_filter: PNG row filter for 1-bit and streamed exports
+                        ('none', 'sub', 'up', 'average', 'paeth', 'adaptive')
+            png_strategy: zlib strategy ('rle', 'default', 'filtered', 'huffman', 'fixed');
+                          run-length matching suits flat engraving artwork best
+            streaming: Resize and encode the PNG in strips of strip_rows rows,
+                       with constant peak memory and the same pixels as the
+                       in-memory path (None: only for exports of
+                       STREAMING_MIN_PIXELS or more)
+            strip_rows: Output rows per strip when streaming (default: about
+                        STRIP_PIXELS pixels per strip)
+            trim: Crop empty (white) margins first; the export then covers
+                  only the content, to be placed at
+                  alignment_data['export_rect_mm'], and alignment_data['trim']
+                  records the scan area removed
+            scan_plan: None, 'recommend' (estimate the fastest scan angle into
+                       alignment_data['scan_plan']) or 'bake' (also turn the
+                       export a quarter turn when scanning along its other
+                       axis is faster; the rotation is recorded there)
+            material: Material name or MaterialProfile; estimates the
+                      exported job's machine time into
+                      alignment_data['job_estimate'] (None: no estimate)
+            materials: Profiles to look material names up in (default MATERIALS)
+            optimize_paths: Reorder (and reverse) the cut paths of a vector
+                            SVG export to shorten travel moves; the travel
+                            before and after is recorded in
+                            alignment_data['path_order']
 
         Returns:
             Path to exported file
@@ -176,6 +434,366 @@ class DesignWarper:
         if self.design_image is None:
             raise ValueError("No design loaded")
 
+        options = dict(format=format, cache=cache, mono=mono, png_level=png_level,
+                       png_filter=png_filter, png_strategy=png_strategy,
+                       streaming=streaming, strip_rows=strip_rows)
+
+        for key in ('export_rect_mm', 'trim', 'scan_plan', 'job_estimate', 'path_order'):
+            self.alignment_data.pop(key, None)
+
+        # Each step returns a copy with the adjusted design and placement
+        warper = self
+
+        trimmed = self.trim_margins() if trim else None
+        if trimmed is not None:
+            warper, trim_info = trimmed
+            self.alignment_data['trim'] = trim_info
+
+            x, y, w, h = warper.alignment_data['design_rect_mm']
+            print(f"✓ Trimmed margins: {w:.1f}x{h:.1f}mm at ({x:.1f}, {y:.1f})mm, "
+                  f"{trim_info['removed_fraction']:.0%} of the scan area and "
+                  f"{trim_info['removed_rows']} scan lines removed")
+
+        if scan_plan is not None:
+            if scan_plan not in ('recommend', 'bake'):
+                raise ValueError(f"Unsupported scan plan mode: {scan_plan}")
+
+            plan = warper.plan_scan_angle()
+            if plan is not None:
+                plan['export_rotation_deg'] = 0.0
+                if scan_plan == 'bake' and plan['bake_rotation_deg']:
+                    warper = warper.rotated_quarter_turn()
+                    plan['export_rotation_deg'] = -90.0
+                    print("✓ Export rotated a quarter turn clockwise for faster scanning")
+                self.alignment_data['scan_plan'] = plan
+
+        if warper is not self:
+            self.alignment_data['export_rect_mm'] = warper.alignment_data['design_rect_mm']
+
+        if optimize_paths:
+            if warper.vector_design is None or format.lower() != 'svg':
+                print("⚠ Path ordering applies to vector SVG exports; keeping the path order")
+            else:
+                warper, self.alignment_data['path_order'] = warper.order_vector_paths()
+
+        output_path = warper._export_design(output_path, **options)
+
+        if material is not None:
+            vector_export = format.lower() == 'svg' and warper.vector_design is not None
+            self.alignment_data['job_estimate'] = warper.estimate_job(material, vector_export, materials)
+
+        return output_path
+
+    @timed('plan_scan_angle')
+    def plan_scan_angle(self, angles=SCAN_ANGLES, overscan_mm=DEFAULT_OVERSCAN_MM):
+        """
+        Estimate raster travel per scan angle for this design
+
+        The ink mask is analysed at the export DPI (at most
+        SCAN_PLAN_MAX_DPI, scaled back up), so a 300 DPI design takes
+        milliseconds. Angles are in the design's frame, which is square to
+        the bed; the camera tilt (alignment angle_deg) is recorded for
+        reference only.
+
+        Args:
+            angles: Candidate scan angles in degrees (counter-clockwise from +X)
+            overscan_mm: Run-out past the ink at each end of a scan line
+
+        Returns:
+            dict with per-angle estimates, the recommended angle and
+            bake_rotation_deg (90 if a quarter turn of the export beats
+            scanning along X), or None if the design is blank
+        """
+        analysis_dpi = min(self.dpi, SCAN_PLAN_MAX_DPI)
+        ink = self._ink_mask(analysis_dpi)
+        if not ink.any():
+            return None
+
+        analysis = analyze_scan_angles(ink, analysis_dpi / 25.4, angles, overscan_mm)
+
+        # Line counts and lengths at the real line interval
+        line_scale = self.dpi / analysis_dpi
+        for estimate in analysis['angles']:
+            estimate['lines'] = int(round(estimate['lines'] * line_scale))
+            estimate['overscans'] = 2 * estimate['lines']
+            estimate['scan_mm'] *= line_scale
+            estimate['travel_mm'] = estimate['scan_mm'] + estimate['overscans'] * overscan_mm
+
+        by_angle = {estimate['angle_deg']: estimate for estimate in analysis['angles']}
+        best = min(analysis['angles'], key=lambda estimate: estimate['travel_mm'])
+        along_x, along_y = by_angle.get(0.0), by_angle.get(90.0)
+
+        plan = {
+            'recommended_angle_deg': best['angle_deg'],
+            'travel_saved': 1.0 - best['travel_mm'] / along_x['travel_mm'] if along_x else None,
+            'bake_rotation_deg': 90.0 if along_x and along_y and along_y['travel_mm'] < along_x['travel_mm'] else 0.0,
+            'camera_angle_deg': self.alignment_data.get('angle_deg'),
+            'overscan_mm': analysis['overscan_mm'],
+            'angles': analysis['angles'],
+        }
+
+        message = (f"✓ Scan plan: {best['angle_deg']:.0f}° ({best['lines']} lines, "
+                   f"{best['travel_mm'] / 1000:.2f}m travel)")
+        if along_x and best is not along_x:
+            message += f" vs 0° ({along_x['lines']} lines, {along_x['travel_mm'] / 1000:.2f}m)"
+        print(message)
+
+        return plan
+
+    @timed('estimate_job')
+    def estimate_job(self, material='default', vector_export=None, materials=None):
+        """
+        Estimate how long the exported job takes on the machine
+
+        Raster exports are estimated from their ink mask (at the export
+        DPI, analysed at ESTIMATE_MAX_DPI at most), scanning along the
+        export's X axis. Vector SVG exports cut their stroked paths and
+        raster-fill their filled ones.
+
+        Args:
+            material: Material name or a MaterialProfile
+            vector_export: Whether the export keeps vector paths (None: a
+                           vector design is exported as SVG vectors)
+            materials: Profiles to look material names up in (default MATERIALS)
+
+        Returns:
+            dict with material, seconds, and 'raster' / 'vector' breakdowns
+        """
+        if isinstance(material, MaterialProfile):
+            profile = material
+        else:
+            materials = MATERIALS if materials is None else materials
+            if material not in materials:
+                raise ValueError(f"Unknown material: {material} (choose from {', '.join(sorted(materials))})")
+            profile = materials[material]
+
+        if vector_export is None:
+            vector_export = self.vector_design is not None
+
+        analysis_dpi = min(self.dpi, ESTIMATE_MAX_DPI)
+        line_scale = self.dpi / analysis_dpi
+        raster = vector = None
+
+        if vector_export and self.vector_design is not None:
+            width_mm, height_mm = self.alignment_data['design_rect_mm'][2:]
+            design = self.vector_design
+            stroked = [path for path in design.paths if path.stroke != 'none']
+            filled = [path for path in design.paths if path.fill != 'none']
+
+            if stroked:
+                placed = replace(design, paths=tuple(stroked)).fit_to_rect(width_mm, height_mm)
+                polylines = []
+                for points, closed in (item for path in placed.flatten(0.05) for item in path):
+                    if closed and (points[0] != points[-1]).any():
+                        points = np.vstack([points, points[:1]])
+                    polylines.append(points)
+                vector = estimate_vector(polylines, profile)
+
+            if filled:
+                ink = replace(design, paths=tuple(filled))
+                raster = estimate_raster(self._ink_mask(analysis_dpi, ink), 25.4 / analysis_dpi,
+                                         profile, line_scale=line_scale)
+        else:
+            raster = estimate_raster(self._ink_mask(analysis_dpi), 25.4 / analysis_dpi,
+                                     profile, line_scale=line_scale)
+
+        seconds = sum(part['seconds'] for part in (raster, vector) if part is not None)
+        estimate = {
+            'material': asdict(profile),
+            'seconds': seconds,
+            'duration': format_duration(seconds),
+            'raster': raster,
+            'vector': vector,
+        }
+
+        parts = []
+        if raster is not None:
+            parts.append(f"{raster['lines']} scan lines")
+        if vector is not None:
+            parts.append(f"{vector['cut_mm'] / 1000:.2f}m cut")
+        print(f"✓ Estimated job time: {format_duration(seconds)} on {profile.name}"
+              + (f" ({', '.join(parts)})" if parts else ""))
+
+        return estimate
+
+    def _ink_mask(self, dpi, vector_design=None):
+        """
+        Pixels the laser fires on, at dpi over the design rectangle
+
+        Anything that is not white is scanned (greyscale power in image
+        mode). vector_design overrides the design's own vector artwork.
+
+        Returns:
+            Boolean mask
+        """
+        design_rect_mm = self.alignment_data['design_rect_mm']
+        px_per_mm = dpi / 25.4
+        size = (max(1, int(design_rect_mm[2] * px_per_mm)), max(1, int(design_rect_mm[3] * px_per_mm)))
+
+        vector_design = vector_design or self.vector_design
+        if vector_design is not None:
+            image = vector_design.rasterize(*size)
+        else:
+            image = cv2.resize(self.design_image, size, interpolation=cv2.INTER_AREA)
+
+        return to_monochrome(image, threshold=255)
+
+    @timed('order_vector_paths')
+    def order_vector_paths(self, start=(0.0, 0.0), reverse=True):
+        """
+        Copy of this warper with its cut paths reordered for less travel
+
+        The vector design is placed in mm first (travel is physical and the
+        canvas may be stretched), then ordered with VectorDesign.ordered:
+        nearest neighbour plus 2-opt on a spatial grid, so tens of thousands
+        of paths take about a second.
+
+        Args:
+            start: Head position before the first cut, in mm from the
+                   design's top-left corner
+            reverse: Allow open paths to be cut from end to start
+
+        Returns:
+            (DesignWarper, path order info dict)
+        """
+        if self.vector_design is None:
+            raise ValueError("Path ordering needs a vector design")
+
+        width_mm, height_mm = self.alignment_data['design_rect_mm'][2:]
+        start_time = time.perf_counter()
+        ordered, report = self.vector_design.fit_to_rect(width_mm, height_mm).ordered(start, reverse)
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+
+        warper = DesignWarper(dict(self.alignment_data), dpi=self.dpi)
+        warper.vector_design = ordered
+        warper.design_image = self.design_image
+
+        before, after = report['travel_before'], report['travel_after']
+        order_info = {
+            'subpaths': report['subpaths'],
+            'reversed': report['reversed'],
+            'travel_before_mm': before,
+            'travel_after_mm': after,
+            'travel_saved': 1.0 - after / before if before else 0.0,
+            'elapsed_ms': elapsed_ms,
+        }
+
+        print(f"✓ Path order: {report['subpaths']} paths, travel {before / 1000:.2f}m → "
+              f"{after / 1000:.2f}m ({order_info['travel_saved']:.0%} less) in {elapsed_ms:.0f}ms")
+
+        return warper, order_info
+
+    def rotated_quarter_turn(self):
+        """
+        Copy of this warper with the design turned 90° clockwise
+
+        The design rectangle keeps its centre and swaps width and height.
+
+        Returns:
+            DesignWarper
+        """
+        x, y, w, h = self.alignment_data['design_rect_mm']
+        rect = [x + (w - h) / 2.0, y + (h - w) / 2.0, h, w]
+        warper = DesignWarper(dict(self.alignment_data, design_rect_mm=rect), dpi=self.dpi)
+
+        warper.design_image = cv2.rotate(self.design_image, cv2.ROTATE_90_CLOCKWISE)
+        if self.vector_design is not None:
+            # (x, y) -> (bottom - y, x - left) in y-down canvas coordinates
+            cx, cy, cw, ch = self.vector_design.canvas
+            warper.vector_design = self.vector_design.transformed(
+                np.array([[0.0, -1.0, cy + ch], [1.0, 0.0, -cx], [0.0, 0.0, 1.0]]))
+
+        return warper
+
+    def content_bounds(self):
+        """
+        Tight box around the non-white part of the design
+
+        Raster designs use one vectorized reduction per axis; vector designs
+        use their control points widened by half the stroke width.
+
+        Returns:
+            (left, top, right, bottom) as fractions of the design (rows from
+            the top), or None if the design is blank
+        """
+        if self.vector_design is not None:
+            x, y, w, h = self.vector_design.canvas
+            boxes = []
+            for path in self.vector_design.paths:
+                if not path.subpaths or (parse_colour(path.fill) is None and parse_colour(path.stroke) is None):
+                    continue
+                points = np.concatenate([sub.points for sub in path.subpaths])
+                pad = path.stroke_width / 2.0 if parse_colour(path.stroke) is not None else 0.0
+                boxes.append(np.concatenate([points.min(axis=0) - pad, points.max(axis=0) + pad]))
+            if not boxes:
+                return None
+
+            boxes = np.array(boxes)
+            box = np.concatenate([boxes[:, :2].min(axis=0), boxes[:, 2:].max(axis=0)])
+            fractions = (box - [x, y, x, y]) / [w, h, w, h]
+            left, top, right, bottom = np.clip(fractions, 0.0, 1.0)
+            if right <= left or bottom <= top:
+                return None
+            return (float(left), float(top), float(right), float(bottom))
+
+        # Alpha is ignored: colour exports drop it, so only white is blank everywhere
+        image = self.design_image
+        content = image < 255 if image.ndim == 2 else image[:, :, :3].min(axis=2) < 255
+        rows = np.flatnonzero(content.any(axis=1))
+        if len(rows) == 0:
+            return None
+        columns = np.flatnonzero(content.any(axis=0))
+
+        h, w = content.shape
+        return (columns[0] / w, rows[0] / h, (columns[-1] + 1) / w, (rows[-1] + 1) / h)
+
+    def trim_margins(self):
+        """
+        Copy of this warper cropped to the design's content
+
+        The cropped design rectangle keeps the content at the same physical
+        position (design_rect_mm y is the bottom edge, image rows run from
+        the top).
+
+        Returns:
+            (DesignWarper, trim info dict), or None if the design is blank
+        """
+        bounds = self.content_bounds()
+        if bounds is None:
+            print("⚠ Design is blank; exporting without trimming")
+            return None
+
+        left, top, right, bottom = bounds
+        x, y, w, h = self.alignment_data['design_rect_mm']
+        rect = [x + left * w, y + (1.0 - bottom) * h, (right - left) * w, (bottom - top) * h]
+
+        warper = DesignWarper(dict(self.alignment_data, design_rect_mm=rect), dpi=self.dpi)
+        if self.vector_design is not None:
+            cx, cy, cw, ch = self.vector_design.canvas
+            warper.vector_design = replace(self.vector_design, canvas=(
+                cx + left * cw, cy + top * ch, (right - left) * cw, (bottom - top) * ch))
+            warper.design_image = self.design_image
+        else:
+            image_h, image_w = self.design_image.shape[:2]
+            warper.design_image = self.design_image[int(round(top * image_h)):int(round(bottom * image_h)),
+                                                    int(round(left * image_w)):int(round(right * image_w))]
+
+        area = w * h
+        trimmed_area = rect[2] * rect[3]
+        trim_info = {
+            'content_bounds': [float(v) for v in bounds],
+            'original_rect_mm': [float(v) for v in (x, y, w, h)],
+            'removed_mm2': float(area - trimmed_area),
+            'removed_fraction': float(1.0 - trimmed_area / area) if area else 0.0,
+            'removed_rows': int(h * self.px_per_mm) - int(rect[3] * self.px_per_mm),
+        }
+
+        return warper, trim_info
+
+    def _export_design(self, output_path, format='png', cache=None, mono=None,
+                       png_level=6, png_filter='up', png_strategy='rle',
+                       streaming=None, strip_rows=None):
+        """Export the whole design canvas (see export_for_lightburn)"""
         output_path = Path(output_path)
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
@@ -187,35 +805,128 @@ class DesignWarper:
         width_px = int(width_mm * self.px_per_mm)
         height_px = int(height_mm * self.px_per_mm)
 
-        # Resize design to exact dimensions
-        design_resized = cv2.resize(
-            self.design_image,
-            (width_px, height_px),
-            interpolation=cv2.INTER_LINEAR
-        )
+        if streaming is None:
+            streaming = format.lower() == 'png' and width_px * height_px >= STREAMING_MIN_PIXELS
+        elif streaming and format.lower() != 'png':
+            raise ValueError("Streaming export supports PNG only")
+
+        cache_key = None
+        if cache is not None:
+            # The row filter only changes 1-bit and streamed PNGs
+            filtered = format.lower() == 'png' and (mono or streaming)
+            options = f"{mono}|{png_level}|{png_filter if filtered else None}|{png_strategy}"
+            content = self.design_image
+            if self.vector_design is not None:
+                content = np.frombuffer(self.vector_design.fingerprint(), dtype=np.uint8)
+            cache_key = cache.key(content, (width_mm, height_mm), self.dpi, format, options)
+            if cache.fetch(cache_key, format, output_path):
+                print(f"✓ Export cache hit: {output_path}")
+                return output_path
+
+        # The old file may be a hard link into the export cache; never write through it
+        if output_path.exists():
+            output_path.unlink()
+
+        if streaming:
+            strip_rows = strip_rows or max(1, STRIP_PIXELS // width_px)
+            self._export_png_streaming(output_path, (width_px, height_px), mono, strip_rows,
+                                       png_level, png_filter, png_strategy)
+            self._report_png(output_path, mono, (width_mm, height_mm), (width_px, height_px),
+                             f" in {strip_rows}-row strips")
+
+        elif format.lower() == 'svg' and self.vector_design is not None:
+            self._export_vector_svg(output_path, width_mm, height_mm)
 
-        if format.lower() == 'png':
-            # Export as PNG with DPI metadata
-            pil_image = Image.fromarray(cv2.cvtColor(design_resized, cv2.COLOR_BGR2RGB))
-            pil_image.save(
-                str(output_path),
-                dpi=(self.dpi, self.dpi),
-                optimize=True
-            )
+        else:
+            if self.vector_design is not None:
+                # Render vector artwork directly at the export resolution
+                design_resized = self.vector_design.rasterize(width_px, height_px)
+            else:
+                # Resize design to exact dimensions (bit-exact, so streamed exports match)
+                design_resized = cv2.resize(
+                    self.design_image,
+                    (width_px, height_px),
+                    interpolation=cv2.INTER_LINEAR_EXACT
+                )
+
+            if format.lower() == 'png':
+                # Export as PNG with DPI metadata
+                if mono:
+                    ink = to_monochrome(design_resized, method=mono)
+                    png_data = encode_png_1bit(ink, self.dpi, level=png_level,
+                                               png_filter=png_filter, strategy=png_strategy)
+                else:
+                    if design_resized.ndim == 3 and design_resized.shape[2] == 4:
+                        design_resized = cv2.cvtColor(design_resized, cv2.COLOR_BGRA2BGR)
+                    png_data = encode_png(design_resized, self.dpi, level=png_level,
+                                          strategy=png_strategy)
+
+                output_path.write_bytes(png_data)
+                self._report_png(output_path, mono, (width_mm, height_mm), (width_px, height_px))
+
+            elif format.lower() == 'svg':
+                # Export as SVG with embedded image
+                self._export_svg(design_resized, output_path, width_mm, height_mm)
+
+            else:
+                raise ValueError(f"Unsupported format: {format}")
+
+        if cache is not None:
+            cache.store(cache_key, format, output_path)
 
-            print(f"✓ Exported PNG: {output_path}")
-            print(f"  Physical size: {width_mm:.1f}x{height_mm:.1f}mm")
-            print(f"  Pixel size: {width_px}x{height_px}px")
-            print(f"  DPI: {self.dpi}")
+        return output_path
 
-        elif format.lower() == 'svg':
-            # Export as SVG with embedded image
-            self._export_svg(design_resized, output_path, width_mm, height_mm)
+    def _report_png(self, output_path, mono, size_mm, size_px, how=''):
+        print(f"✓ Exported {'1-bit ' if mono else ''}PNG{how}: {output_path}")
+        print(f"  Physical size: {size_mm[0]:.1f}x{size_mm[1]:.1f}mm")
+        print(f"  Pixel size: {size_px[0]}x{size_px[1]}px")
+        print(f"  DPI: {self.dpi}")
+
+    def _export_png_streaming(self, output_path, size_px, mono, strip_rows,
+                              png_level, png_filter, png_strategy):
+        """Resize, convert and encode the PNG strip by strip"""
+        if mono:
+            mode = 'mono'
+        else:
+            mode = 'grey' if self.design_image.ndim == 2 and self.vector_design is None else 'rgb'
 
+        if self.vector_design is not None:
+            strips = self.vector_design.rasterize_strips(size_px[0], size_px[1], strip_rows)
         else:
-            raise ValueError(f"Unsupported format: {format}")
+            strips = resize_strips(self.design_image, size_px, strip_rows)
 
-        return output_path
+        # Written under a temporary name so a failed export leaves no partial file
+        tmp_path = output_path.with_name(f".{output_path.name}.tmp")
+
+        try:
+            with open(tmp_path, 'wb') as f:
+                png = PngStreamWriter(f, size_px[0], size_px[1], self.dpi, mode=mode,
+                                      level=png_level, png_filter=png_filter,
+                                      strategy=png_strategy)
+
+                for start, strip in strips:
+                    if mono:
+                        strip = to_monochrome(strip, method=mono, row_offset=start)
+                    png.write_rows(strip)
+
+                png.close()
+
+            os.replace(tmp_path, output_path)
+
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    def _export_vector_svg(self, output_path, width_mm, height_mm):
+        """Export vector artwork as SVG paths in mm"""
+        placed = self.vector_design.fit_to_rect(width_mm, height_mm)
+
+        with open(output_path, 'w') as f:
+            f.write(placed.to_svg())
+
+        print(f"✓ Exported vector SVG: {output_path}")
+        print(f"  Physical size: {width_mm:.1f}x{height_mm:.1f}mm")
+        print(f"  Paths: {len(placed.paths)} ({placed.segment_count} segments)")
 
     def _export_svg(self, design_image, output_path, width_mm, height_mm):
         """Export design as SVG with embedded raster image"""
@@ -261,6 +972,152 @@ class DesignWarper:
         print(f"✓ Alignment data saved: {output_path}")
 
 
+class LiveOverlay:
+    """
+    Design projected onto a live camera feed
+
+    The warped ROI and its blend terms are cached while the homography is
+    unchanged, so each new frame only recomposites the ROI. When the
+    homography moves by a whole-pixel translation (jig nudged on the bed)
+    the cached ROI is shifted instead of re-warped; any other change
+    re-warps just the design's bounding box.
+    """
+
+    def __init__(self, design_image, design_rect_mm, tolerance_px=0.25):
+        """
+        Initialize overlay
+
+        Args:
+            design_image: Design image (grey, BGR or BGRA; white = transparent without alpha)
+            design_rect_mm: (x, y, width, height) of the design in mm
+            tolerance_px: Max corner movement treated as unchanged
+        """
+        self.design_image = design_image
+        self.design_rect_mm = tuple(design_rect_mm)
+        self.tolerance_px = tolerance_px
+
+        self._corners = None
+        self._frame_size = None
+        self._bbox = None
+        self._inside = False
+        self._fg = None       # BGR design pixels (opaque) or alpha * BGR + 127 (alpha)
+        self._blend = None    # mask (opaque) or 255 - alpha (alpha)
+
+        self.rebuilds = 0
+        self.shifts = 0
+        self.reuses = 0
+
+    @classmethod
+    def from_design(cls, design_rect_mm, design_path=None, text=None, dpi=100, **options):
+        """
+        Build an overlay from a design file or text
+
+        A lower DPI than the export is plenty for a camera preview and keeps
+        rebuilds cheap.
+
+        Returns:
+            LiveOverlay
+        """
+        warper = DesignWarper({'design_rect_mm': list(design_rect_mm)}, dpi=dpi)
+        if text:
+            warper.create_design_from_text(text, design_rect_mm[2:])
+        elif design_path:
+            warper.load_design(design_path)
+        else:
+            raise ValueError("Must provide either design_path or text")
+
+        return cls(warper.design_image, design_rect_mm, **options)
+
+    def update(self, homography, frame_size):
+        """
+        Follow a new homography
+
+        Args:
+            homography: 3x3 mm -> pixel homography
+            frame_size: (width, height) of the camera frames
+
+        Returns:
+            bool: True if the design had to be re-warped
+        """
+        from aruco_align import transform_rect_px
+
+        corners = transform_rect_px(homography, self.design_rect_mm)
+        frame_size = tuple(frame_size)
+
+        if self._corners is not None and frame_size == self._frame_size:
+            delta = corners - self._corners
+            if np.abs(delta).max() <= self.tolerance_px:
+                self.reuses += 1
+                return False
+
+            # Whole-pixel translation: move the cached ROI if it stays in the frame
+            shift = np.round(delta.mean(axis=0))
+            if self._inside and self._bbox is not None and np.abs(delta - shift).max() <= self.tolerance_px:
+                dx, dy = int(shift[0]), int(shift[1])
+                x0, y0, x1, y1 = self._bbox
+                if 0 <= x0 + dx and x1 + dx <= frame_size[0] and 0 <= y0 + dy and y1 + dy <= frame_size[1]:
+                    self._bbox = (x0 + dx, y0 + dy, x1 + dx, y1 + dy)
+                    self._corners = self._corners + shift
+                    self.shifts += 1
+                    return False
+
+        self._rebuild(corners, frame_size)
+        self.rebuilds += 1
+        return True
+
+    def _rebuild(self, corners, frame_size):
+        warped, bbox = warp_design_roi(self.design_image, corners, frame_size)
+
+        self._corners = corners
+        self._frame_size = frame_size
+        self._bbox = bbox
+
+        if warped is None:
+            self._fg = self._blend = None
+            self._inside = False
+            return
+
+        # Unclipped bounding boxes can be shifted without re-warping
+        self._inside = bool(np.all(np.floor(corners.min(axis=0)) >= 0)
+                            and np.all(np.ceil(corners.max(axis=0)) + 1 <= frame_size))
+
+        if warped.shape[2] == 4:
+            alpha = warped[:, :, 3:4].astype(np.uint16)
+            self._fg = alpha * warped[:, :, :3] + 127
+            self._blend = 255 - alpha
+        else:
+            self._fg = warped
+            self._blend = (cv2.cvtColor(warped, cv2.COLOR_BGR2GRAY) <= 250)[:, :, np.newaxis]
+
+    def compose(self, frame):
+        """
+        Overlay the cached design on a camera frame
+
+        Args:
+            frame: BGR camera frame (not modified)
+
+        Returns:
+            Composite frame
+        """
+        composite = frame.copy()
+        if self._bbox is None:
+            return composite
+
+        x0, y0, x1, y1 = self._bbox
+        roi = composite[y0:y1, x0:x1]
+
+        if self._fg.dtype == np.uint16:
+            roi[:] = (self._fg + self._blend * roi) // 255
+        else:
+            np.copyto(roi, self._fg, where=self._blend)
+
+        return composite
+
+    def stats(self):
+        """Cache behaviour summary"""
+        return {'rebuilds': self.rebuilds, 'shifts': self.shifts, 'reuses': self.reuses}
+
+
 class DesignPlacer:
     """
     Interactive tool for placing designs on camera view
@@ -355,8 +1212,13 @@ def main():
 
     parser = argparse.ArgumentParser(description='Design warping and export tool')
     parser.add_argument('alignment_json', help='Alignment JSON file from aruco_align.py')
-    parser.add_argument('--design', help='Design image file (PNG)')
+    parser.add_argument('--design', help='Design file (PNG or SVG)')
     parser.add_argument('--text', help='Create text design instead')
+    parser.add_argument('--raster-text', action='store_true',
+                       help='Draw text as a raster (cv2.putText) instead of vector strokes')
+    parser.add_argument('--vectorize', type=float, nargs='?', const=0.05, metavar='TOL_MM',
+                       help='Trace a raster line-art design into filled vector paths '
+                            '(outline tolerance in mm, default: 0.05)')
     parser.add_argument('--camera-image', help='Camera image for preview')
     parser.add_argument('--output', default='output/aligned_design.png',
                        help='Output file path')
@@ -364,6 +1226,23 @@ def main():
                        help='Output format')
     parser.add_argument('--dpi', type=int, default=300,
                        help='Output DPI (default: 300)')
+    parser.add_argument('--mono', choices=MONO_METHODS,
+                       help='Export a packed 1-bit PNG (threshold or ordered dither)')
+    parser.add_argument('--png-level', type=int, default=6, choices=range(10), metavar='0-9',
+                       help='PNG zlib compression level (default: 6)')
+    parser.add_argument('--png-filter', choices=list(PNG_FILTERS) + ['adaptive'], default='up',
+                       help='PNG row filter for 1-bit and streamed exports (default: up)')
+    parser.add_argument('--trim', action='store_true',
+                       help='Crop empty margins and shift the placement to match')
+    parser.add_argument('--scan-plan', choices=['recommend', 'bake'],
+                       help='Estimate the fastest scan angle (bake: rotate the export '
+                            'a quarter turn when that is faster)')
+    parser.add_argument('--optimize-paths', action='store_true',
+                       help='Reorder vector SVG cut paths to shorten travel moves')
+    parser.add_argument('--material', default='default',
+                       help=f"Material profile for the job time estimate ({', '.join(MATERIALS)})")
+    parser.add_argument('--material-config',
+                       help='JSON file of material profiles (speeds in mm/s) adding to or overriding the built-ins')
 
     args = parser.parse_args()
 
@@ -374,6 +1253,8 @@ def main():
 
         print(f"✓ Loaded alignment data: {args.alignment_json}")
 
+        materials = load_materials(args.material_config) if args.material_config else None
+
         # Create warper
         warper = DesignWarper(alignment_data, dpi=args.dpi)
 
@@ -382,13 +1263,16 @@ def main():
             # Extract size from alignment data
             design_rect = alignment_data['design_rect_mm']
             size_mm = (design_rect[2], design_rect[3])
-            warper.create_design_from_text(args.text, size_mm)
+            warper.create_design_from_text(args.text, size_mm, raster=args.raster_text)
         elif args.design:
             warper.load_design(args.design)
         else:
             print("Error: Must specify either --design or --text")
             return 1
 
+        if args.vectorize is not None and warper.vector_design is None:
+            warper.vectorize_design(tolerance_mm=args.vectorize)
+
         # Create preview if camera image provided
         if args.camera_image:
             camera_img = cv2.imread(args.camera_image)
@@ -399,7 +1283,11 @@ def main():
                 print(f"✓ Preview saved: {preview_path}")
 
         # Export for LightBurn
-        warper.export_for_lightburn(args.output, format=args.format)
+        warper.export_for_lightburn(args.output, format=args.format, mono=args.mono,
+                                    png_level=args.png_level, png_filter=args.png_filter,
+                                    trim=args.trim, scan_plan=args.scan_plan,
+                                    material=args.material, materials=materials,
+                                    optimize_paths=args.optimize_paths)
 
         # Save alignment data copy
         json_path = Path(args.output).with_suffix('.json')
@@ -408,8 +1296,9 @@ def main():
         print(f"\n✓ Export complete!")
         print(f"\nNext steps:")
         print(f"1. Import {args.output} into LightBurn")
-        print(f"2. Verify size is correct ({alignment_data['design_rect_mm'][2]:.1f}x{alignment_data['design_rect_mm'][3]:.1f}mm)")
-        print(f"3. Position at ({alignment_data['design_rect_mm'][0]:.1f}, {alignment_data['design_rect_mm'][1]:.1f})mm")
+        export_rect = alignment_data.get('export_rect_mm', alignment_data['design_rect_mm'])
+        print(f"2. Verify size is correct ({export_rect[2]:.1f}x{export_rect[3]:.1f}mm)")
+        print(f"3. Position at ({export_rect[0]:.1f}, {export_rect[1]:.1f})mm")
 
     except Exception as e:
         print(f"Error: {e}")
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Export Cache
+Content-addressed cache of LightBurn export files
+
+Exports are keyed by a hash of the design pixels, the physical size, DPI
+and format, so re-exporting the same artwork at the same size returns the
+cached file instead of resizing and PNG-encoding it again.
+"""
+
+import hashlib
+import os
+import shutil
+import threading
+from pathlib import Path
+
+import numpy as np
+
+
+class ExportCache:
+    """
+    Size-bounded LRU cache of export files on disk
+
+    Recency is the file modification time, refreshed on every hit, so the
+    LRU order survives restarts and is shared by processes using the same
+    directory. Hits are hard-linked into place (copied across filesystems).
+    """
+
+    def __init__(self, cache_dir, max_bytes=512 * 1024 * 1024):
+        """
+        Initialize cache
+
+        Args:
+            cache_dir: Directory holding cached exports
+            max_bytes: Total size limit; least recently used files are evicted
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(design_image, size_mm, dpi, format, options=''):
+        """
+        Content hash for an export
+
+        Args:
+            design_image: Design pixels (ndarray)
+            size_mm: (width, height) in mm
+            dpi: Export DPI
+            format: Export format
+            options: Encoder settings that change the exported file
+
+        Returns:
+            str: Hex digest
+        """
+        design_image = np.ascontiguousarray(design_image)
+
+        # SHA-256 has hardware support on current CPUs; fastest hashlib digest here
+        digest = hashlib.sha256()
+        digest.update(f"{design_image.shape}|{design_image.dtype}|".encode())
+        digest.update(f"{size_mm[0]:.4f}x{size_mm[1]:.4f}mm|{dpi}|{format.lower()}|{options}|".encode())
+        digest.update(memoryview(design_image).cast('B'))
+
+        return digest.hexdigest()[:32]
+
+    def _entry_path(self, key, format):
+        return self.cache_dir / f"{key}.{format.lower()}"
+
+    def fetch(self, key, format, output_path):
+        """
+        Place a cached export at output_path
+
+        Returns:
+            bool: True on a hit
+        """
+        entry = self._entry_path(key, format)
+
+        with self._lock:
+            try:
+                _place(entry, Path(output_path))
+                os.utime(entry)
+            except FileNotFoundError:
+                self.misses += 1
+                return False
+
+            self.hits += 1
+            return True
+
+    def store(self, key, format, export_path):
+        """
+        Add a freshly written export to the cache and evict if over the limit
+
+        Args:
+            key: Key from ExportCache.key()
+            format: Export format
+            export_path: Export file to cache
+        """
+        entry = self._entry_path(key, format)
+
+        with self._lock:
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                _place(Path(export_path), entry)
+            except OSError as e:
+                print(f"⚠ Could not cache export: {e}")
+                return
+
+            self._evict()
+
+    def _entries(self):
+        entries = []
+        for path in self.cache_dir.iterdir():
+            if path.name.startswith('.'):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict(self):
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+
+        # Never evict the entry that was just stored (newest)
+        for _, size, path in entries[:-1]:
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+            self.evictions += 1
+
+    def size_bytes(self):
+        """Total size of cached exports"""
+        if not self.cache_dir.exists():
+            return 0
+        with self._lock:
+            return sum(size for _, size, _ in self._entries())
+
+    def stats(self):
+        """Hit/miss statistics"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'size_bytes': self.size_bytes(),
+        }
+
+    def clear(self):
+        """Delete all cached exports"""
+        with self._lock:
+            for _, _, path in self._entries():
+                path.unlink()
+
+
+def _place(source, destination):
+    """Hard-link (or copy) source to destination, atomically replacing it"""
+    # Renaming over another link to the same file would be a silent no-op
+    if destination.exists() and os.path.samefile(source, destination):
+        return
+
+    tmp_path = destination.with_name(f".{destination.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+    try:
+        os.link(source, tmp_path)
+    except FileNotFoundError:
+        raise
+    except OSError:
+        # Cross-device or no hard-link support
+        shutil.copy2(source, tmp_path)
+
+    os.replace(tmp_path, destination)
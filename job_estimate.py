@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Job Estimate Module
+Engraving time estimates for exported jobs, per material profile
+
+Raster work is estimated from the ink mask: every scan line holding ink is
+swept from its first to its last ink pixel plus overscan at both ends, and
+blank lines are skipped with a travel move. Vector work is the cut length
+of each polyline plus the travel between them. Moves follow a trapezoidal
+speed profile (accelerate, cruise, decelerate), all evaluated as NumPy
+arrays so an estimate takes milliseconds.
+"""
+
+import json
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+from scan_plan import rotate_mask
+
+
+@dataclass(frozen=True)
+class MaterialProfile:
+    """Machine settings for one material (speeds in mm/s, acceleration in mm/s²)"""
+
+    name: str
+    raster_speed: float = 300.0
+    vector_speed: float = 20.0
+    travel_speed: float = 400.0
+    acceleration: float = 2000.0
+    overscan_mm: float = 2.5
+    passes: int = 1
+
+
+MATERIALS = {
+    'default': MaterialProfile('default'),
+    'plywood': MaterialProfile('plywood', raster_speed=250.0, vector_speed=12.0),
+    'acrylic': MaterialProfile('acrylic', raster_speed=350.0, vector_speed=15.0),
+    'leather': MaterialProfile('leather', raster_speed=400.0, vector_speed=30.0),
+    'slate': MaterialProfile('slate', raster_speed=200.0, vector_speed=10.0, passes=2),
+    'anodized_aluminum': MaterialProfile('anodized_aluminum', raster_speed=2000.0, vector_speed=500.0,
+                                         travel_speed=3000.0, acceleration=20000.0, overscan_mm=1.0),
+}
+
+# Polyline corners sharper than this stop the head (accelerate out again)
+CORNER_ANGLE_DEG = 45.0
+
+
+def load_materials(config_path):
+    """
+    Material profiles from a JSON file, on top of the built-in MATERIALS
+
+    The file maps names to MaterialProfile fields; missing fields keep
+    their defaults (or the built-in profile's values for known names).
+
+    Returns:
+        dict of name -> MaterialProfile
+    """
+    with open(config_path, 'r') as f:
+        config = json.load(f)
+
+    materials = dict(MATERIALS)
+    for name, fields in config.items():
+        base = materials.get(name, MaterialProfile(name))
+        materials[name] = replace(base, name=name, **fields)
+
+    return materials
+
+
+def move_time(distance, speed, acceleration):
+    """
+    Duration of straight moves from rest to rest (trapezoidal profile)
+
+    Args:
+        distance: Move lengths in mm (scalar or array)
+        speed: Cruise speed in mm/s
+        acceleration: mm/s²
+
+    Returns:
+        Seconds, same shape as distance
+    """
+    distance = np.asarray(distance, dtype=np.float64)
+
+    # Moves shorter than the accelerate + decelerate distance never reach cruise speed
+    ramp = speed * speed / acceleration
+    return np.where(distance >= ramp,
+                    distance / speed + speed / acceleration,
+                    2.0 * np.sqrt(distance / acceleration))
+
+
+def estimate_raster(ink, line_interval_mm, profile, angle_deg=0.0, line_scale=1.0):
+    """
+    Raster (image / fill) time from an ink mask
+
+    Args:
+        ink: Boolean mask, True where the laser fires (square pixels)
+        line_interval_mm: Mask pixel size in mm
+        profile: MaterialProfile
+        angle_deg: Scan direction, counter-clockwise from +X (0 or 90 for
+                   exports turned a quarter turn)
+        line_scale: Machine scan lines per mask row (mask analysed at a
+                    lower resolution than the export)
+
+    Returns:
+        dict with lines, runs (laser-on stretches), burn_mm, scan_mm,
+        overscan_mm, travel_mm and seconds
+    """
+    mask = rotate_mask(ink, angle_deg).astype(bool)
+    pixel_mm = line_interval_mm
+
+    rows = np.flatnonzero(mask.any(axis=1))
+    if len(rows) == 0:
+        return {'lines': 0, 'runs': 0, 'burn_mm': 0.0, 'scan_mm': 0.0,
+                'overscan_mm': 0.0, 'travel_mm': 0.0, 'seconds': 0.0}
+
+    mask = mask[rows]
+    first = mask.argmax(axis=1)
+    last = mask.shape[1] - 1 - mask[:, ::-1].argmax(axis=1)
+    extent_mm = (last - first + 1) * pixel_mm
+    burn_mm = np.count_nonzero(mask, axis=1) * pixel_mm
+    runs = mask[:, 0] + np.count_nonzero(mask[:, 1:] & ~mask[:, :-1], axis=1)
+
+    # Each line is one move from rest to rest through both overscan run-outs
+    sweep_mm = extent_mm + 2.0 * profile.overscan_mm
+    line_seconds = move_time(sweep_mm, profile.raster_speed, profile.acceleration) * line_scale
+
+    # Blank stretches between ink lines are crossed with a travel move
+    gaps_mm = (np.diff(rows) - 1) * line_interval_mm
+    gaps_mm = gaps_mm[gaps_mm > 0]
+    gap_seconds = move_time(gaps_mm, profile.travel_speed, profile.acceleration)
+
+    lines = int(round(len(rows) * line_scale))
+    passes = profile.passes
+
+    return {
+        'lines': lines * passes,
+        'runs': int(round(runs.sum() * line_scale)) * passes,
+        'burn_mm': float(burn_mm.sum() * line_scale * passes),
+        'scan_mm': float(sweep_mm.sum() * line_scale * passes),
+        'overscan_mm': float(2.0 * profile.overscan_mm * lines * passes),
+        'travel_mm': float(gaps_mm.sum() * passes),
+        'seconds': float((line_seconds.sum() + gap_seconds.sum()) * passes),
+    }
+
+
+def estimate_vector(polylines, profile, start=None):
+    """
+    Vector (cut / score) time for polylines in mm, in the given order
+
+    Each polyline is cut at vector_speed, stopping at the ends and at
+    corners sharper than CORNER_ANGLE_DEG; the head travels in a straight
+    line from one polyline's end to the next one's start.
+
+    Args:
+        polylines: list of (n, 2) vertex arrays in mm (closed ones repeat
+                   their first vertex)
+        profile: MaterialProfile
+        start: Head position before the first polyline (None: start there)
+
+    Returns:
+        dict with paths, cut_mm, corners, travel_mm and seconds
+    """
+    polylines = [np.asarray(p, dtype=np.float64) for p in polylines if len(p) > 1]
+    if not polylines:
+        return {'paths': 0, 'cut_mm': 0.0, 'corners': 0, 'travel_mm': 0.0, 'seconds': 0.0}
+
+    # All segments at once; one id per polyline splits them again
+    points = np.concatenate(polylines)
+    ids = np.repeat(np.arange(len(polylines)), [len(p) for p in polylines])
+    same = ids[1:] == ids[:-1]
+    vectors = np.diff(points, axis=0)[same]
+    lengths = np.linalg.norm(vectors, axis=1)
+    segment_ids = ids[1:][same]
+
+    # Corners: consecutive segments of one polyline turning sharply
+    turn = np.einsum('ij,ij->i', vectors[:-1], vectors[1:])
+    norms = lengths[:-1] * lengths[1:]
+    cos_turn = np.divide(turn, norms, out=np.ones_like(turn), where=norms > 0)
+    sharp = (segment_ids[1:] == segment_ids[:-1]) & (cos_turn < np.cos(np.radians(CORNER_ANGLE_DEG)))
+
+    # Runs between stops (ends and sharp corners) are moves from rest to rest
+    run_ids = np.cumsum(np.concatenate([[0], sharp | (segment_ids[1:] != segment_ids[:-1])]))
+    run_mm = np.bincount(run_ids, weights=lengths)
+    cut_seconds = move_time(run_mm, profile.vector_speed, profile.acceleration).sum()
+
+    starts = np.array([p[0] for p in polylines])
+    ends = np.array([p[-1] for p in polylines])
+    travel = np.linalg.norm(starts[1:] - ends[:-1], axis=1)
+    if start is not None:
+        travel = np.concatenate([[np.linalg.norm(starts[0] - np.asarray(start))], travel])
+    travel_seconds = move_time(travel, profile.travel_speed, profile.acceleration).sum()
+
+    passes = profile.passes
+    return {
+        'paths': len(polylines),
+        'cut_mm': float(lengths.sum() * passes),
+        'corners': int(sharp.sum()) * passes,
+        'travel_mm': float(travel.sum() * passes),
+        'seconds': float((cut_seconds + travel_seconds) * passes),
+    }
+
+
+def format_duration(seconds):
+    """'1h 02m 03s', '2m 03s' or '3.4s'"""
+    if seconds < 60:
+        return f"{seconds:.1f}s"
+    minutes, secs = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes:02d}m {secs:02d}s" if hours else f"{minutes}m {secs:02d}s"
+
@@ -8,6 +8,8 @@ import socket
 import time
 from pathlib import Path
 
+from stage_timer import stage
+
 
 class LightBurnController:
     """
@@ -39,6 +41,10 @@ class LightBurnController:
         Returns:
             Reply from LightBurn or None if timeout
         """
+        with stage(f"lightburn_{command.split(':', 1)[0].lower()}"):
+            return self._send_command(command)
+
+    def _send_command(self, command):
         sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         sock.settimeout(self.timeout)
 
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Live Video Alignment
+Continuously align the jig from a camera stream with a threaded frame grabber
+"""
+
+import cv2
+import numpy as np
+from dataclasses import dataclass
+import threading
+import time
+
+from aruco_align import AlignmentCore, MarkerRegionCache
+
+
+@dataclass(frozen=True)
+class LiveAlignment:
+    """One published alignment from the video stream"""
+
+    frame_index: int
+    captured_at: float       # time.monotonic() when the frame was grabbed
+    published_at: float      # time.monotonic() when the homography was ready
+    process_ms: float        # detection + homography time
+    result: object           # AlignmentResult
+    frame: np.ndarray
+
+    @property
+    def homography(self):
+        return self.result.homography
+
+    @property
+    def latency_ms(self):
+        """Capture-to-publish latency"""
+        return (self.published_at - self.captured_at) * 1000.0
+
+
+class FrameGrabber:
+    """
+    Background thread that keeps only the most recent camera frame
+
+    Older frames are overwritten, never queued, so consumers always see the
+    freshest image no matter how slow they are.
+    """
+
+    def __init__(self, source=0):
+        """
+        Initialize grabber
+
+        Args:
+            source: Camera index, video path/URL, or an opened object with
+                    a cv2.VideoCapture-style read() method
+        """
+        if isinstance(source, (int, str)):
+            self.capture = cv2.VideoCapture(source)
+            self._owns_capture = True
+        else:
+            self.capture = source
+            self._owns_capture = False
+
+        self._condition = threading.Condition()
+        self._frame = None
+        self._captured_at = 0.0
+        self._frame_index = -1
+        self._running = False
+        self._thread = None
+
+        self.frames_grabbed = 0
+
+    def start(self):
+        """Start grabbing frames"""
+        if self._owns_capture and not self.capture.isOpened():
+            raise RuntimeError("Could not open camera")
+
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='FrameGrabber', daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while self._running:
+            ret, frame = self.capture.read()
+            if not ret:
+                break
+
+            with self._condition:
+                self._frame = frame
+                self._captured_at = time.monotonic()
+                self._frame_index += 1
+                self.frames_grabbed += 1
+                self._condition.notify_all()
+
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+
+    def read_latest(self, after_index=-1, timeout=1.0):
+        """
+        Wait for a frame newer than after_index
+
+        Returns:
+            (frame_index, captured_at, frame) or None on timeout/stream end
+        """
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._frame_index > after_index or not self._running, timeout
+            )
+            if self._frame_index <= after_index:
+                return None
+            return self._frame_index, self._captured_at, self._frame
+
+    @property
+    def running(self):
+        return self._running
+
+    def stop(self):
+        """Stop grabbing and release an owned capture"""
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+        if self._owns_capture:
+            self.capture.release()
+
+
+class LiveAligner:
+    """
+    Continuous alignment from a video stream
+
+    A FrameGrabber thread keeps the latest frame and a detector thread
+    aligns whatever frame is newest, publishing a rolling homography with
+    timestamps and per-frame latency. Frames that arrive while the detector
+    is busy are dropped. Windows around the previous markers are searched
+    first, so a stationary jig stays cheap to track.
+    """
+
+    def __init__(self, core, source=0, roi_padding=0.5, reuse_stationary=True):
+        """
+        Initialize live aligner
+
+        Args:
+            core: AlignmentCore (may be shared with other stations)
+            source: FrameGrabber source (camera index, path or capture object)
+            roi_padding: Window padding for tracking the previous markers
+            reuse_stationary: Republish the cached homography while the
+                              marker regions are unchanged
+        """
+        self.core = core
+        self.grabber = FrameGrabber(source)
+        self.roi_padding = roi_padding
+        self.stationary_cache = MarkerRegionCache() if reuse_stationary else None
+
+        self._lock = threading.Condition()
+        self._latest = None
+        self._running = False
+        self._thread = None
+
+        self.frames_processed = 0
+        self.frames_failed = 0
+        self.last_error = None
+
+    @classmethod
+    def from_files(cls, jig_config_path, camera_config_path=None, source=0, **options):
+        """Build a live aligner with its own AlignmentCore"""
+        return cls(AlignmentCore.from_files(jig_config_path, camera_config_path, **options),
+                   source=source)
+
+    def start(self):
+        """Start the grabber and detector threads"""
+        self.grabber.start()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='LiveAligner', daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        frame_index = -1
+        previous = None
+
+        while self._running:
+            grabbed = self.grabber.read_latest(after_index=frame_index, timeout=0.5)
+            if grabbed is None:
+                if not self.grabber.running:
+                    break
+                continue
+
+            frame_index, captured_at, frame = grabbed
+            start = time.monotonic()
+
+            try:
+                search_frame = self.core.detection_frame(frame)
+
+                result = None
+                if self.stationary_cache is not None:
+                    result = self.stationary_cache.lookup(search_frame)
+
+                if result is None:
+                    result = self.core.align(
+                        search_frame, undistorted=True,
+                        search_quads=previous.detection.quads if previous else None,
+                        roi_padding=self.roi_padding,
+                        marker_side_px=previous.detection.marker_side_px if previous else None,
+                    )
+                    if self.stationary_cache is not None:
+                        self.stationary_cache.store(search_frame, result)
+            except ValueError as e:
+                self.frames_failed += 1
+                self.last_error = str(e)
+                previous = None
+                continue
+
+            published_at = time.monotonic()
+            previous = result
+
+            with self._lock:
+                self.frames_processed += 1
+                self._latest = LiveAlignment(
+                    frame_index=frame_index,
+                    captured_at=captured_at,
+                    published_at=published_at,
+                    process_ms=(published_at - start) * 1000.0,
+                    result=result,
+                    frame=frame,
+                )
+                self._lock.notify_all()
+
+        self._running = False
+
+    def latest(self):
+        """Most recent LiveAlignment (or None)"""
+        with self._lock:
+            return self._latest
+
+    def wait_for_alignment(self, newer_than=-1, timeout=5.0):
+        """
+        Block until an alignment newer than a frame index is published
+
+        Returns:
+            LiveAlignment or None on timeout
+        """
+        with self._lock:
+            self._lock.wait_for(
+                lambda: self._latest is not None and self._latest.frame_index > newer_than,
+                timeout
+            )
+            if self._latest is None or self._latest.frame_index <= newer_than:
+                return None
+            return self._latest
+
+    @property
+    def frames_dropped(self):
+        """Frames grabbed but never aligned because the detector was busy"""
+        return max(0, self.grabber.frames_grabbed - self.frames_processed - self.frames_failed)
+
+    def stats(self):
+        """Throughput and latency summary"""
+        latest = self.latest()
+        return {
+            'frames_grabbed': self.grabber.frames_grabbed,
+            'frames_processed': self.frames_processed,
+            'frames_failed': self.frames_failed,
+            'frames_dropped': self.frames_dropped,
+            'stationary_hits': self.stationary_cache.hits if self.stationary_cache else 0,
+            'latency_ms': latest.latency_ms if latest else None,
+            'process_ms': latest.process_ms if latest else None,
+        }
+
+    def stop(self):
+        """Stop both threads"""
+        self._running = False
+        self.grabber.stop()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def draw_live_overlay(frame, live, board_size_mm, design_overlay=None):
+    """
+    Draw the board outline and latency for a live alignment
+
+    Args:
+        frame: Camera frame to draw on (not modified)
+        live: Latest LiveAlignment (or None)
+        board_size_mm: Board size for the outline
+        design_overlay: Optional LiveOverlay projecting the design onto the feed
+    """
+    if live is not None and design_overlay is not None:
+        design_overlay.update(live.homography, (frame.shape[1], frame.shape[0]))
+        display = design_overlay.compose(frame)
+    else:
+        display = frame.copy()
+
+    if live is not None:
+        corners = live.result.transform_rect((0, 0, board_size_mm, board_size_mm))
+        cv2.polylines(display, [corners.astype(int)], True, (255, 255, 0), 3)
+        cv2.putText(display, f"Latency: {live.latency_ms:.0f}ms (detect {live.process_ms:.0f}ms)",
+                    (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+    else:
+        cv2.putText(display, "Searching for markers...",
+                    (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+
+    return display
+
+
+def main():
+    """CLI interface"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Live video alignment')
+    parser.add_argument('--source', default='0',
+                       help='Camera index or video file (default: 0)')
+    parser.add_argument('--jig-config', default='config/jigs/default.json',
+                       help='Jig configuration file')
+    parser.add_argument('--camera-calib', default='config/camera.yml',
+                       help='Camera calibration file (optional)')
+    parser.add_argument('--pyramid', action='store_true',
+                       help='Coarse-to-fine detection for high-resolution cameras')
+    parser.add_argument('--headless', action='store_true',
+                       help='Print alignments instead of showing a preview window')
+    parser.add_argument('--design', help='Design image to project onto the feed')
+    parser.add_argument('--text', help='Text design to project onto the feed')
+    parser.add_argument('--rect', nargs=4, type=float, metavar=('X', 'Y', 'WIDTH', 'HEIGHT'),
+                       help='Design rectangle in mm (required with --design/--text)')
+
+    args = parser.parse_args()
+
+    if (args.design or args.text) and not args.rect:
+        parser.error("--design/--text require --rect")
+
+    from pathlib import Path
+    source = int(args.source) if args.source.isdigit() else args.source
+    camera_calib = args.camera_calib if Path(args.camera_calib).exists() else None
+
+    live = LiveAligner.from_files(args.jig_config, camera_calib, source=source,
+                                  pyramid=args.pyramid)
+    board_size_mm = live.core.jig_config['board_size_mm']
+
+    design_overlay = None
+    if args.design or args.text:
+        from design_warp import LiveOverlay
+        design_overlay = LiveOverlay.from_design(args.rect, design_path=args.design, text=args.text)
+
+    try:
+        with live:
+            frame_index = -1
+            shown_index = -1
+            while live.grabber.running:
+                if args.headless:
+                    alignment = live.wait_for_alignment(newer_than=frame_index, timeout=1.0)
+                    if alignment is not None:
+                        frame_index = alignment.frame_index
+                        print(f"frame {alignment.frame_index}: "
+                              f"latency {alignment.latency_ms:.1f}ms, "
+                              f"dropped {live.frames_dropped}")
+                    continue
+
+                grabbed = live.grabber.read_latest(after_index=shown_index, timeout=1.0)
+                if grabbed is None:
+                    continue
+
+                shown_index = grabbed[0]
+                cv2.imshow('Live Alignment', draw_live_overlay(grabbed[2], live.latest(), board_size_mm,
+                                                               design_overlay))
+                if cv2.waitKey(1) & 0xFF == 27:  # ESC
+                    break
+
+    except KeyboardInterrupt:
+        pass
+
+    finally:
+        cv2.destroyAllWindows()
+        print(f"\n✓ Live alignment stats: {live.stats()}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
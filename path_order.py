@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+Path Order Module
+Orders vector paths to shorten the laser's travel moves between them
+
+Each path is reduced to its two endpoints (one for closed paths). A
+nearest-neighbour tour, searched on a uniform grid, seeds the order; 2-opt
+then reverses stretches of the tour wherever that shortens it, trying only
+each endpoint's nearest neighbours (found on a grid as well), so both
+stages stay close to linear in the number of paths.
+"""
+
+import math
+from collections import deque
+
+import numpy as np
+
+
+# Endpoints per grid cell, on average, for the nearest-neighbour search
+# and for collecting 2-opt candidates
+CELL_OCCUPANCY = 1.0
+CANDIDATE_CELL_OCCUPANCY = 2.0
+
+# 2-opt candidates per endpoint
+NEIGHBOURS = 8
+
+# Endpoints kept per cell when collecting 2-opt candidates (dense clusters)
+CELL_SLOTS = 4
+
+# Smallest travel saving (in path units) that counts as a 2-opt improvement
+MIN_GAIN = 1e-9
+
+# Smallest grid cell (in path units), for endpoints that all coincide
+MIN_CELL = 1e-6
+
+
+def travel_length(starts, ends, order, reverse, start=None):
+    """
+    Travel distance between consecutive paths
+
+    Args:
+        starts, ends: (n, 2) path start and end points
+        order: Path indices in cutting order
+        reverse: (n,) bool, paths cut from end to start
+        start: Head position before the first path (None: start there)
+
+    Returns:
+        float
+    """
+    order = np.asarray(order, dtype=np.int64)
+    if len(order) == 0:
+        return 0.0
+
+    flipped = np.asarray(reverse, dtype=bool)[order, np.newaxis]
+    entries = np.where(flipped, ends[order], starts[order])
+    exits = np.where(flipped, starts[order], ends[order])
+
+    travel = float(np.linalg.norm(entries[1:] - exits[:-1], axis=1).sum())
+    if start is not None:
+        travel += float(np.linalg.norm(entries[0] - np.asarray(start, dtype=np.float64)))
+    return travel
+
+
+def order_paths(starts, ends, closed, reversible=True, start=(0.0, 0.0), two_opt=True):
+    """
+    Cutting order with short travel moves
+
+    Args:
+        starts, ends: (n, 2) path start and end points
+        closed: (n,) bool, closed paths (start and end coincide; the
+                direction never changes the travel)
+        reversible: bool or (n,) bool, open paths that may be cut from end
+                    to start
+        start: Head position before the first path
+        two_opt: Improve the nearest-neighbour order with 2-opt
+
+    Returns:
+        (order, reverse): path indices in cutting order and (n,) bool of
+        open paths to cut backwards
+    """
+    starts = np.asarray(starts, dtype=np.float64).reshape(-1, 2)
+    ends = np.asarray(ends, dtype=np.float64).reshape(-1, 2)
+    closed = np.asarray(closed, dtype=bool)
+    n = len(starts)
+    if n == 0:
+        return np.empty(0, dtype=np.int64), np.zeros(0, dtype=bool)
+
+    flippable = ~closed & np.broadcast_to(np.asarray(reversible, dtype=bool), (n,))
+
+    # Endpoint 2i is path i's start and 2i + 1 its end; the head's start
+    # position is an extra closed path n that always comes first
+    points = np.empty((2 * n + 2, 2))
+    points[0:2 * n:2], points[1:2 * n:2] = starts, ends
+    points[2 * n:] = start
+    xs, ys = points[:, 0].tolist(), points[:, 1].tolist()
+
+    order, reverse = _nearest_neighbour(xs, ys, closed, flippable, n)
+
+    if two_opt and n > 2:
+        closed_all = np.append(closed, True)
+        # Only open paths that must keep their direction block a reversal
+        fixed = np.append(~closed & ~flippable, False)
+        order, reverse = _two_opt(points, xs, ys, np.append(n, order), np.append(reverse, False),
+                                  closed_all, fixed)
+        order = order[1:]
+        reverse = reverse[:n]
+
+    return order, reverse & ~closed
+
+
+def _grid_layout(points, occupancy):
+    """
+    Origin and cell size of a uniform grid over points
+
+    Cells are square, sized for the given average points per cell;
+    elongated (or collinear) sets get a single row.
+    """
+    lo = points.min(axis=0)
+    span = np.maximum(points.max(axis=0) - lo, MIN_CELL)
+    cells = max(1.0, len(points) / occupancy)
+    return lo, max(math.sqrt(span[0] * span[1] / cells), float(span.max()) / cells, MIN_CELL)
+
+
+class _EndpointGrid:
+    """Uniform grid of endpoints for nearest-neighbour search, with O(1) removal"""
+
+    def __init__(self, xs, ys, ids, slot, cell_of):
+        points = np.column_stack([np.take(xs, ids), np.take(ys, ids)])
+        lo, self.cell = _grid_layout(points, CELL_OCCUPANCY)
+        grid = ((points - lo) // self.cell).astype(np.int64)
+        self.x0, self.y0 = float(lo[0]), float(lo[1])
+        self.nx, self.ny = int(grid[:, 0].max()) + 1, int(grid[:, 1].max()) + 1
+        self.built = self.size = len(ids)
+        self.xs, self.ys = xs, ys
+        self.slot, self.cell_of = slot, cell_of
+
+        self.cells = [[] for _ in range(self.nx * self.ny)]
+        for i, c in zip(ids.tolist(), (grid[:, 1] * self.nx + grid[:, 0]).tolist()):
+            members = self.cells[c]
+            slot[i] = len(members)
+            cell_of[i] = c
+            members.append(i)
+
+    def remove(self, i):
+        members = self.cells[self.cell_of[i]]
+        last = members.pop()
+        if last != i:
+            members[self.slot[i]] = last
+            self.slot[last] = self.slot[i]
+        self.size -= 1
+
+    def nearest(self, x, y):
+        """Nearest remaining endpoint to (x, y), searched ring by ring"""
+        cell, nx, ny, cells = self.cell, self.nx, self.ny, self.cells
+        xs, ys = self.xs, self.ys
+        fx, fy = (x - self.x0) / cell, (y - self.y0) / cell
+        cx, cy = math.floor(fx), math.floor(fy)
+        last_ring = max(cx, nx - 1 - cx, cy, ny - 1 - cy)
+        # Rings closer than the grid's own cells are empty (point off the grid)
+        first_ring = max(-cx, cx - nx + 1, -cy, cy - ny + 1, 2)
+        # Distance from the point to the nearest side of its own cell
+        fx, fy = fx - cx, fy - cy
+        inset = min(fx, 1.0 - fx, fy, 1.0 - fy) * cell
+
+        # The 3x3 block around the point settles most searches
+        best, best_d2 = -1, math.inf
+        for gy in range(max(cy - 1, 0), min(cy + 1, ny - 1) + 1):
+            row = gy * nx
+            for c in range(row + max(cx - 1, 0), row + min(cx + 1, nx - 1) + 1):
+                for i in cells[c]:
+                    dx, dy = xs[i] - x, ys[i] - y
+                    d2 = dx * dx + dy * dy
+                    if d2 < best_d2:
+                        best, best_d2 = i, d2
+
+        r = first_ring
+        while r <= last_ring:
+            # Every cell of ring r lies beyond the r - 1 rings around the point
+            reach = (r - 1) * cell + inset
+            if best_d2 <= reach * reach:
+                break
+
+            y_lo, y_hi = cy - r, cy + r
+            for gy in range(max(y_lo, 0), min(y_hi, ny - 1) + 1):
+                if gy == y_lo or gy == y_hi:
+                    columns = range(max(cx - r, 0), min(cx + r, nx - 1) + 1)
+                else:
+                    columns = [gx for gx in (cx - r, cx + r) if 0 <= gx < nx]
+                row = gy * nx
+                for gx in columns:
+                    for i in cells[row + gx]:
+                        dx, dy = xs[i] - x, ys[i] - y
+                        d2 = dx * dx + dy * dy
+                        if d2 < best_d2:
+                            best, best_d2 = i, d2
+            r += 1
+
+        return best
+
+
+def _nearest_neighbour(xs, ys, closed, flippable, n):
+    """Greedy order from the start position (endpoint 2n) through all paths"""
+    # Closed paths and fixed open paths are only entered at their start
+    entry_ids = np.sort(np.concatenate([2 * np.arange(n), 2 * np.flatnonzero(flippable) + 1]))
+    in_grid = np.zeros(2 * n, dtype=bool)
+    in_grid[entry_ids] = True
+    in_grid = in_grid.tolist()
+
+    slot, cell_of = [0] * (2 * n), [0] * (2 * n)
+    grid = _EndpointGrid(xs, ys, entry_ids, slot, cell_of)
+
+    order = np.empty(n, dtype=np.int64)
+    reverse = np.zeros(n, dtype=bool)
+    x, y = xs[2 * n], ys[2 * n]
+
+    for step in range(n):
+        if step < n - 1:
+            i = grid.nearest(x, y)
+        else:
+            # Last path: enter it at its nearer endpoint, no search needed
+            i = in_grid.index(True) & ~1
+            if in_grid[i + 1] and ((xs[i + 1] - x) ** 2 + (ys[i + 1] - y) ** 2
+                                   < (xs[i] - x) ** 2 + (ys[i] - y) ** 2):
+                i += 1
+        grid.remove(i)
+        if in_grid[i ^ 1]:
+            grid.remove(i ^ 1)
+        in_grid[i] = in_grid[i ^ 1] = False
+
+        order[step] = i >> 1
+        reverse[i >> 1] = bool(i & 1)
+        # The head leaves from the other end
+        x, y = xs[i ^ 1], ys[i ^ 1]
+
+        # Regrid the remaining endpoints once most cells are empty, so the
+        # ring search doesn't sweep over cleared areas
+        if grid.size > 64 and grid.size * 4 < grid.built:
+            entry_ids = np.flatnonzero(in_grid)
+            grid = _EndpointGrid(xs, ys, entry_ids, slot, cell_of)
+
+    return order, reverse
+
+
+def _neighbour_lists(points, ids, k=NEIGHBOURS, chunk=1 << 15):
+    """
+    Up to k nearest other endpoints of each endpoint, nearest first
+
+    Candidates come from the 3x3 grid cells around each endpoint (at most
+    CELL_SLOTS per cell), all evaluated as arrays.
+
+    Returns:
+        (len(points), k) array of endpoint ids, -1 past the last neighbour
+    """
+    pts = points[ids]
+    lo, cell = _grid_layout(pts, CANDIDATE_CELL_OCCUPANCY)
+    grid = ((pts - lo) // cell).astype(np.int64)
+    nx, ny = int(grid[:, 0].max()) + 1, int(grid[:, 1].max()) + 1
+    cell_ids = grid[:, 1] * nx + grid[:, 0]
+
+    # (cells, CELL_SLOTS) table of member indices, -1 for empty slots
+    by_cell = np.argsort(cell_ids, kind='stable')
+    counts = np.bincount(cell_ids, minlength=nx * ny)
+    rank = np.empty(len(ids), dtype=np.int64)
+    rank[by_cell] = np.arange(len(ids)) - (np.cumsum(counts) - counts)[cell_ids[by_cell]]
+    table = np.full((nx * ny + 1, CELL_SLOTS), -1, dtype=np.int64)
+    kept = rank < CELL_SLOTS
+    table[cell_ids[kept], rank[kept]] = np.flatnonzero(kept)
+
+    px, py = pts[:, 0].copy(), pts[:, 1].copy()
+    offsets = [(dx, dy) for dy in (-1, 0, 1) for dx in (-1, 0, 1)]
+    neighbours = np.empty((len(ids), k), dtype=np.int64)
+    for begin in range(0, len(ids), chunk):
+        members = np.arange(begin, min(begin + chunk, len(ids)))
+        gx, gy = grid[members, 0:1], grid[members, 1:2]
+        shifted_x = gx + np.array([dx for dx, _ in offsets])
+        shifted_y = gy + np.array([dy for _, dy in offsets])
+        inside = (shifted_x >= 0) & (shifted_x < nx) & (shifted_y >= 0) & (shifted_y < ny)
+        # Out-of-grid cells read the empty last row of the table
+        cell_index = np.where(inside, shifted_y * nx + shifted_x, nx * ny)
+        candidates = table[cell_index].reshape(len(members), -1)
+
+        dx = px[candidates] - px[members, np.newaxis]
+        dy = py[candidates] - py[members, np.newaxis]
+        d2 = dx * dx + dy * dy
+        d2[(candidates < 0) | (candidates == members[:, np.newaxis])] = np.inf
+
+        width = min(k, d2.shape[1])
+        nearest = np.argpartition(d2, width - 1, axis=1)[:, :width]
+        distance = np.take_along_axis(d2, nearest, axis=1)
+        by_distance = distance.argsort(axis=1)
+        nearest = np.take_along_axis(nearest, by_distance, axis=1)
+        picked = np.take_along_axis(candidates, nearest, axis=1)
+        picked[~np.isfinite(np.take_along_axis(distance, by_distance, axis=1))] = -1
+        neighbours[begin:begin + len(members), :width] = picked
+        neighbours[begin:begin + len(members), width:] = -1
+
+    by_endpoint = np.full((len(points), k), -1, dtype=np.int64)
+    by_endpoint[ids] = np.where(neighbours >= 0, ids[neighbours], -1)
+    return by_endpoint
+
+
+def _two_opt(points, xs, ys, order, reverse, closed, fixed):
+    """
+    2-opt on an open tour whose first path is the fixed start position
+
+    Edge k joins the exit of order[k] to the entry of order[k + 1]; the last
+    path's exit is free. Swapping edges k < j for exit-to-exit and
+    entry-to-entry joins reverses (and flips) the paths at k + 1..j. Each
+    edge only tries joins to the nearest neighbours of its two endpoints,
+    and edges are revisited only when a move touches them.
+    """
+    m = len(order)
+    last = m - 1
+
+    # Closed paths have one distinct endpoint; their end shares its neighbours
+    distinct = np.flatnonzero(np.repeat(~closed, 2) | (np.arange(2 * m) % 2 == 0))
+    neighbours = _neighbour_lists(points, distinct)
+    ends = 2 * np.flatnonzero(closed)
+    neighbours[ends + 1] = neighbours[ends]
+    neighbours = neighbours.tolist()
+
+    closed = closed.tolist()
+    has_fixed = bool(fixed.any())
+    pos = np.empty(m, dtype=np.int64)
+    pos[order] = np.arange(m)
+    hypot = math.hypot
+
+    # Scalar reads through memoryviews give plain ints and bools, fast;
+    # moves still reverse whole stretches with NumPy slices
+    order_at, pos_of, flipped = memoryview(order), memoryview(pos), memoryview(reverse)
+
+    queue = deque(order.tolist())
+    queued = [True] * m
+
+    def move(k, j):
+        """Reverse positions min(k, j) + 1..max(k, j) if allowed"""
+        lo, hi = (k, j) if k < j else (j, k)
+        segment = order[lo + 1:hi + 1].copy()
+        if has_fixed and fixed[segment].any():
+            return False
+        order[lo + 1:hi + 1] = segment[::-1]
+        pos[segment] = np.arange(hi, lo, -1)
+        reverse[segment] ^= True
+        for p in (lo, lo + 1, hi, hi + 1):
+            if p <= last:
+                path = order_at[p]
+                if not queued[path]:
+                    queued[path] = True
+                    queue.append(path)
+        return True
+
+    while queue:
+        a = queue.popleft()
+        queued[a] = False
+        k = pos_of[a]
+        if k == last:
+            continue
+
+        b = order_at[k + 1]
+        x_id = 2 * a + (0 if flipped[a] else 1)
+        y_id = 2 * b + (1 if flipped[b] else 0)
+        ax, ay, bx, by = xs[x_id], ys[x_id], xs[y_id], ys[y_id]
+        edge = hypot(bx - ax, by - ay)
+        if edge <= MIN_GAIN:
+            continue
+
+        improved = False
+        # Join this exit to a nearby exit: swap with the edge leaving it
+        for e in neighbours[x_id]:
+            if e < 0:
+                break
+            joined = hypot(xs[e] - ax, ys[e] - ay)
+            if joined >= edge:
+                break
+            q = e >> 1
+            if q == a or q == b or not (closed[q] or (e & 1) != flipped[q]):
+                continue
+            j = pos_of[q]
+            gain = edge - joined
+            if j < last:
+                f = 2 * order_at[j + 1]
+                f += 1 if flipped[f >> 1] else 0
+                gain += hypot(xs[f] - xs[e], ys[f] - ys[e]) - hypot(xs[f] - bx, ys[f] - by)
+            if gain > MIN_GAIN and move(k, j):
+                improved = True
+                break
+
+        if improved:
+            continue
+
+        # Join this entry to a nearby entry: swap with the edge arriving there
+        for e in neighbours[y_id]:
+            if e < 0:
+                break
+            joined = hypot(xs[e] - bx, ys[e] - by)
+            if joined >= edge:
+                break
+            q = e >> 1
+            if q == a or q == b or not (closed[q] or (e & 1) == flipped[q]):
+                continue
+            j = pos_of[q] - 1
+            if j < 0:
+                continue
+            g = 2 * order_at[j]
+            g += 0 if flipped[g >> 1] else 1
+            gain = edge - joined + hypot(xs[e] - xs[g], ys[e] - ys[g]) - hypot(xs[g] - ax, ys[g] - ay)
+            if gain > MIN_GAIN and move(k, j):
+                break
+
+    return order, reverse
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+PNG Writer
+Fast PNG encoding for engraving exports: 1-bit packed monochrome with
+configurable zlib level, zlib strategy and PNG row filter, and DPI (pHYs)
+metadata written directly. PngStreamWriter encodes row strips incrementally
+for exports too large to hold in memory.
+"""
+
+import cv2
+import numpy as np
+import struct
+import zlib
+
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# PNG row filter types (ISO 15948, section 9)
+PNG_FILTERS = {'none': 0, 'sub': 1, 'up': 2, 'average': 3, 'paeth': 4}
+
+ZLIB_STRATEGIES = {
+    'default': zlib.Z_DEFAULT_STRATEGY,
+    'filtered': zlib.Z_FILTERED,
+    'huffman': zlib.Z_HUFFMAN_ONLY,
+    'rle': zlib.Z_RLE,
+    'fixed': zlib.Z_FIXED,
+}
+
+_CV2_STRATEGIES = {
+    'default': cv2.IMWRITE_PNG_STRATEGY_DEFAULT,
+    'filtered': cv2.IMWRITE_PNG_STRATEGY_FILTERED,
+    'huffman': cv2.IMWRITE_PNG_STRATEGY_HUFFMAN_ONLY,
+    'rle': cv2.IMWRITE_PNG_STRATEGY_RLE,
+    'fixed': cv2.IMWRITE_PNG_STRATEGY_FIXED,
+}
+
+MONO_METHODS = ('threshold', 'dither')
+
+# 8x8 Bayer matrix for ordered dithering
+_BAYER_8 = np.array([
+    [0, 32, 8, 40, 2, 34, 10, 42],
+    [48, 16, 56, 24, 50, 18, 58, 26],
+    [12, 44, 4, 36, 14, 46, 6, 38],
+    [60, 28, 52, 20, 62, 30, 54, 22],
+    [3, 35, 11, 43, 1, 33, 9, 41],
+    [51, 19, 59, 27, 49, 17, 57, 25],
+    [15, 47, 7, 39, 13, 45, 5, 37],
+    [63, 31, 55, 23, 61, 29, 53, 21],
+], dtype=np.float32)
+
+
+def _chunk(chunk_type, data):
+    """Length, type, data and CRC of one PNG chunk"""
+    return (struct.pack('>I', len(data)) + chunk_type + data
+            + struct.pack('>I', zlib.crc32(chunk_type + data) & 0xffffffff))
+
+
+def phys_chunk(dpi):
+    """pHYs chunk for a DPI (pixels per metre, unit = metre)"""
+    ppm = int(round(dpi / 0.0254))
+    return _chunk(b'pHYs', struct.pack('>IIB', ppm, ppm, 1))
+
+
+def to_monochrome(image, method='threshold', threshold=128, row_offset=0):
+    """
+    Reduce a design to ink / no ink
+
+    Transparent pixels (alpha < 128) never carry ink.
+
+    Args:
+        image: Grey, BGR or BGRA design
+        method: 'threshold' or 'dither' (8x8 ordered dither, fully vectorized)
+        threshold: Grey level below which a pixel is ink (threshold method)
+        row_offset: Row of image[0] in the full design, so that dithered
+                    strips line up with the dither pattern of the whole image
+
+    Returns:
+        Boolean array, True where the laser should fire (dark pixels)
+    """
+    if method not in MONO_METHODS:
+        raise ValueError(f"Unsupported monochrome method: {method}")
+
+    transparent = None
+    if image.ndim == 3 and image.shape[2] == 4:
+        transparent = image[:, :, 3] < 128
+        gray = cv2.cvtColor(image, cv2.COLOR_BGRA2GRAY)
+    elif image.ndim == 3:
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    else:
+        gray = image
+
+    if method == 'threshold':
+        ink = gray < threshold
+    else:
+        h, w = gray.shape
+        pattern = np.roll(_BAYER_8, -(row_offset % 8), axis=0)
+        levels = np.tile((pattern + 0.5) * (255.0 / 64.0), (h // 8 + 1, w // 8 + 1))[:h, :w]
+        ink = gray < levels
+
+    if transparent is not None:
+        ink &= ~transparent
+
+    return ink
+
+
+def _filter_rows(raw, png_filter, bpp=1, prev_row=None):
+    """
+    Apply a PNG row filter to scanlines
+
+    Filters predict from the unfiltered neighbours only, so every row is
+    filtered at once.
+
+    Args:
+        raw: (rows, bytes per row) uint8 scanlines
+        png_filter: Filter name or 'adaptive'
+        bpp: Bytes per complete pixel (1 for bit depths below 8)
+        prev_row: Unfiltered scanline above raw[0] (None at the top of the image)
+
+    Returns:
+        (filtered rows, per-row filter type)
+    """
+    raw = raw.astype(np.int16)
+    above = np.zeros_like(raw)
+    above[1:] = raw[:-1]
+    if prev_row is not None:
+        above[0] = prev_row
+
+    def left():
+        shifted = np.zeros_like(raw)
+        shifted[:, bpp:] = raw[:, :-bpp]
+        return shifted
+
+    def up_left():
+        shifted = np.zeros_like(raw)
+        shifted[:, bpp:] = above[:, :-bpp]
+        return shifted
+
+    def paeth():
+        a, b, c = left(), above, up_left()
+        p = a + b - c
+        pa, pb, pc = np.abs(p - a), np.abs(p - b), np.abs(p - c)
+        return np.where((pa <= pb) & (pa <= pc), a, np.where(pb <= pc, b, c))
+
+    predictors = {
+        'none': lambda: 0,
+        'sub': left,
+        'up': lambda: above,
+        'average': lambda: (left() + above) // 2,
+        'paeth': paeth,
+    }
+
+    if png_filter != 'adaptive':
+        if png_filter not in predictors:
+            raise ValueError(f"Unsupported PNG filter: {png_filter}")
+        raw -= predictors[png_filter]()
+        raw &= 0xff
+        return raw.astype(np.uint8), np.full(len(raw), PNG_FILTERS[png_filter], dtype=np.uint8)
+
+    # Adaptive: per row, the filter with the smallest sum of signed residuals (libpng heuristic)
+    candidates = np.stack([(raw - predictors[name]()) & 0xff for name in PNG_FILTERS]).astype(np.uint8)
+    cost = np.abs(candidates.view(np.int8).astype(np.int32)).sum(axis=2)
+    best = cost.argmin(axis=0)
+    filtered = candidates[best, np.arange(len(raw))]
+    return filtered, best.astype(np.uint8)
+
+
+def encode_png_1bit(ink, dpi, level=6, png_filter='up', strategy='rle'):
+    """
+    Encode a 1-bit greyscale PNG (ink = black)
+
+    Args:
+        ink: Boolean array, True for black
+        dpi: Resolution written to pHYs
+        level: zlib compression level 0-9
+        png_filter: 'none', 'sub', 'up', 'average', 'paeth' or 'adaptive'
+        strategy: zlib strategy ('rle', 'default', 'filtered', 'huffman', 'fixed')
+
+    Returns:
+        PNG file bytes
+    """
+    height, width = ink.shape
+
+    # 1 = white in greyscale PNGs; packbits pads each row to whole bytes
+    rows = np.packbits(~ink, axis=1)
+    filtered, filter_types = _filter_rows(rows, png_filter)
+    scanlines = np.hstack([filter_types[:, np.newaxis], filtered])
+
+    compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS, 9, ZLIB_STRATEGIES[strategy])
+    idat = compressor.compress(scanlines.tobytes()) + compressor.flush()
+
+    return (_header(width, height, 1, 0, dpi)
+            + _chunk(b'IDAT', idat) + _chunk(b'IEND', b''))
+
+
+def _header(width, height, bit_depth, colour_type, dpi):
+    """Signature, IHDR and pHYs"""
+    ihdr = struct.pack('>IIBBBBB', width, height, bit_depth, colour_type, 0, 0, 0)
+    return PNG_SIGNATURE + _chunk(b'IHDR', ihdr) + phys_chunk(dpi)
+
+
+def encode_png(image, dpi, level=6, strategy='rle'):
+    """
+    Encode a BGR/BGRA/grey image with OpenCV's PNG encoder and add pHYs
+
+    OpenCV writes BGR data as RGB itself, so no converted copy is needed.
+
+    Returns:
+        PNG file bytes
+    """
+    ok, buffer = cv2.imencode('.png', image, [
+        cv2.IMWRITE_PNG_COMPRESSION, level,
+        cv2.IMWRITE_PNG_STRATEGY, _CV2_STRATEGIES[strategy],
+    ])
+    if not ok:
+        raise ValueError("PNG encoding failed")
+
+    data = buffer.tobytes()
+
+    # pHYs must precede IDAT; IHDR is always the first chunk (8 + 25 bytes)
+    ihdr_end = len(PNG_SIGNATURE) + 25
+    return data[:ihdr_end] + phys_chunk(dpi) + data[ihdr_end:]
+
+
+class PngStreamWriter:
+    """
+    Incremental PNG encoder: rows are filtered, compressed and written as
+    they arrive, one IDAT chunk per strip, so memory is bounded by the
+    strip size rather than the image size
+
+    Modes:
+        'mono': boolean ink masks, written as 1-bit greyscale
+        'grey': 8-bit greyscale rows
+        'rgb':  BGR/BGRA rows, written as 8-bit RGB (alpha is dropped as in
+                the in-memory colour export)
+    """
+
+    # mode: (bit depth, colour type, filter bytes per pixel)
+    MODES = {'mono': (1, 0, 1), 'grey': (8, 0, 1), 'rgb': (8, 2, 3)}
+
+    def __init__(self, file, width, height, dpi, mode='rgb', level=6,
+                 png_filter='up', strategy='rle'):
+        """
+        Initialize writer and write the PNG header
+
+        Args:
+            file: Binary file object to write to
+            width, height: Image size in pixels
+            dpi: Resolution written to pHYs
+            mode: 'mono', 'grey' or 'rgb'
+            level: zlib compression level 0-9
+            png_filter: PNG row filter or 'adaptive'
+            strategy: zlib strategy
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Unsupported PNG stream mode: {mode}")
+
+        bit_depth, colour_type, self._bpp = self.MODES[mode]
+
+        self.file = file
+        self.width = width
+        self.height = height
+        self.mode = mode
+        self.png_filter = png_filter
+        self.rows_written = 0
+
+        self._prev_row = None
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS, 9,
+                                            ZLIB_STRATEGIES[strategy])
+
+        self.file.write(_header(width, height, bit_depth, colour_type, dpi))
+
+    def write_rows(self, rows):
+        """
+        Encode the next strip of rows
+
+        Args:
+            rows: (n, width) ink mask or grey rows, or (n, width, 3|4) BGR(A)
+        """
+        if rows.shape[1] != self.width or self.rows_written + len(rows) > self.height:
+            raise ValueError(f"Strip of shape {rows.shape} does not fit a "
+                             f"{self.width}x{self.height} PNG at row {self.rows_written}")
+
+        if self.mode == 'mono':
+            raw = np.packbits(~rows, axis=1)
+        elif self.mode == 'grey':
+            raw = rows
+        else:
+            raw = rows[:, :, 2::-1].reshape(len(rows), -1)
+
+        filtered, filter_types = _filter_rows(raw, self.png_filter, self._bpp, self._prev_row)
+        scanlines = np.hstack([filter_types[:, np.newaxis], filtered])
+
+        self._prev_row = raw[-1].copy()
+        self.rows_written += len(rows)
+
+        data = self._compressor.compress(scanlines.tobytes())
+        if data:
+            self.file.write(_chunk(b'IDAT', data))
+
+    def close(self):
+        """Flush the compressor and write the trailer"""
+        if self.rows_written != self.height:
+            raise ValueError(f"PNG incomplete: {self.rows_written} of {self.height} rows written")
+
+        self.file.write(_chunk(b'IDAT', self._compressor.flush()))
+        self.file.write(_chunk(b'IEND', b''))
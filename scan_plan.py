@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Scan Planning Module
+Estimates raster engraving work per scan angle from a design's ink mask
+
+The laser sweeps each scan line containing ink from its first to its last
+ink pixel, plus an overscan run-out at both ends, and skips blank lines.
+Comparing that total travel across candidate angles picks the fastest
+orientation (LightBurn's "Scan Angle" layer setting, or a 90° rotation
+baked into the export).
+"""
+
+import cv2
+import numpy as np
+
+
+# Candidate scan angles in degrees (scan direction counter-clockwise from +X)
+SCAN_ANGLES = tuple(range(0, 180, 15))
+
+# Head run-out past the ink at each end of a scan line
+DEFAULT_OVERSCAN_MM = 2.5
+
+
+def rotate_mask(ink, angle_deg):
+    """
+    Rotate a mask so the scan direction at angle_deg runs along the rows
+
+    Quarter turns are exact; other angles use nearest-neighbour sampling on
+    a canvas grown to fit.
+
+    Args:
+        ink: Boolean mask, True where the laser fires
+        angle_deg: Scan direction, counter-clockwise from +X (Y up)
+
+    Returns:
+        uint8 mask (0/1)
+    """
+    mask = ink.view(np.uint8) if ink.dtype == bool else (ink > 0).astype(np.uint8)
+
+    if float(angle_deg) % 180 == 0:
+        return mask
+    if float(angle_deg) % 180 == 90:
+        return cv2.rotate(mask, cv2.ROTATE_90_CLOCKWISE)
+
+    h, w = mask.shape
+    matrix = cv2.getRotationMatrix2D((w / 2.0, h / 2.0), -angle_deg, 1.0)
+    cos, sin = abs(matrix[0, 0]), abs(matrix[0, 1])
+    size = (int(np.ceil(w * cos + h * sin)), int(np.ceil(w * sin + h * cos)))
+    matrix[:, 2] += (np.array(size) - [w, h]) / 2.0
+    return cv2.warpAffine(mask, matrix, size, flags=cv2.INTER_NEAREST)
+
+
+def scan_lines(ink, angle_deg):
+    """
+    Scan lines and swept length at one angle
+
+    Args:
+        ink: Boolean mask, True where the laser fires
+        angle_deg: Scan direction, counter-clockwise from +X (Y up)
+
+    Returns:
+        (lines with ink, summed first-to-last ink extent) in pixels
+    """
+    mask = rotate_mask(ink, angle_deg)
+
+    rows = mask.any(axis=1)
+    if not rows.any():
+        return 0, 0
+
+    mask = mask[rows]
+    first = mask.argmax(axis=1)
+    last = mask.shape[1] - 1 - mask[:, ::-1].argmax(axis=1)
+
+    return int(rows.sum()), int((last - first + 1).sum())
+
+
+def analyze_scan_angles(ink, px_per_mm, angles=SCAN_ANGLES, overscan_mm=DEFAULT_OVERSCAN_MM):
+    """
+    Estimate raster travel for each candidate scan angle
+
+    Args:
+        ink: Boolean mask at px_per_mm (line interval = one pixel)
+        px_per_mm: Mask resolution
+        angles: Candidate scan angles in degrees
+        overscan_mm: Run-out past the ink at each end of every line
+
+    Returns:
+        dict with 'angles' (per angle: lines, scan_mm, overscans and
+        travel_mm = scan_mm + overscans * overscan_mm) and 'best' (the
+        entry with the least travel; ties keep the earlier angle)
+    """
+    estimates = []
+    for angle in angles:
+        lines, extent_px = scan_lines(ink, angle)
+        scan_mm = extent_px / px_per_mm
+        estimates.append({
+            'angle_deg': float(angle),
+            'lines': lines,
+            'scan_mm': float(scan_mm),
+            'overscans': 2 * lines,
+            'travel_mm': float(scan_mm + 2 * lines * overscan_mm),
+        })
+
+    best = min(estimates, key=lambda estimate: estimate['travel_mm'])
+    return {'angles': estimates, 'best': best, 'overscan_mm': float(overscan_mm)}
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Stage Timer
+Lightweight per-stage timing and peak-memory instrumentation for the workflow
+
+Modules mark their stages with stage() / @timed(); nothing is recorded unless
+a StageTimer is active in the current thread (or asyncio task), so the
+instrumentation costs one context-variable lookup per stage when disabled.
+"""
+
+import contextlib
+import contextvars
+import functools
+import json
+import time
+import tracemalloc
+from datetime import datetime
+
+
+_active_timer = contextvars.ContextVar('stage_timer', default=None)
+_NULL_STAGE = contextlib.nullcontext()
+
+
+def stage(name):
+    """
+    Context manager timing a stage on the active StageTimer (no-op if none)
+
+    Args:
+        name: Stage name (nested stages are recorded with their depth)
+    """
+    timer = _active_timer.get()
+    if timer is None:
+        return _NULL_STAGE
+    return timer.stage(name)
+
+
+def timed(name):
+    """Decorator form of stage()"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            timer = _active_timer.get()
+            if timer is None:
+                return func(*args, **kwargs)
+            with timer.stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class StageTimer:
+    """
+    Records a monotonic duration and peak traced-memory delta per stage
+
+    Memory is measured with tracemalloc, which sees NumPy (and therefore
+    OpenCV output) buffers as well as Python objects. Tracing slows
+    allocations down, so it can be switched off for pure latency runs.
+    """
+
+    def __init__(self, trace_memory=True):
+        """
+        Initialize timer
+
+        Args:
+            trace_memory: Record peak memory per stage with tracemalloc
+                          (needs tracemalloc.reset_peak, Python 3.9+)
+        """
+        self.trace_memory = trace_memory and hasattr(tracemalloc, 'reset_peak')
+        self.records = []
+        self.started_at = None
+        self.total_ms = 0.0
+
+        self._origin = None
+        self._stack = []
+        self._started_tracing = False
+
+    @contextlib.contextmanager
+    def activate(self):
+        """Make this the active timer for the enclosed code"""
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self._origin = time.perf_counter()
+        token = _active_timer.set(self)
+
+        try:
+            yield self
+        finally:
+            _active_timer.reset(token)
+            self.total_ms = (time.perf_counter() - self._origin) * 1000.0
+            if self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Time one stage (see stage())"""
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        entry = {'name': name, 'depth': len(self._stack), 'peak': 0, 'current': 0}
+
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            # Resetting the peak for this stage must not hide it from the parent
+            if self._stack:
+                self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+            tracemalloc.reset_peak()
+            entry['current'] = current
+
+        self._stack.append(entry)
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self._stack.pop()
+
+            record = {
+                'name': name,
+                'depth': entry['depth'],
+                'start_ms': (start - self._origin) * 1000.0,
+                'duration_ms': (end - start) * 1000.0,
+                'peak_mem_delta_kb': None,
+            }
+
+            if tracing and tracemalloc.is_tracing():
+                peak = max(entry['peak'], tracemalloc.get_traced_memory()[1])
+                record['peak_mem_delta_kb'] = (peak - entry['current']) / 1024.0
+                if self._stack:
+                    self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+
+            self.records.append(record)
+
+    def ordered_records(self):
+        """Records in start order (parents before their nested stages)"""
+        return sorted(self.records, key=lambda record: (record['start_ms'], record['depth']))
+
+    def to_dict(self):
+        """Structured record of the run"""
+        return {
+            'started_at': self.started_at,
+            'total_ms': self.total_ms,
+            'trace_memory': self.trace_memory,
+            'stages': self.ordered_records(),
+        }
+
+    def save(self, output_path):
+        """Write the structured record as JSON"""
+        with open(output_path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return output_path
+
+    def summary(self):
+        """
+        Summary table of all stages
+
+        Returns:
+            str
+        """
+        lines = [f"{'Stage':<32}{'time':>12}{'share':>8}{'peak mem':>12}"]
+
+        for record in self.ordered_records():
+            name = '  ' * record['depth'] + record['name']
+            share = record['duration_ms'] / self.total_ms * 100.0 if self.total_ms else 0.0
+            memory = record['peak_mem_delta_kb']
+            memory = f"{memory / 1024.0:>10.1f}MB" if memory is not None else f"{'-':>12}"
+            lines.append(f"{name:<32}{record['duration_ms']:>10.1f}ms{share:>7.0f}%{memory}")
+
+        lines.append(f"{'Total':<32}{self.total_ms:>10.1f}ms")
+        return '\n'.join(lines)
@@ -266,6 +266,1653 @@ def test_design_export():
         return False
 
 
+def write_test_calibration(calib_path, image_size):
+    """
+    Write a synthetic camera calibration in calibrate.py's format
+
+    Args:
+        calib_path: Output YAML path
+        image_size: (width, height) in pixels
+
+    Returns:
+        (camera_matrix, dist_coeffs)
+    """
+    w, h = image_size
+    camera_matrix = np.array([[0.9 * w, 0, w / 2], [0, 0.9 * w, h / 2], [0, 0, 1]])
+    dist_coeffs = np.array([[-0.2, 0.05, 0.0, 0.0, 0.0]])
+
+    calib_path = Path(calib_path)
+    calib_path.parent.mkdir(parents=True, exist_ok=True)
+    fs = cv2.FileStorage(str(calib_path), cv2.FILE_STORAGE_WRITE)
+    fs.write('camera_matrix', camera_matrix)
+    fs.write('distortion_coefficients', dist_coeffs)
+    fs.release()
+
+    return camera_matrix, dist_coeffs
+
+
+def test_undistortion_cache(image_path):
+    """
+    Test cached remap undistortion against cv2.undistort
+
+    Args:
+        image_path: Path to test image
+
+    Returns:
+        bool: True if test passes
+    """
+    print(f"\n{'='*60}")
+    print("Test: Undistortion Cache")
+    print(f"{'='*60}\n")
+
+    from undistort import UndistortionEngine
+
+    try:
+        img = cv2.imread(str(image_path))
+        h, w = img.shape[:2]
+
+        calib_path = Path('test_output/camera.yml')
+        camera_matrix, dist_coeffs = write_test_calibration(calib_path, (w, h))
+
+        new_camera_matrix, roi = cv2.getOptimalNewCameraMatrix(
+            camera_matrix, dist_coeffs, (w, h), 1, (w, h)
+        )
+        expected = cv2.undistort(img, camera_matrix, dist_coeffs, None, new_camera_matrix)
+
+        engine = UndistortionEngine.from_file(calib_path)
+        for table in calib_path.parent.glob('camera_undistort_*.npz'):
+            table.unlink()
+        UndistortionEngine.clear_memory_cache()
+
+        result = engine.undistort(img)
+        persisted = engine.cache_path((w, h))
+
+        # A fresh cache must reload the persisted tables
+        UndistortionEngine.clear_memory_cache()
+        reloaded = engine.undistort(img)
+
+        # A truncated table file is rebuilt instead of failing the run
+        persisted.write_bytes(persisted.read_bytes()[:1000])
+        UndistortionEngine.clear_memory_cache()
+        rebuilt = engine.undistort(img)
+
+        diff = np.abs(result.astype(np.int16) - expected.astype(np.int16)).mean()
+
+        if not persisted.exists():
+            print(f"✗ FAIL: Tables not persisted: {persisted}")
+            return False
+        if diff > 0.5 or not np.array_equal(result, reloaded) or not np.array_equal(result, rebuilt):
+            print(f"✗ FAIL: Remap differs from cv2.undistort (mean diff {diff:.3f})")
+            return False
+
+        print(f"✓ PASS: Remap matches cv2.undistort (mean diff {diff:.3f})")
+        print(f"  Tables: {persisted}")
+        return True
+
+    except Exception as e:
+        print(f"✗ FAIL: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_points_undistortion(image_path, jig_config_path):
+    """
+    Test points-only undistortion gives the same alignment as full-frame
+
+    Args:
+        image_path: Path to test image
+        jig_config_path: Path to jig config
+
+    Returns:
+        bool: True if test passes
+    """
+    print(f"\n{'='*60}")
+    print("Test: Points-Only Undistortion")
+    print(f"{'='*60}\n")
+
+    from aruco_align import ArucoAligner
+
+    try:
+        img = cv2.imread(str(image_path))
+        calib_path = Path('test_output/camera.yml')
+        write_test_calibration(calib_path, (img.shape[1], img.shape[0]))
+
+        design_rect_mm = (75, 75, 50, 50)
+        results = {}
+        for mode in ('frame', 'points'):
+            aligner = ArucoAligner(jig_config_path, calib_path, undistort_mode=mode)
+            aligner.load_image(image_path)
+            aligner.detect_markers()
+            aligner.calculate_homography()
+            results[mode] = aligner.calculate_alignment_for_design(design_rect_mm)
+
+            if mode == 'points' and aligner._image is not None:
+                print("✗ FAIL: Full frame undistorted eagerly in points mode")
+                return False
+
+        corners_frame = np.array(results['frame']['corners_px'])
+        corners_points = np.array(results['points']['corners_px'])
+        max_error = np.abs(corners_frame - corners_points).max()
+
+        if max_error < 1.0:
+            print(f"✓ PASS: Points-only alignment matches full-frame (max {max_error:.3f}px)")
+            return True
+        else:
+            print(f"✗ FAIL: Alignment differs by {max_error:.3f}px")
+            return False
+
+    except Exception as e:
+        print(f"✗ FAIL: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_pyramid_detection(image_path, jig_config_path):
+    """
+    Test coarse-to-fine detection matches full-resolution detection
+
+    Args:
+        image_path: Path to test image
+        jig_config_path: Path to jig config
+
+    Returns:
+        bool: True if test passes
+    """
+    print(f"\n{'='*60}")
+    print("Test: Pyramid Detection")
+    print(f"{'='*60}\n")
+
+    from aruco_align import ArucoAligner
+
+    try:
+        full = ArucoAligner(jig_config_path)
+        full.load_image(image_path)
+        expected = full.detect_markers()
+
+        pyramid = ArucoAligner(jig_config_path, pyramid=True)
+        pyramid.load_image(image_path)
+        scale = pyramid.pyramid_scale(pyramid.image_size)
+        markers = pyramid.detect_markers()
+
+        if scale >= 0.9 or set(markers) != set(expected):
+            print(f"✗ FAIL: Pyramid detection at scale {scale:.2f} found {list(markers)}")
+            return False
+
+        max_error = max(np.linalg.norm(markers[i] - expected[i]) for i in expected)
+
+        if max_error < 0.5:
+            print(f"✓ PASS: Pyramid (scale {scale:.2f}) matches full resolution "
+                  f"(max {max_error:.3f}px)")
+            return True
+        else:
+            print(f"✗ FAIL: Marker centers differ by {max_error:.3f}px")
+            return False
+
+    except Exception as e:
+        print(f"✗ FAIL: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_roi_tracking(image_path, jig_config_path):
+    """
+    Test ROI-tracked detection for a stationary and a moved jig
+
+    Args:
+        image_path: Path to test image
+        jig_config_path: Path to jig config
+
+    Returns:
+        bool: True if test passes
+    """
+    print(f"\n{'='*60}")
+    print("Test: ROI Tracking")
+    print(f"{'='*60}\n")
+
+    from aruco_align import ArucoAligner
+
+    try:
+        ArucoAligner._roi_tracks.clear()
+        ArucoAligner._roi_stats.clear()
+
+        # First shot is a full-frame search, second reuses the windows
+        results = []
+        for _ in range(2):
+            aligner = ArucoAligner(jig_config_path, roi_tracking=True)
+            aligner.load_image(image_path)
+            results.append(aligner.detect_markers())
+
+        # Moved jig: windows miss, full-frame search must still succeed
+        img = cv2.imread(str(image_path))
+        moved_path = Path('test_output/test_camera_image_moved.png')
+        cv2.imwrite(str(moved_path), np.roll(img, (150, 300), axis=(0, 1)))
+        aligner = ArucoAligner(jig_config_path, roi_tracking=True)
+        aligner.load_image(moved_path)
+        moved = aligner.detect_markers()
+
+        stats = ArucoAligner.roi_stats(aligner.jig_config['jig_name'])[aligner.jig_config['jig_name']]
+        max_error = max(np.linalg.norm(results[1][i] - results[0][i]) for i in results[0])
+        shift_error = max(np.linalg.norm(moved[i] - results[0][i] - (300, 150)) for i in results[0])
+
+        if stats['hits'] == 1 and stats['misses'] == 1 and max_error < 1e-3 and shift_error < 1.0:
+            print(f"✓ PASS: ROI hit ratio {stats['hit_ratio']:.2f}, moved jig re-detected")
+            return True
+        else:
+            print(f"✗ FAIL: stats {stats}, error {max_error:.3f}px, moved {shift_error:.3f}px")
+            return False
+
+    except Exception as e:
+        print(f"✗ FAIL: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_batch_alignment(image_path, jig_config_path):
+    """
+    Test process-pool batch alignment with a failing image
+
+    Args:
+        image_path: Path to test image
+        jig_config_path: Path to jig config
+
+    Returns:
+        bool: True if test passes
+    """
+    print(f"\n{'='*60}")
+    print("Test: Batch Alignment")
+    print(f"{'='*60}\n")
+
+    from aruco_align import AlignmentCore, ArucoAligner
+
+    try:
+        missing_path = Path('test_output/missing_snapshot.jpg')
+        aligner = ArucoAligner(jig_config_path)
+        results = list(aligner.process_batch(
+            [image_path, image_path, missing_path], workers=2,
+            design_rect_mm=(75, 75, 50, 50)
+        ))
+
+        succeeded = [r for r in results if r['ok']]
+        failed = [r for r in results if not r['ok']]
+
+        # Aligners wrapping a shared core (daemon, align_tool) have no config paths
+        shared = ArucoAligner.from_core(AlignmentCore.from_files(jig_config_path), reuse_stationary=True)
+        shared_results = list(shared.process_batch([image_path], workers=1))
+
+        if (len(succeeded) == 2 and len(failed) == 1
+                and failed[0]['image'] == str(missing_path)
+                and all(r['markers'] == [0, 1, 2, 3] for r in succeeded)
+                and shared_results[0]['ok'] and shared_results[0]['markers'] == [0, 1, 2, 3]):
+            print(f"✓ PASS: Batch aligned 2/3 images, failure reported: {failed[0]['error']}")
+            return True
+        else:
+            print(f"✗ FAIL: Unexpected batch results: {results}")
+            return False
+
+    except Exception as e:
+        print(f"✗ FAIL: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_shared_core(image_path, jig_config_path):
+    """
+    Test one AlignmentCore shared across a thread pool
+
+    Args:
+        image_path: Path to test image
+        jig_config_path: Path to jig config
+
+    Returns:
+        bool: True if test passes
+    """
+    print(f"\n{'='*60}")
+    print("Test: Shared Alignment Core")
+    print(f"{'='*60}\n")
+
+    from concurrent.futures import ThreadPoolExecutor
+    from aruco_align import AlignmentCore, ArucoAligner
+
+    try:
+        core = AlignmentCore.from_files(jig_config_path)
+        img = cv2.imread(str(image_path))
+        frames = [img, np.roll(img, (40, 80), axis=(0, 1))] * 4
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(core.align, frames))
+
+        # Wrapper around the same core must agree with the functional result
+        aligner = ArucoAligner.from_core(core)
+        aligner.load_image(image_path)
+        aligner.detect_markers()
+        H = aligner.calculate_homography()
+
+        consistent = all(
+            np.allclose(result.homography, results[i % 2].homography)
+            for i, result in enumerate(results)
+        )
+        shifted = results[1].homography[:2, 2] - results[0].homography[:2, 2]
+
+        if consistent and np.allclose(H, results[0].homography) and np.allclose(shifted, (80, 40), atol=1.0):
+            print(f"✓ PASS: {len(results)} concurrent alignments on one core are consistent")
+            return True
+        else:
+            print("✗ FAIL: Concurrent alignments disagree")
+            return False
+
+    except Exception as e:
+        print(f"✗ FAIL: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_live_alignment(image_path, jig_config_path):
+    """
+    Test continuous alignment from a simulated camera stream
+
+    Args:
+        image_path: Path to test image
+        jig_config_path: Path to jig config
+
+    Returns:
+        bool: True if test passes
+    """
+    print(f"\n{'='*60}")
+    print("Test: Live Alignment")
+    print(f"{'='*60}\n")
+
+    import time
+    from aruco_align import AlignmentCore
+    from live_align import LiveAligner
+
+    class SimulatedCamera:
+        """Camera producing the test frame faster than it can be aligned"""
+
+        def __init__(self, frame, num_frames):
+            self.frame = frame
+            self.remaining = num_frames
+
+        def read(self):
+            time.sleep(0.002)
+            self.remaining -= 1
+            return self.remaining >= 0, self.frame
+
+    try:
+        frame = cv2.imread(str(image_path))
+        core = AlignmentCore.from_files(jig_config_path)
+        expected = core.align(frame).homography
+
+        live = LiveAligner(core, source=SimulatedCamera(frame, 200), reuse_stationary=False)
+        with live:
+            first = live.wait_for_alignment(timeout=5.0)
+            last = live.wait_for_alignment(newer_than=first.frame_index, timeout=5.0)
+            while live.grabber.running:
+                time.sleep(0.01)
+
+        stats = live.stats()
+        print(f"  Stats: {stats}")
+
+        if (last is not None and np.allclose(last.homography, expected)
+                and last.latency_ms > 0 and stats['frames_dropped'] > 0):
+            print(f"✓ PASS: Live homography published (latency {last.latency_ms:.1f}ms, "
+                  f"{stats['frames_dropped']} stale frames dropped)")
+            return True
+        else:
+            print("✗ FAIL: No valid live alignment published")
+            return False
+
+    except Exception as e:
+        print(f"✗ FAIL: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_stationary_fast_path(image_path, jig_config_path):
+    """
+    Test homography reuse while the marker regions are unchanged
+
+    Args:
+        image_path: Path to test image
+        jig_config_path: Path to jig config
+
+    Returns:
+        bool: True if test passes
+    """
+    print(f"\n{'='*60}")
+    print("Test: Jig-Stationary Fast Path")
+    print(f"{'='*60}\n")
+
+    from aruco_align import ArucoAligner
+
+    try:
+        ArucoAligner._stationary_caches.clear()
+        img = cv2.imread(str(image_path))
+        rng = np.random.default_rng(1)
+
+        # Same jig, new sensor noise and a new workpiece in the middle
+        next_job = np.clip(img.astype(np.int16) + rng.normal(0, 3, img.shape), 0, 255).astype(np.uint8)
+        cv2.rectangle(next_job, (860, 440), (1060, 640), (30, 30, 30), -1)
+        moved = np.roll(img, (12, 20), axis=(0, 1))
+
+        homographies = []
+        for i, frame in enumerate([img, next_job, moved]):
+            frame_path = Path(f'test_output/stationary_{i}.png')
+            cv2.imwrite(str(frame_path), frame)
+
+            aligner = ArucoAligner(jig_config_path, reuse_stationary=True)
+            aligner.load_image(frame_path)
+            aligner.detect_markers()
+            homographies.append(aligner.calculate_homography())
+
+        cache = aligner._stationary_cache()
+        hits, misses = cache.hits, cache.misses
+        reused = homographies[1] is homographies[0]
+        redetected = np.allclose(homographies[2][:2, 2] - homographies[0][:2, 2], (20, 12), atol=1.0)
+
+        # Another tolerance, jig file with the same name or calibration never shares the cached result
+        strict = ArucoAligner(jig_config_path, reuse_stationary=True, stationary_tolerance=0.5)
+        with open(jig_config_path) as f:
+            moved_jig = json.load(f)
+        moved_jig['markers']['2']['position_mm'] = [190.0, 200.0]
+        moved_jig_path = Path('test_output/stationary_moved_jig.json')
+        moved_jig_path.write_text(json.dumps(moved_jig))
+        copied = ArucoAligner(moved_jig_path, reuse_stationary=True)
+        calib_path = Path('test_output/stationary_camera.yml')
+        write_test_calibration(calib_path, (img.shape[1], img.shape[0]))
+        calibrated = ArucoAligner(jig_config_path, calib_path, reuse_stationary=True)
+        others = [other._stationary_cache() for other in (strict, copied, calibrated)]
+        separate = all(other is not cache and other.result is None for other in others)
+
+        # Concurrent requests for one jig (daemon threads) lookup, store and invalidate together
+        from concurrent.futures import ThreadPoolExecutor
+        result = cache.result
+
+        def hammer(i):
+            for _ in range(50):
+                if i % 3 == 0:
+                    cache.invalidate()
+                elif i % 3 == 1:
+                    cache.store(moved, result)
+                else:
+                    cache.lookup(moved)
+
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            list(pool.map(hammer, range(6)))
+
+        if hits == 1 and misses == 1 and reused and redetected and separate:
+            print("✓ PASS: Unchanged jig reused homography, moved jig re-detected")
+            return True
+        else:
+            print(f"✗ FAIL: hits={hits} misses={misses} separate={separate} audit={list(cache.audit)[:3]}")
+            return False
+
+    except Exception as e:
+        print(f"✗ FAIL: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_multi_design_alignment(image_path, jig_config_path):
+    """
+    Test vectorized multi-design alignment against the per-design path
+
+    Args:
+        image_path: Path to test image
+        jig_config_path: Path to jig config
+
+    Returns:
+        bool: True if test passes
+    """
+    print(f"\n{'='*60}")
+    print("Test: Multi-Design Alignment")
+    print(f"{'='*60}\n")
+
+    from aruco_align import ArucoAligner, split_design_alignments
+
+    try:
+        aligner = ArucoAligner(jig_config_path)
+        aligner.load_image(image_path)
+        aligner.detect_markers()
+        aligner.calculate_homography()
+
+        rects = [(10 + 30 * (i % 5), 10 + 35 * (i // 5), 25, 20) for i in range(20)]
+        batch = aligner.calculate_alignment_for_designs(rects)
+
+        max_error = 0.0
+        for single, batched in zip(map(aligner.calculate_alignment_for_design, rects),
+                                   split_design_alignments(batch)):
+            for key in ('center_px', 'corners_px', 'size_px'):
+                max_error = max(max_error, np.abs(np.array(single[key]) - np.array(batched[key])).max())
+            max_error = max(max_error, abs(single['angle_deg'] - batched['angle_deg']))
+
+        if batch['corners_px'].shape == (20, 4, 2) and max_error < 1e-3:
+            print(f"✓ PASS: 20 designs aligned in one call (max diff {max_error:.2e})")
+            return True
+        else:
+            print(f"✗ FAIL: Batch differs from per-design alignment by {max_error}")
+            return False
+
+    except Exception as e:
+        print(f"✗ FAIL: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_alignment_daemon(image_path, jig_config_path):
+    """
+    Test align and export requests against a running daemon
+
+    Args:
+        image_path: Path to test image
+        jig_config_path: Path to jig config
+
+    Returns:
+        bool: True if test passes
+    """
+    print(f"\n{'='*60}")
+    print("Test: Alignment Daemon")
+    print(f"{'='*60}\n")
+
+    import threading
+    from aruco_align import AlignmentCore
+    from align_daemon import AlignmentService, AlignmentDaemon, DaemonClient
+
+    daemon = None
+    try:
+        service = AlignmentService(jig_config=jig_config_path, camera_config='missing.yml',
+                                   output_dir='test_output/daemon')
+        daemon = AlignmentDaemon(service, port=0)
+        threading.Thread(target=daemon.serve_forever, daemon=True).start()
+
+        client = DaemonClient(port=daemon.server_address[1])
+        expected = AlignmentCore.from_files(jig_config_path).align(cv2.imread(str(image_path)))
+
+        aligned = client.align(image_path, rect=(50, 50, 100, 80))
+        exported = client.export(image_path, (50, 50, 100, 80), text="DAEMON")
+
+        # Unreadable images are reported back, not fatal to the daemon
+        try:
+            client.align('test_output/missing.jpg')
+            rejected = False
+        except RuntimeError:
+            rejected = True
+
+        # Parameters that don't fit are bad requests; a TypeError inside a handler is internal
+        from urllib import error, request
+
+        def post_status(endpoint, params):
+            req = request.Request(client.url + endpoint, data=json.dumps(params).encode('utf-8'))
+            try:
+                with request.urlopen(req, timeout=10):
+                    return 200
+            except error.HTTPError as e:
+                return e.code
+
+        service.send = lambda file, start=False: len(None)
+        codes = (post_status('/align', {'camera_image': str(image_path), 'colour': 'red'}),
+                 post_status('/align', [str(image_path)]),
+                 post_status('/send', {'file': 'design.png'}))
+
+        status = client.status()
+
+        if (np.allclose(aligned['homography'], expected.homography)
+                and Path(exported['export_path']).exists() and codes == (400, 400, 500)
+                and rejected and status['requests_served'] == 2 and len(status['jigs']) == 1):
+            print(f"✓ PASS: Warm align in {aligned['elapsed_ms']:.1f}ms, "
+                  f"export in {exported['elapsed_ms']:.1f}ms")
+            return True
+        else:
+            print(f"✗ FAIL: Daemon replies inconsistent (status {status}, codes {codes})")
+            return False
+
+    except Exception as e:
+        print(f"✗ FAIL: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    finally:
+        if daemon is not None:
+            daemon.shutdown()
+            daemon.server_close()
+
+
+def test_stage_timings(image_path, jig_config_path):
+    """
+    Test the per-stage timing record of a workflow run
+
+    Args:
+        image_path: Path to test image
+        jig_config_path: Path to jig config
+
+    Returns:
+        bool: True if test passes
+    """
+    print(f"\n{'='*60}")
+    print("Test: Stage Timings")
+    print(f"{'='*60}\n")
+
+    from align_tool import AlignmentWorkflow
+    from stage_timer import stage
+
+    try:
+        workflow = AlignmentWorkflow(jig_config=jig_config_path, camera_config='missing.yml',
+                                     output_dir='test_output/timings', timings=True)
+        workflow.run_complete_workflow((50, 50, 100, 80), text="TIMED",
+                                       use_camera=False, camera_image_path=image_path)
+
+        with open('test_output/timings/timings.json') as f:
+            record = json.load(f)
+
+        stages = {entry['name']: entry for entry in record['stages']}
+        expected = ['detect_alignment', 'load_image', 'detect_markers', 'calculate_homography',
+                    'warp_and_export', 'export_for_lightburn', 'flush_artifacts']
+        nested = stages['detect_markers']['depth'] > stages['detect_alignment']['depth']
+        top_level_ms = sum(entry['duration_ms'] for entry in record['stages'] if entry['depth'] == 0)
+
+        # Without an active timer, stages are shared no-op contexts
+        disabled = stage('a') is stage('b')
+
+        if (all(name in stages for name in expected) and nested and disabled
+                and top_level_ms <= record['total_ms']
+                and all(entry['peak_mem_delta_kb'] is not None for entry in record['stages'])):
+            print(f"✓ PASS: {len(record['stages'])} stages recorded in {record['total_ms']:.1f}ms")
+            return True
+        else:
+            print(f"✗ FAIL: Unexpected timing record: {sorted(stages)}")
+            return False
+
+    except Exception as e:
+        print(f"✗ FAIL: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_artifact_writer(image_path):
+    """
+    Test background artifact writes, backpressure and failure reporting
+
+    Args:
+        image_path: Path to test image
+
+    Returns:
+        bool: True if test passes
+    """
+    print(f"\n{'='*60}")
+    print("Test: Background Artifact Writer")
+    print(f"{'='*60}\n")
+
+    import time
+    from artifact_writer import ArtifactWriter
+
+    try:
+        img = cv2.imread(str(image_path))
+        output_dir = Path('test_output/artifacts')
+
+        with ArtifactWriter(max_workers=1, max_pending=2) as writer:
+            # Two slow writes fill the queue, the third submit has to wait
+            start = time.perf_counter()
+            for _ in range(2):
+                writer.submit('sleep', time.sleep, 0.2)
+            writer.write_image(output_dir / 'frame.jpg', img)
+            blocked_s = time.perf_counter() - start
+
+            # Queued behind the slow writes; later changes must not reach the file
+            document = {'ok': True}
+            writer.write_json(output_dir / 'data.json', document)
+            document['changed'] = True
+            writer.write_image(output_dir / 'bad.unknown', img)
+            ok = writer.flush()
+
+        with open(output_dir / 'data.json') as f:
+            data = json.load(f)
+
+        written = cv2.imread(str(output_dir / 'frame.jpg')) is not None
+        leftovers = list(output_dir.glob('.*.tmp'))
+
+        if blocked_s >= 0.15 and written and data == {'ok': True} and not ok and not leftovers:
+            print(f"✓ PASS: Writes completed in background, submit blocked {blocked_s * 1000:.0f}ms "
+                  f"when full, bad artifact reported")
+            return True
+        else:
+            print(f"✗ FAIL: blocked={blocked_s:.3f}s written={written} ok={ok} leftovers={leftovers}")
+            return False
+
+    except Exception as e:
+        print(f"✗ FAIL: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_in_memory_frames(image_path, jig_config_path):
+    """
+    Test the workflow on an in-memory frame without snapshot files
+
+    Args:
+        image_path: Path to test image
+        jig_config_path: Path to jig config
+
+    Returns:
+        bool: True if test passes
+    """
+    print(f"\n{'='*60}")
+    print("Test: In-Memory Frame Pipeline")
+    print(f"{'='*60}\n")
+
+    from align_tool import AlignmentWorkflow
+    from aruco_align import ArucoAligner
+
+    try:
+        frame = cv2.imread(str(image_path))
+        output_dir = Path('test_output/in_memory')
+
+        aligner = ArucoAligner(jig_config_path)
+        aligner.load_image(frame)
+        passed_through = aligner.raw_image is frame
+
+        workflow = AlignmentWorkflow(jig_config=jig_config_path, camera_config='missing.yml',
+                                     output_dir=output_dir, save_snapshot=False)
+        workflow.run_complete_workflow((50, 50, 100, 80), text="FRAME",
+                                       use_camera=False, camera_frame=frame)
+
+        from_file = AlignmentWorkflow(jig_config=jig_config_path, camera_config='missing.yml',
+                                      output_dir='test_output/from_file')
+        expected = from_file.run_complete_workflow((50, 50, 100, 80), text="FRAME",
+                                                   use_camera=False, camera_image_path=image_path)
+
+        same_alignment = np.allclose(workflow.alignment_data['corners_px'],
+                                     from_file.alignment_data['corners_px'])
+        artifacts = all((output_dir / name).exists() for name in
+                        ('camera_snapshot_aligned.jpg', 'preview.jpg', 'alignment_data.json'))
+        no_snapshot = not (output_dir / 'camera_snapshot.jpg').exists()
+
+        if passed_through and same_alignment and artifacts and no_snapshot and expected.exists():
+            print("✓ PASS: Frame aligned, warped and previewed without touching the disk first")
+            return True
+        else:
+            print(f"✗ FAIL: passed_through={passed_through} same={same_alignment} "
+                  f"artifacts={artifacts} no_snapshot={no_snapshot}")
+            return False
+
+    except Exception as e:
+        print(f"✗ FAIL: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_roi_warp(image_path, jig_config_path):
+    """
+    Test region-limited preview warp against a full-frame reference
+
+    Args:
+        image_path: Path to test image
+        jig_config_path: Path to jig config
+
+    Returns:
+        bool: True if test passes
+    """
+    print(f"\n{'='*60}")
+    print("Test: Region-Limited Warp")
+    print(f"{'='*60}\n")
+
+    from aruco_align import ArucoAligner
+    from design_warp import DesignWarper
+
+    try:
+        camera_img = cv2.imread(str(image_path))
+        aligner = ArucoAligner(jig_config_path)
+        aligner.load_image(camera_img)
+        aligner.detect_markers()
+        aligner.calculate_homography()
+        alignment_data = aligner.calculate_alignment_for_design((50, 50, 100, 80))
+
+        # RGBA design with a soft alpha ramp and an opaque block
+        rgba = np.zeros((400, 500, 4), dtype=np.uint8)
+        rgba[:, :, :3] = (40, 90, 200)
+        rgba[:, :, 3] = np.linspace(0, 255, 500, dtype=np.uint8)[np.newaxis, :]
+        rgba[100:300, 100:200] = (0, 0, 0, 255)
+        cv2.imwrite('test_output/rgba_design.png', rgba)
+
+        warper = DesignWarper(alignment_data)
+        warper.load_design('test_output/rgba_design.png')
+        composite = warper.warp_to_alignment(camera_img)
+
+        # Full-frame float reference
+        h, w = rgba.shape[:2]
+        src = np.array([[0, 0], [w, 0], [w, h], [0, h]], dtype=np.float32)
+        M = cv2.getPerspectiveTransform(src, np.array(alignment_data['corners_px'], dtype=np.float32))
+        full = cv2.warpPerspective(rgba, M, (camera_img.shape[1], camera_img.shape[0]),
+                                   flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_CONSTANT,
+                                   borderValue=(255, 255, 255, 0))
+        alpha = full[:, :, 3:4] / 255.0
+        reference = alpha * full[:, :, :3] + (1 - alpha) * camera_img
+
+        # Integer rounding and the ROI-offset warp differ by at most a grey level or two
+        diff = np.abs(composite - reference)
+        max_diff = diff.max()
+        x0, y0, x1, y1 = warper.warped_roi
+        outside = composite.copy()
+        outside[y0:y1, x0:x1] = camera_img[y0:y1, x0:x1]
+        roi_fraction = warper.warped_design.shape[0] * warper.warped_design.shape[1] / camera_img[:, :, 0].size
+
+        if max_diff <= 2.0 and diff.mean() < 0.05 and np.array_equal(outside, camera_img) and roi_fraction < 0.1:
+            print(f"✓ PASS: Warped {roi_fraction:.1%} of the frame, max diff {max_diff:.2f} vs full frame")
+            return True
+        else:
+            print(f"✗ FAIL: max diff {max_diff:.2f}, ROI {roi_fraction:.1%}")
+            return False
+
+    except Exception as e:
+        print(f"✗ FAIL: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_live_overlay(image_path, jig_config_path):
+    """
+    Test the cached live design overlay against a full preview warp
+
+    Args:
+        image_path: Path to test image
+        jig_config_path: Path to jig config
+
+    Returns:
+        bool: True if test passes
+    """
+    print(f"\n{'='*60}")
+    print("Test: Live Design Overlay")
+    print(f"{'='*60}\n")
+
+    from aruco_align import AlignmentCore, alignment_for_design
+    from design_warp import DesignWarper, LiveOverlay
+
+    try:
+        frame = cv2.imread(str(image_path))
+        frame_size = (frame.shape[1], frame.shape[0])
+        rect = (50, 50, 100, 80)
+        H = AlignmentCore.from_files(jig_config_path).align(frame).homography
+
+        overlay = LiveOverlay.from_design(rect, text="LIVE")
+
+        def reference(homography):
+            warper = DesignWarper(alignment_for_design(homography, rect, frame_size))
+            warper.design_image = overlay.design_image
+            return warper.warp_to_alignment(frame)
+
+        # Same homography twice, then a nudge of the jig, then a rotation
+        shift = np.array([[1, 0, 25], [0, 1, -12], [0, 0, 1]], dtype=np.float64)
+        angle = np.radians(3)
+        rotate = np.array([[np.cos(angle), -np.sin(angle), 40], [np.sin(angle), np.cos(angle), -30], [0, 0, 1]])
+
+        matches = []
+        for homography in (H, H, shift @ H, rotate @ H):
+            overlay.update(homography, frame_size)
+            matches.append(np.abs(overlay.compose(frame).astype(int) - reference(homography)).max() <= 1)
+
+        stats = overlay.stats()
+        print(f"  Cache: {stats}")
+
+        # Inside the frame, then pushed out of it, then moved by whole pixels
+        away = LiveOverlay.from_design((5, 5, 40, 30), text="LIVE")
+        scale = np.diag([10.0, 10.0, 1.0])
+        for tx in (0, -5000, -4997):
+            away.update(np.array([[1, 0, tx], [0, 1, 0], [0, 0, 1]], dtype=np.float64) @ scale, (640, 480))
+        off_frame = np.array_equal(away.compose(frame), frame)
+        print(f"  Off-frame cache: {away.stats()}")
+
+        if all(matches) and stats == {'rebuilds': 2, 'shifts': 1, 'reuses': 1} and off_frame:
+            print("✓ PASS: Overlay reused, shifted and rebuilt its cached warp correctly")
+            return True
+        else:
+            print(f"✗ FAIL: matches={matches}, off_frame={off_frame}")
+            return False
+
+    except Exception as e:
+        print(f"✗ FAIL: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_export_cache():
+    """
+    Test content-addressed export caching and LRU eviction
+
+    Returns:
+        bool: True if test passes
+    """
+    print(f"\n{'='*60}")
+    print("Test: Export Cache")
+    print(f"{'='*60}\n")
+
+    import shutil
+    import time
+    from design_warp import DesignWarper
+    from export_cache import ExportCache
+
+    try:
+        cache_dir = Path('test_output/export_cache')
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        cache = ExportCache(cache_dir)
+        output_path = Path('test_output/cached_design.png')
+
+        def export(text, dpi=300, **options):
+            warper = DesignWarper({'design_rect_mm': [0, 0, 60, 20]}, dpi=dpi)
+            warper.create_design_from_text(text, (60, 20))
+            warper.export_for_lightburn(output_path, cache=cache, **options)
+            entry = next(path for path in cache_dir.iterdir() if path.samefile(output_path))
+            return output_path.read_bytes(), entry
+
+        first, entry = export("CACHE")
+        second, _ = export("CACHE")
+        _, low_dpi_entry = export("CACHE", dpi=150)
+
+        # Writing another design to the same output must not touch the cached file
+        export("OTHER")
+        entry_intact = entry.read_bytes() == first
+        hit_stats = cache.stats()
+
+        # LRU: refresh the first entry, then overflow the limit with a new one
+        cache.max_bytes = cache.size_bytes()
+        time.sleep(0.01)
+        export("CACHE")
+        time.sleep(0.01)
+        export("4TH")
+        lru_ok = entry.exists() and not low_dpi_entry.exists() and cache.size_bytes() <= cache.max_bytes
+
+        # The row filter only changes 1-bit (and streamed) PNGs, so only those miss
+        cache.max_bytes = 512 * 1024 * 1024
+        before = cache.stats()
+        export("4TH", png_filter='paeth')
+        export("4TH", mono='threshold')
+        export("4TH", mono='threshold', png_filter='paeth')
+        after = cache.stats()
+        filter_ok = after['hits'] - before['hits'] == 1 and after['misses'] - before['misses'] == 2
+
+        if (first == second and entry_intact and hit_stats['hits'] == 1 and hit_stats['misses'] == 3
+                and lru_ok and filter_ok):
+            print(f"✓ PASS: Repeat export served from cache ({cache.stats()})")
+            return True
+        else:
+            print(f"✗ FAIL: Unexpected cache behaviour ({cache.stats()})")
+            return False
+
+    except Exception as e:
+        print(f"✗ FAIL: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_png_export():
+    """
+    Test 1-bit PNG export: pixels, bit depth and DPI metadata
+
+    Returns:
+        bool: True if test passes
+    """
+    print(f"\n{'='*60}")
+    print("Test: 1-bit PNG Export")
+    print(f"{'='*60}\n")
+
+    from PIL import Image
+    from design_warp import DesignWarper
+    from png_writer import PNG_FILTERS, encode_png_1bit, to_monochrome
+
+    try:
+        warper = DesignWarper({'design_rect_mm': [0, 0, 60, 20]}, dpi=300)
+        warper.create_design_from_text("MONO", (60, 20), raster=True)
+
+        colour_path = Path('test_output/png_colour.png')
+        mono_path = Path('test_output/png_mono.png')
+        warper.export_for_lightburn(colour_path)
+        warper.export_for_lightburn(mono_path, mono='threshold')
+
+        expected = cv2.resize(warper.design_image, (int(60 * warper.px_per_mm), int(20 * warper.px_per_mm)),
+                              interpolation=cv2.INTER_LINEAR_EXACT)
+        ink = to_monochrome(expected)
+
+        mono = Image.open(mono_path)
+        colour = Image.open(colour_path)
+        mono_ok = (mono.mode == '1' and np.array_equal(~np.array(mono), ink)
+                   and np.array_equal(cv2.imread(str(mono_path), cv2.IMREAD_GRAYSCALE) == 0, ink))
+        colour_ok = np.array_equal(cv2.imread(str(colour_path)), expected)
+        dpi_ok = all(round(image.info['dpi'][0]) == 300 for image in (mono, colour))
+
+        # Every row filter (and odd widths with padding bits) must decode losslessly
+        rng = np.random.default_rng(0)
+        odd = to_monochrome((rng.random((37, 29)) * 255).astype(np.uint8), method='dither')
+        filters_ok = all(
+            np.array_equal(cv2.imdecode(np.frombuffer(encode_png_1bit(odd, 300, png_filter=name), np.uint8),
+                                        cv2.IMREAD_GRAYSCALE) == 0, odd)
+            for name in list(PNG_FILTERS) + ['adaptive'])
+
+        if mono_ok and colour_ok and dpi_ok and filters_ok:
+            print(f"✓ PASS: 1-bit export {mono_path.stat().st_size} bytes "
+                  f"vs colour {colour_path.stat().st_size} bytes")
+            return True
+        else:
+            print(f"✗ FAIL: mono={mono_ok} colour={colour_ok} dpi={dpi_ok} filters={filters_ok}")
+            return False
+
+    except Exception as e:
+        print(f"✗ FAIL: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_streaming_export():
+    """
+    Test strip-wise export: same pixels as the in-memory path, lower peak memory
+
+    Returns:
+        bool: True if test passes
+    """
+    print(f"\n{'='*60}")
+    print("Test: Streaming Export")
+    print(f"{'='*60}\n")
+
+    import tracemalloc
+    from design_warp import DesignWarper
+
+    try:
+        warper = DesignWarper({'design_rect_mm': [0, 0, 200, 100]}, dpi=600)
+        source = DesignWarper({'design_rect_mm': [0, 0, 200, 100]}, dpi=97)
+        source.create_design_from_text("STREAM", (200, 100), raster=True, font_scale=8,
+                                      thickness=12)
+
+        full_path = Path('test_output/stream_full.png')
+        strip_path = Path('test_output/stream_strips.png')
+
+        # Colour, alpha, grey and 1-bit designs with an odd strip height
+        bgra = cv2.cvtColor(source.design_image, cv2.COLOR_BGR2BGRA)
+        bgra[:, ::3, 3] = 0
+        grey = cv2.cvtColor(source.design_image, cv2.COLOR_BGR2GRAY)
+        cases = [(source.design_image, None), (bgra, None), (grey, None),
+                 (source.design_image, 'threshold'), (bgra, 'dither')]
+
+        identical = []
+        for design, mono in cases:
+            warper.design_image = design
+            warper.export_for_lightburn(full_path, mono=mono, streaming=False)
+            warper.export_for_lightburn(strip_path, mono=mono, streaming=True, strip_rows=37)
+            identical.append(np.array_equal(cv2.imread(str(full_path), cv2.IMREAD_UNCHANGED),
+                                            cv2.imread(str(strip_path), cv2.IMREAD_UNCHANGED)))
+
+        def peak_mb(streaming):
+            tracemalloc.start()
+            warper.export_for_lightburn(strip_path, streaming=streaming)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            return peak / (1024.0 * 1024.0)
+
+        warper.design_image = source.design_image
+        full_mb, strip_mb = peak_mb(False), peak_mb(True)
+
+        if all(identical) and strip_mb < full_mb / 2:
+            print(f"✓ PASS: Streamed export identical, peak {strip_mb:.0f}MB vs {full_mb:.0f}MB")
+            return True
+        else:
+            print(f"✗ FAIL: identical={identical}, peak {strip_mb:.0f}MB vs {full_mb:.0f}MB")
+            return False
+
+    except Exception as e:
+        print(f"✗ FAIL: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_vector_design():
+    """
+    Test SVG designs: parsing, placement and vector SVG export
+
+    Returns:
+        bool: True if test passes
+    """
+    print(f"\n{'='*60}")
+    print("Test: Vector SVG Pipeline")
+    print(f"{'='*60}\n")
+
+    from design_warp import DesignWarper
+    from vector_design import VectorDesign
+
+    try:
+        svg_path = Path('test_output/vector_design.svg')
+        svg_path.write_text(
+            '<svg xmlns="http://www.w3.org/2000/svg" width="200" height="100" viewBox="0 0 200 100">\n'
+            '  <g transform="translate(20,10)">\n'
+            '    <rect x="0" y="0" width="40" height="20" />\n'
+            '  </g>\n'
+            '  <path d="M100,50 a25,25 0 1,0 50,0 a25,25 0 1,0 -50,0 z" fill="none" stroke="black" />\n'
+            '  <text x="0" y="90">not converted</text>\n'
+            '</svg>\n')
+
+        warper = DesignWarper({'design_rect_mm': [10, 10, 100, 50]}, dpi=300)
+        preview = warper.load_design(svg_path)
+
+        output_path = Path('test_output/vector_export.svg')
+        warper.export_for_lightburn(output_path, format='svg')
+        exported = output_path.read_text()
+        placed = VectorDesign.from_svg(output_path)
+
+        # Rect (20,10)-(60,30) in a 200x100 canvas -> (10,5)-(30,15) mm in a 100x50mm rect
+        rect_points = placed.paths[0].subpaths[0].points
+        rect_ok = np.allclose(rect_points.min(axis=0), [10, 5]) and np.allclose(rect_points.max(axis=0), [30, 15])
+
+        # Circle of radius 25 units -> 12.5mm, extremes at x = 50 and 75 mm
+        circle = np.vstack([poly for poly, _ in placed.flatten(0.001)[1]])
+        circle_ok = (np.isclose(circle[:, 0].min(), 50, atol=0.01)
+                     and np.isclose(circle[:, 0].max(), 75, atol=0.01))
+
+        vector_ok = ('<image' not in exported and 'width="100mm"' in exported
+                     and placed.canvas == (0.0, 0.0, 100.0, 50.0) and warper.vector_design.skipped == ('text',))
+
+        # Preview raster shows the filled rect
+        h, w = preview.shape[:2]
+        preview_ok = preview[int(h * 0.2), int(w * 0.2)].max() < 64 and preview[int(h * 0.2), int(w * 0.9)].min() > 192
+
+        if rect_ok and circle_ok and vector_ok and preview_ok:
+            print(f"✓ PASS: Vector SVG exported ({len(exported)} bytes, {placed.segment_count} segments)")
+            return True
+        else:
+            print(f"✗ FAIL: rect={rect_ok} circle={circle_ok} vector={vector_ok} preview={preview_ok}")
+            return False
+
+    except Exception as e:
+        print(f"✗ FAIL: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_vector_text():
+    """
+    Test stroke-font text: fitted vector paths, DPI-independent, raster fallback
+
+    Returns:
+        bool: True if test passes
+    """
+    print(f"\n{'='*60}")
+    print("Test: Vector Text")
+    print(f"{'='*60}\n")
+
+    from design_warp import DesignWarper
+    from stroke_font import text_design
+
+    try:
+        # Fitted inside the margin, uniformly scaled so one dimension is filled
+        design = text_design("Serial #12345", (60, 20), margin=0.05)
+        x, y, w, h = design.bounds()
+        fit_ok = (x >= 3 - 1e-6 and y >= 1 - 1e-6 and x + w <= 57 + 1e-6 and y + h <= 19 + 1e-6
+                  and (abs(w - 54) < 1e-6 or abs(h - 18) < 1e-6)
+                  and abs((x + w / 2) - 30) < 1e-6 and abs((y + h / 2) - 10) < 1e-6)
+        stroke_ok = all(path.fill == 'none' and path.stroke == 'black' for path in design.paths)
+
+        # Unknown characters fall back to '?' instead of failing
+        fallback_ok = text_design("é", (10, 10)).segment_count == text_design("?", (10, 10)).segment_count
+
+        # Default text designs are vectors; the geometry does not depend on DPI
+        svg_path = Path('test_output/vector_text.svg')
+        png_path = Path('test_output/vector_text.png')
+        fingerprints = []
+        for dpi in (300, 1000):
+            warper = DesignWarper({'design_rect_mm': [0, 0, 60, 20]}, dpi=dpi)
+            warper.create_design_from_text("Serial #12345", (60, 20))
+            fingerprints.append(warper.vector_design.fingerprint())
+        warper.export_for_lightburn(svg_path, format='svg')
+        warper.export_for_lightburn(png_path, mono='threshold')
+        exported = svg_path.read_text()
+        vector_ok = (fingerprints[0] == fingerprints[1] and '<path' in exported
+                     and '<image' not in exported and 'fill="none"' in exported)
+        ink_ok = (cv2.imread(str(png_path), cv2.IMREAD_GRAYSCALE) == 0).any()
+
+        # Raster fallback keeps the full-DPI putText canvas
+        warper.create_design_from_text("Serial #12345", (60, 20), raster=True)
+        raster_ok = (warper.vector_design is None
+                     and warper.design_image.shape[:2] == (int(20 * warper.px_per_mm), int(60 * warper.px_per_mm)))
+
+        if fit_ok and stroke_ok and fallback_ok and vector_ok and ink_ok and raster_ok:
+            print(f"✓ PASS: Vector text {design.segment_count} segments, {len(exported)} byte SVG")
+            return True
+        else:
+            print(f"✗ FAIL: fit={fit_ok} stroke={stroke_ok} fallback={fallback_ok} "
+                  f"vector={vector_ok} ink={ink_ok} raster={raster_ok}")
+            return False
+
+    except Exception as e:
+        print(f"✗ FAIL: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_vectorize_design():
+    """
+    Test raster line art traced into filled vector paths (holes kept)
+
+    Returns:
+        bool: True if test passes
+    """
+    print(f"\n{'='*60}")
+    print("Test: Raster Vectorization")
+    print(f"{'='*60}\n")
+
+    from design_warp import DesignWarper
+    from vector_design import VectorDesign
+
+    try:
+        # Square with a square hole, a ring and some anti-aliased text
+        logo = np.full((600, 900, 3), 255, dtype=np.uint8)
+        cv2.rectangle(logo, (50, 50), (400, 400), (0, 0, 0), -1)
+        cv2.rectangle(logo, (150, 150), (300, 300), (255, 255, 255), -1)
+        cv2.circle(logo, (650, 300), 180, (0, 0, 0), 25, cv2.LINE_AA)
+        cv2.putText(logo, "LOGO", (480, 560), cv2.FONT_HERSHEY_SIMPLEX, 2.5, (0, 0, 0), 8, cv2.LINE_AA)
+
+        def vectorize(tolerance_mm):
+            warper = DesignWarper({'design_rect_mm': [0, 0, 90, 60]}, dpi=300)
+            warper.design_image = logo
+            return warper, warper.vectorize_design(tolerance_mm=tolerance_mm)
+
+        warper, stats = vectorize(0.05)
+        _, coarse = vectorize(0.5)
+
+        # Traced outlines cover the same ink (holes stay empty)
+        traced = warper.vector_design.rasterize(logo.shape[1], logo.shape[0])
+        ink, traced_ink = logo.min(axis=2) < 128, traced.min(axis=2) < 128
+        iou = (ink & traced_ink).sum() / (ink | traced_ink).sum()
+        hole_ok = not traced_ink[225, 225] and traced_ink[100, 100]
+
+        svg_path = Path('test_output/vectorized.svg')
+        warper.export_for_lightburn(svg_path, format='svg')
+        exported = svg_path.read_text()
+        svg_ok = 'fill-rule="evenodd"' in exported and '<image' not in exported
+
+        # Outlines follow pixel edges: 1-px lines keep their width through the SVG round trip
+        hairlines = np.full((40, 60), 255, dtype=np.uint8)
+        hairlines[10, 5:55] = 0
+        hairlines[15:35, 30] = 0
+        round_trip = VectorDesign.from_string(VectorDesign.from_raster(hairlines, 0.25).to_svg(60, 40))
+        outlines = [sub.points[::3] for path in round_trip.paths for sub in path.subpaths]
+        areas = sorted(abs((p[:-1, 0] * p[1:, 1] - p[1:, 0] * p[:-1, 1]).sum()) / 2 for p in outlines)
+        hairline_ok = len(areas) == 2 and np.allclose(areas, [20, 50])
+
+        if (iou > 0.95 and hole_ok and svg_ok and hairline_ok
+                and coarse['points'] < stats['points'] < stats['ink_pixels'] / 100):
+            print(f"✓ PASS: {stats['contours']} contours, {stats['points']} points "
+                  f"(IoU {iou:.3f}) in {stats['elapsed_ms']:.1f}ms")
+            return True
+        else:
+            print(f"✗ FAIL: iou={iou:.3f} hole={hole_ok} svg={svg_ok} hairlines={areas} "
+                  f"stats={stats} coarse={coarse}")
+            return False
+
+    except Exception as e:
+        print(f"✗ FAIL: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_trim_export():
+    """
+    Test margin trimming: smaller export, same physical position of the ink
+
+    Returns:
+        bool: True if test passes
+    """
+    print(f"\n{'='*60}")
+    print("Test: Margin Trimming")
+    print(f"{'='*60}\n")
+
+    from design_warp import DesignWarper
+
+    try:
+        rect = [40, 30, 100, 40]
+        full_path = Path('test_output/trim_full.png')
+        trim_path = Path('test_output/trim_cropped.png')
+
+        def ink_box_mm(path, export_rect, px_per_mm):
+            """(left, bottom, right, top) of the exported ink on the bed, in mm"""
+            ink = cv2.imread(str(path), cv2.IMREAD_GRAYSCALE) < 128
+            rows, columns = np.flatnonzero(ink.any(axis=1)), np.flatnonzero(ink.any(axis=0))
+            x, y, _, _ = export_rect
+            height = ink.shape[0]
+            return np.array([x + columns[0] / px_per_mm, y + (height - rows[-1] - 1) / px_per_mm,
+                             x + (columns[-1] + 1) / px_per_mm, y + (height - rows[0]) / px_per_mm])
+
+        # Raster text, off-centre so the offset matters on both axes
+        warper = DesignWarper({'design_rect_mm': list(rect)}, dpi=300)
+        warper.create_design_from_text("TRIM", rect[2:], raster=True)
+        warper.design_image = np.roll(warper.design_image, (-60, 150), axis=(0, 1))
+
+        warper.export_for_lightburn(full_path)
+        full_box = ink_box_mm(full_path, rect, warper.px_per_mm)
+        warper.export_for_lightburn(trim_path, trim=True)
+        trim_box = ink_box_mm(trim_path, warper.alignment_data['export_rect_mm'], warper.px_per_mm)
+
+        trim = warper.alignment_data['trim']
+        full_h, full_w = cv2.imread(str(full_path)).shape[:2]
+        trim_h, trim_w = cv2.imread(str(trim_path)).shape[:2]
+        raster_ok = (np.abs(full_box - trim_box).max() < 2 / warper.px_per_mm
+                     and trim['removed_fraction'] > 0.5 and trim['removed_rows'] == full_h - trim_h
+                     and trim_w < full_w)
+
+        # Vector text keeps its geometry, only the canvas shrinks
+        vector = DesignWarper({'design_rect_mm': list(rect)}, dpi=300)
+        vector.create_design_from_text("TRIM", rect[2:])
+        svg_path = Path('test_output/trim_vector.svg')
+        vector.export_for_lightburn(svg_path, format='svg', trim=True)
+        x, y, w, h = vector.alignment_data['export_rect_mm']
+        vector_ok = (x > rect[0] and y > rect[1] and x + w < rect[0] + rect[2] and y + h < rect[1] + rect[3]
+                     and f'width="{w:.4f}'.rstrip('0').rstrip('.') in svg_path.read_text())
+
+        # Blank designs are exported untrimmed, without trim metadata
+        blank = DesignWarper({'design_rect_mm': list(rect)}, dpi=100)
+        blank.design_image = np.full((40, 100, 3), 255, dtype=np.uint8)
+        blank.export_for_lightburn(Path('test_output/trim_blank.png'), trim=True)
+        blank_ok = 'trim' not in blank.alignment_data
+
+        if raster_ok and vector_ok and blank_ok:
+            print(f"✓ PASS: Trimmed {trim['removed_fraction']:.0%} of the scan area "
+                  f"({trim['removed_rows']} scan lines), ink position unchanged")
+            return True
+        else:
+            print(f"✗ FAIL: raster={raster_ok} ({full_box} vs {trim_box}) vector={vector_ok} blank={blank_ok}")
+            return False
+
+    except Exception as e:
+        print(f"✗ FAIL: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_scan_plan():
+    """
+    Test scan-angle planning: travel estimates, recommendation and baked rotation
+
+    Returns:
+        bool: True if test passes
+    """
+    print(f"\n{'='*60}")
+    print("Test: Scan-Angle Planning")
+    print(f"{'='*60}\n")
+
+    import time
+    from align_tool import AlignmentWorkflow
+    from design_warp import DesignWarper
+    from scan_plan import scan_lines
+
+    try:
+        # 10 x 50 px block: 10 lines of 50 px along X, 50 lines of 10 px along Y
+        block = np.zeros((30, 80), dtype=bool)
+        block[10:20, 15:65] = True
+        lines_ok = scan_lines(block, 0) == (10, 500) and scan_lines(block, 90) == (50, 500)
+
+        # Vertical bars across a wide tag: scanning along Y skips the gaps
+        rect = [10, 10, 120, 20]
+        bars = np.full((236, 1417, 3), 255, dtype=np.uint8)
+        for x in range(50, 1400, 150):
+            cv2.rectangle(bars, (x, 20), (x + 12, 215), (0, 0, 0), -1)
+
+        warper = DesignWarper({'design_rect_mm': list(rect), 'angle_deg': 1.5}, dpi=300)
+        warper.design_image = bars
+
+        start = time.perf_counter()
+        plan = warper.plan_scan_angle()
+        plan_ms = (time.perf_counter() - start) * 1000
+
+        straight_path = Path('test_output/scan_straight.png')
+        baked_path = Path('test_output/scan_baked.png')
+        warper.export_for_lightburn(straight_path)
+        warper.export_for_lightburn(baked_path, scan_plan='bake')
+
+        x, y, w, h = warper.alignment_data['export_rect_mm']
+        baked = cv2.imread(str(baked_path))
+        plan_ok = (plan['recommended_angle_deg'] == 90.0 and plan['bake_rotation_deg'] == 90.0
+                   and plan['travel_saved'] > 0.5 and plan['camera_angle_deg'] == 1.5)
+        baked_ok = (warper.alignment_data['scan_plan']['export_rotation_deg'] == -90.0
+                    and (w, h) == (rect[3], rect[2])
+                    and np.allclose((x + w / 2, y + h / 2), (rect[0] + rect[2] / 2, rect[1] + rect[3] / 2))
+                    and np.array_equal(baked, cv2.rotate(cv2.imread(str(straight_path)), cv2.ROTATE_90_CLOCKWISE)))
+
+        # Horizontal text stays along X; 'recommend' never rotates
+        text = DesignWarper({'design_rect_mm': [0, 0, 100, 40]}, dpi=300)
+        text.create_design_from_text("Serial #12345", (100, 40), raster=True, font_scale=5, thickness=10)
+        text.export_for_lightburn(Path('test_output/scan_text.png'), scan_plan='recommend')
+        text_ok = (text.alignment_data['scan_plan']['export_rotation_deg'] == 0.0
+                   and 'export_rect_mm' not in text.alignment_data)
+
+        # A baked export must not start on a workpiece still in the camera-aligned position
+        workflow = AlignmentWorkflow('config/jigs/default.json', output_dir='test_output',
+                                     scan_plan='bake')
+        try:
+            workflow.run_complete_workflow(rect, text="A", use_camera=False, send_to_lb=True, auto_start=True)
+            start_refused = False
+        except ValueError:
+            start_refused = True
+
+        if lines_ok and plan_ok and baked_ok and text_ok and start_refused and plan_ms < 200:
+            print(f"✓ PASS: 90° scan saves {plan['travel_saved']:.0%} of the travel, "
+                  f"planned in {plan_ms:.1f}ms")
+            return True
+        else:
+            print(f"✗ FAIL: lines={lines_ok} plan={plan_ok} baked={baked_ok} text={text_ok} "
+                  f"start_refused={start_refused} time={plan_ms:.1f}ms")
+            return False
+
+    except Exception as e:
+        print(f"✗ FAIL: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_job_estimate():
+    """
+    Test job time estimates: motion profile, raster and vector work, export hook
+
+    Returns:
+        bool: True if test passes
+    """
+    print(f"\n{'='*60}")
+    print("Test: Job Time Estimate")
+    print(f"{'='*60}\n")
+
+    import json
+    import time
+    from design_warp import DesignWarper
+    from job_estimate import MaterialProfile, estimate_raster, estimate_vector, load_materials, move_time
+
+    try:
+        # 100mm at 200 mm/s, 2000 mm/s²: 0.5s cruise + 0.1s lost ramping; 1mm never cruises
+        motion_ok = np.allclose(move_time([100.0, 1.0], 200.0, 2000.0), [0.6, 2 * np.sqrt(1.0 / 2000.0)])
+
+        # Two 50 x 10 px blocks 30 lines apart at 0.1mm: 20 lines of 5mm, 3mm skipped
+        profile = MaterialProfile('test', raster_speed=100.0, travel_speed=100.0,
+                                  acceleration=1e9, overscan_mm=1.0)
+        ink = np.zeros((100, 100), dtype=bool)
+        ink[10:20, 10:60] = True
+        ink[50:60, 10:60] = True
+        raster = estimate_raster(ink, 0.1, profile)
+        raster_ok = (raster['lines'] == 20 and raster['runs'] == 20 and np.isclose(raster['burn_mm'], 100.0)
+                     and np.isclose(raster['scan_mm'], 140.0) and np.isclose(raster['travel_mm'], 3.0)
+                     and np.isclose(raster['seconds'], 1.43))
+
+        # Two 10mm squares: 80mm cut, 6 corner stops, 28.3mm travel between them
+        square = np.array([[0, 0], [10, 0], [10, 10], [0, 10], [0, 0]], dtype=float)
+        vector = estimate_vector([square, square + 20], MaterialProfile('test', vector_speed=10.0,
+                                                                        travel_speed=100.0, acceleration=1e9))
+        vector_ok = (np.isclose(vector['cut_mm'], 80.0) and vector['corners'] == 6
+                     and np.isclose(vector['travel_mm'], np.hypot(20, 20))
+                     and np.isclose(vector['seconds'], 8.0 + np.hypot(20, 20) / 100.0))
+
+        # Export hook: raster PNG and stroked vector SVG both land in alignment_data
+        warper = DesignWarper({'design_rect_mm': [10, 10, 100, 40]}, dpi=300)
+        warper.create_design_from_text("Serial #12345", (100, 40), raster=True, font_scale=5, thickness=10)
+        start = time.perf_counter()
+        warper.export_for_lightburn(Path('test_output/estimate_raster.png'), material='plywood')
+        export_ms = (time.perf_counter() - start) * 1000
+        png_estimate = warper.alignment_data['job_estimate']
+
+        text = DesignWarper({'design_rect_mm': [10, 10, 100, 40]}, dpi=300)
+        text.create_design_from_text("Serial #12345", (100, 40))
+        text.export_for_lightburn(Path('test_output/estimate_vector.svg'), format='svg', material='plywood')
+        svg_estimate = text.alignment_data['job_estimate']
+
+        hook_ok = (png_estimate['raster']['lines'] > 0 and png_estimate['vector'] is None
+                   and png_estimate['material']['name'] == 'plywood'
+                   and svg_estimate['raster'] is None and svg_estimate['vector']['cut_mm'] > 0
+                   and json.loads(json.dumps(warper.alignment_data)) == warper.alignment_data)
+
+        # Config files override built-in profiles; unknown names are rejected
+        config_path = Path('test_output/materials.json')
+        config_path.write_text(json.dumps({'plywood': {'raster_speed': 125.0}, 'cork': {'passes': 2}}))
+        materials = load_materials(config_path)
+        slow = warper.estimate_job('plywood', materials=materials)
+        config_ok = (materials['plywood'].vector_speed == 12.0 and materials['cork'].passes == 2
+                     and slow['seconds'] > png_estimate['seconds'])
+        try:
+            warper.estimate_job('unobtainium')
+            config_ok = False
+        except ValueError:
+            pass
+
+        if motion_ok and raster_ok and vector_ok and hook_ok and config_ok and export_ms < 500:
+            print(f"✓ PASS: raster {png_estimate['duration']}, vector {svg_estimate['duration']}, "
+                  f"export with estimate in {export_ms:.1f}ms")
+            return True
+        else:
+            print(f"✗ FAIL: motion={motion_ok} raster={raster_ok} vector={vector_ok} hook={hook_ok} "
+                  f"config={config_ok} time={export_ms:.1f}ms")
+            return False
+
+    except Exception as e:
+        print(f"✗ FAIL: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_path_order():
+    """
+    Test travel-path ordering: nearest neighbour + 2-opt, reversal rules, SVG export hook
+
+    Returns:
+        bool: True if test passes
+    """
+    print(f"\n{'='*60}")
+    print("Test: Path Ordering")
+    print(f"{'='*60}\n")
+
+    import time
+    from design_warp import DesignWarper
+    from path_order import order_paths, travel_length
+    from vector_design import Subpath, VectorDesign, VectorPath
+
+    try:
+        rng = np.random.default_rng(7)
+
+        # Dashes along a line, shuffled and half of them drawn backwards:
+        # the best order walks the line with 0.5 gaps
+        dashes = np.arange(200, dtype=float)
+        starts = np.column_stack([dashes, np.zeros(200)])
+        ends = starts + [0.5, 0.0]
+        flipped = rng.random(200) < 0.5
+        starts[flipped], ends[flipped] = ends[flipped].copy(), starts[flipped].copy()
+        shuffle = rng.permutation(200)
+        starts, ends = starts[shuffle], ends[shuffle]
+        order, reverse = order_paths(starts, ends, np.zeros(200, dtype=bool))
+        line_ok = (sorted(order.tolist()) == list(range(200))
+                   and np.isclose(travel_length(starts, ends, order, reverse, (0.0, 0.0)), 199 * 0.5))
+
+        # Fixed-direction paths are never reversed; 2-opt never loses to its seed
+        n = 3000
+        starts = rng.uniform(0, 300, (n, 2))
+        ends = starts + rng.normal(0, 2, (n, 2))
+        closed = rng.random(n) < 0.5
+        ends[closed] = starts[closed]
+        start = time.perf_counter()
+        order, reverse = order_paths(starts, ends, closed)
+        order_ms = (time.perf_counter() - start) * 1000
+        seed = order_paths(starts, ends, closed, two_opt=False)
+        fixed_order, fixed_reverse = order_paths(starts, ends, closed, reversible=False)
+        shuffled = travel_length(starts, ends, np.arange(n), np.zeros(n, dtype=bool), (0.0, 0.0))
+        optimized = travel_length(starts, ends, order, reverse, (0.0, 0.0))
+        rules_ok = (not fixed_reverse.any() and not reverse[closed].any()
+                    and sorted(fixed_order.tolist()) == list(range(n))
+                    and optimized <= travel_length(starts, ends, *seed, (0.0, 0.0)) + 1e-9
+                    and optimized < 0.05 * shuffled)
+
+        # Export hook: shuffled rings and ticks on one layer plus a filled mark
+        cut = []
+        for x, y in rng.uniform(5, 95, (400, 2)):
+            cut.append(Subpath.from_polyline([[x, y], [x + 1, y], [x + 1, y + 1], [x, y + 1]], closed=True))
+            cut.append(Subpath.from_polyline([[x + 2, y], [x + 3, y + 1]]))
+        mark = VectorPath((Subpath.from_polyline([[0, 0], [4, 0], [4, 4]], closed=True),))
+        design = VectorDesign((mark, VectorPath(tuple(cut), fill='none', stroke='red', stroke_width=0.2)),
+                              (0.0, 0.0, 100.0, 100.0))
+
+        warper = DesignWarper({'design_rect_mm': [10, 10, 100, 100]}, dpi=100)
+        warper.load_vector_design(design)
+        svg_path = Path('test_output/ordered_paths.svg')
+        warper.export_for_lightburn(svg_path, format='svg', optimize_paths=True, material='default')
+        info = warper.alignment_data['path_order']
+        exported = VectorDesign.from_svg(svg_path)
+        estimate = warper.alignment_data['job_estimate']['vector']
+
+        def cut_length(subpaths):
+            return sum(np.linalg.norm(np.diff(sub.points, axis=0), axis=1).sum() for sub in subpaths)
+
+        hook_ok = (info['subpaths'] == 800 and info['travel_after_mm'] < 0.2 * info['travel_before_mm']
+                   and exported.paths[0].fill != 'none' and len(exported.paths[0].subpaths) == 1
+                   and len(exported.paths[1].subpaths) == 800
+                   and np.isclose(cut_length(exported.paths[1].subpaths), cut_length(cut), rtol=1e-4)
+                   and np.isclose(estimate['travel_mm'], info['travel_after_mm'], rtol=0.01)
+                   and 'export_rect_mm' not in warper.alignment_data)
+
+        # Degenerate sets: one closed path, one outline per stroke layer, coincident endpoints
+        single = order_paths([[10, 10]], [[10, 10]], [True])
+        layers = VectorDesign.from_string(
+            '<svg xmlns="http://www.w3.org/2000/svg" width="100" height="100">'
+            '<rect x="10" y="10" width="30" height="30" fill="none" stroke="red"/>'
+            '<circle cx="70" cy="70" r="10" fill="none" stroke="blue"/></svg>').ordered()[1]
+        stacked = np.vstack([np.full((300, 2), 5.0), rng.uniform(0, 100, (300, 2))])
+        stacked_order, _ = order_paths(stacked, stacked + [1.0, 0.0], np.zeros(600, dtype=bool))
+        degenerate_ok = (single[0].tolist() == [0] and layers['subpaths'] == 2
+                         and sorted(stacked_order.tolist()) == list(range(600)))
+
+        if line_ok and rules_ok and hook_ok and degenerate_ok and order_ms < 5000:
+            print(f"✓ PASS: {n} paths ordered in {order_ms:.0f}ms ({shuffled / 1000:.1f}m → "
+                  f"{optimized / 1000:.2f}m travel); export travel {info['travel_saved']:.0%} shorter")
+            return True
+        else:
+            print(f"✗ FAIL: line={line_ok} rules={rules_ok} hook={hook_ok} degenerate={degenerate_ok} "
+                  f"time={order_ms:.0f}ms")
+            return False
+
+    except Exception as e:
+        print(f"✗ FAIL: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
 def run_all_tests():
     """Run complete test suite"""
     print(f"\n{'='*60}")
@@ -288,6 +1935,31 @@ def run_all_tests():
         ("Homography Calculation", lambda: test_homography_calculation(test_image_path, jig_config)),
         ("Alignment Workflow", lambda: test_alignment_workflow(test_image_path, jig_config)),
         ("Design Export", test_design_export),
+        ("Undistortion Cache", lambda: test_undistortion_cache(test_image_path)),
+        ("Points-Only Undistortion", lambda: test_points_undistortion(test_image_path, jig_config)),
+        ("Pyramid Detection", lambda: test_pyramid_detection(test_image_path, jig_config)),
+        ("ROI Tracking", lambda: test_roi_tracking(test_image_path, jig_config)),
+        ("Batch Alignment", lambda: test_batch_alignment(test_image_path, jig_config)),
+        ("Shared Alignment Core", lambda: test_shared_core(test_image_path, jig_config)),
+        ("Live Alignment", lambda: test_live_alignment(test_image_path, jig_config)),
+        ("Jig-Stationary Fast Path", lambda: test_stationary_fast_path(test_image_path, jig_config)),
+        ("Multi-Design Alignment", lambda: test_multi_design_alignment(test_image_path, jig_config)),
+        ("Alignment Daemon", lambda: test_alignment_daemon(test_image_path, jig_config)),
+        ("Stage Timings", lambda: test_stage_timings(test_image_path, jig_config)),
+        ("Background Artifact Writer", lambda: test_artifact_writer(test_image_path)),
+        ("In-Memory Frame Pipeline", lambda: test_in_memory_frames(test_image_path, jig_config)),
+        ("Region-Limited Warp", lambda: test_roi_warp(test_image_path, jig_config)),
+        ("Live Design Overlay", lambda: test_live_overlay(test_image_path, jig_config)),
+        ("Export Cache", test_export_cache),
+        ("1-bit PNG Export", test_png_export),
+        ("Streaming Export", test_streaming_export),
+        ("Vector SVG Pipeline", test_vector_design),
+        ("Vector Text", test_vector_text),
+        ("Raster Vectorization", test_vectorize_design),
+        ("Margin Trimming", test_trim_export),
+        ("Scan-Angle Planning", test_scan_plan),
+        ("Job Time Estimate", test_job_estimate),
+        ("Path Ordering", test_path_order),
     ]
 
     results = []
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Undistortion Engine
+Precomputed, persisted remap tables for fast per-frame lens undistortion
+"""
+
+import cv2
+import numpy as np
+from pathlib import Path
+import hashlib
+import os
+import zipfile
+
+
+class UndistortionEngine:
+    """
+    Builds cv2.initUndistortRectifyMap tables once per
+    (calibration, resolution, alpha) and reuses them for every frame.
+
+    Tables are cached in memory (shared by all engines in the process) and
+    on disk next to the calibration file, so each frame costs a single
+    cv2.remap instead of getOptimalNewCameraMatrix + cv2.undistort.
+    """
+
+    # (calibration hash, width, height, alpha) -> (map1, map2, new_camera_matrix)
+    _memory_cache = {}
+
+    def __init__(self, camera_matrix, dist_coeffs, alpha=1.0, cache_dir=None, cache_tag=None):
+        """
+        Initialize engine
+
+        Args:
+            camera_matrix: 3x3 camera matrix
+            dist_coeffs: Distortion coefficients
+            alpha: Free scaling parameter for getOptimalNewCameraMatrix
+                   (1 keeps all source pixels, 0 crops to valid pixels)
+            cache_dir: Directory for persisted tables (None = memory only)
+            cache_tag: Prefix for persisted table filenames
+        """
+        self.camera_matrix = np.asarray(camera_matrix, dtype=np.float64)
+        self.dist_coeffs = np.asarray(dist_coeffs, dtype=np.float64)
+        self.alpha = float(alpha)
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.cache_tag = cache_tag or 'camera'
+
+        # Hash the calibration itself so edited calibrations never reuse stale tables
+        digest = hashlib.sha1()
+        digest.update(self.camera_matrix.tobytes())
+        digest.update(self.dist_coeffs.tobytes())
+        self.calib_hash = digest.hexdigest()[:12]
+
+    @classmethod
+    def from_file(cls, calib_path, alpha=1.0):
+        """
+        Create engine from an OpenCV calibration YAML (see calibrate.py)
+
+        Tables are persisted next to the calibration file.
+
+        Returns:
+            UndistortionEngine or None if the file could not be read
+        """
+        calib_path = Path(calib_path)
+        fs = cv2.FileStorage(str(calib_path), cv2.FILE_STORAGE_READ)
+
+        if not fs.isOpened():
+            return None
+
+        camera_matrix = fs.getNode('camera_matrix').mat()
+        dist_coeffs = fs.getNode('distortion_coefficients').mat()
+        fs.release()
+
+        if camera_matrix is None or dist_coeffs is None:
+            return None
+
+        return cls(camera_matrix, dist_coeffs, alpha=alpha,
+                   cache_dir=calib_path.parent, cache_tag=calib_path.stem)
+
+    def _cache_key(self, image_size):
+        w, h = image_size
+        return (self.calib_hash, int(w), int(h), self.alpha)
+
+    def cache_path(self, image_size):
+        """Path of the persisted table file for an image size (or None)"""
+        if self.cache_dir is None:
+            return None
+
+        w, h = image_size
+        return self.cache_dir / (
+            f"{self.cache_tag}_undistort_{w}x{h}_a{self.alpha:g}_{self.calib_hash}.npz"
+        )
+
+    def _build_maps(self, image_size):
+        """Compute remap tables for an image size"""
+        new_camera_matrix, roi = cv2.getOptimalNewCameraMatrix(
+            self.camera_matrix, self.dist_coeffs, image_size, self.alpha, image_size
+        )
+
+        # Fixed-point maps (CV_16SC2) are the fastest representation for cv2.remap
+        map1, map2 = cv2.initUndistortRectifyMap(
+            self.camera_matrix, self.dist_coeffs, None, new_camera_matrix,
+            image_size, cv2.CV_16SC2
+        )
+
+        return map1, map2, new_camera_matrix
+
+    def _load_maps(self, path):
+        try:
+            with np.load(path) as data:
+                return data['map1'], data['map2'], data['new_camera_matrix']
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+            return None
+
+    def _save_maps(self, path, maps):
+        map1, map2, new_camera_matrix = maps
+        tmp_path = path.with_name(path.name + '.tmp.npz')
+
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            np.savez(tmp_path, map1=map1, map2=map2, new_camera_matrix=new_camera_matrix)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠ Could not persist undistortion tables: {e}")
+
+    def get_maps(self, image_size):
+        """
+        Get remap tables for an image size, building them if needed
+
+        Args:
+            image_size: (width, height) in pixels
+
+        Returns:
+            (map1, map2, new_camera_matrix)
+        """
+        image_size = (int(image_size[0]), int(image_size[1]))
+        key = self._cache_key(image_size)
+
+        maps = self._memory_cache.get(key)
+        if maps is not None:
+            return maps
+
+        path = self.cache_path(image_size)
+        if path is not None and path.exists():
+            maps = self._load_maps(path)
+
+        if maps is None:
+            maps = self._build_maps(image_size)
+            print(f"✓ Built undistortion tables for {image_size[0]}x{image_size[1]}")
+            if path is not None:
+                self._save_maps(path, maps)
+
+        self._memory_cache[key] = maps
+        return maps
+
+    def new_camera_matrix(self, image_size):
+        """Camera matrix of the undistorted image for an image size"""
+        return self.get_maps(image_size)[2]
+
+    def undistort(self, image):
+        """
+        Undistort a full frame with a single cv2.remap
+
+        Args:
+            image: Input image
+
+        Returns:
+            Undistorted image (same size)
+        """
+        h, w = image.shape[:2]
+        map1, map2, _ = self.get_maps((w, h))
+
+        return cv2.remap(image, map1, map2, cv2.INTER_LINEAR, borderMode=cv2.BORDER_CONSTANT)
+
+    @classmethod
+    def clear_memory_cache(cls):
+        """Drop all in-memory tables (persisted tables are kept)"""
+        cls._memory_cache.clear()
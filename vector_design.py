@@ -0,0 +1,976 @@
+#!/usr/bin/env python3
+"""
+Vector Design Module
+Parses SVG artwork (or traces raster line art) into paths, places it with
+NumPy affine transforms and writes it back out as vector SVG (raster only
+for previews)
+
+Every shape is normalized to chains of cubic Bézier segments; affine maps
+keep Béziers exact, so placement is one matrix product per design.
+"""
+
+import re
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+
+SVG_NS = 'http://www.w3.org/2000/svg'
+
+# Cubic control point distance for a quarter circle
+KAPPA = 0.5522847498
+
+# Length units in user units (px at 96 DPI)
+UNITS = {'': 1.0, 'px': 1.0, 'pt': 96.0 / 72.0, 'pc': 16.0, 'mm': 96.0 / 25.4,
+         'cm': 96.0 / 2.54, 'in': 96.0}
+
+NAMED_COLOURS = {
+    'black': (0, 0, 0), 'white': (255, 255, 255), 'red': (255, 0, 0),
+    'green': (0, 128, 0), 'lime': (0, 255, 0), 'blue': (0, 0, 255),
+    'yellow': (255, 255, 0), 'cyan': (0, 255, 255), 'magenta': (255, 0, 255),
+    'gray': (128, 128, 128), 'grey': (128, 128, 128), 'orange': (255, 165, 0),
+}
+
+_NUMBER = re.compile(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+_TRANSFORM = re.compile(r'(matrix|translate|scale|rotate|skewX|skewY)\s*\(([^)]*)\)')
+_SKIPPED = {'defs', 'clipPath', 'mask', 'pattern', 'marker', 'symbol', 'metadata',
+            'title', 'desc', 'style', 'linearGradient', 'radialGradient'}
+
+
+@dataclass(frozen=True)
+class Subpath:
+    """
+    One continuous run of cubic segments
+
+    points holds the start point then (control 1, control 2, end) per segment;
+    lines flags segments that are straight (written back as L commands).
+    """
+
+    points: np.ndarray           # (1 + 3k, 2)
+    lines: np.ndarray            # (k,) bool
+    closed: bool = False
+
+    @classmethod
+    def from_polyline(cls, points, closed=False):
+        """
+        Straight-segment subpath through (n, 2) vertices
+
+        Args:
+            points: Polyline vertices
+            closed: Close back to the first vertex
+        """
+        points = np.asarray(points, dtype=np.float64)
+        if closed and not np.allclose(points[0], points[-1]):
+            points = np.vstack([points, points[:1]])
+
+        # Control points at thirds along every segment at once
+        start, delta = points[:-1], np.diff(points, axis=0)
+        controls = np.stack([start + delta / 3.0, start + 2.0 * delta / 3.0, points[1:]], axis=1)
+
+        return cls(points=np.vstack([points[:1], controls.reshape(-1, 2)]),
+                   lines=np.ones(len(delta), dtype=bool), closed=closed)
+
+    @property
+    def segments(self):
+        """(k, 4, 2) control points of each cubic segment"""
+        k = len(self.lines)
+        if k == 0:
+            return np.empty((0, 4, 2))
+        index = np.arange(k)[:, np.newaxis] * 3 + np.arange(4)
+        return self.points[index]
+
+    def reversed(self):
+        """The same curve traced from its end to its start"""
+        return replace(self, points=self.points[::-1].copy(), lines=self.lines[::-1].copy())
+
+
+@dataclass(frozen=True)
+class VectorPath:
+    """Subpaths drawn with one style"""
+
+    subpaths: tuple
+    fill: str = 'black'          # SVG colour or 'none'
+    stroke: str = 'none'
+    stroke_width: float = 1.0
+    fill_rule: str = 'nonzero'
+
+
+@dataclass(frozen=True)
+class VectorDesign:
+    """
+    Vector artwork in its own coordinate system
+
+    canvas is the (x, y, width, height) area that maps onto the design
+    rectangle, like the full image of a raster design.
+    """
+
+    paths: tuple
+    canvas: tuple
+    skipped: tuple = field(default=())   # unsupported element tags
+
+    @classmethod
+    def from_svg(cls, svg_path):
+        """
+        Parse an SVG file
+
+        Supports path, rect, circle, ellipse, line, polyline and polygon,
+        nested groups with transforms, and fill/stroke presentation
+        attributes or inline styles. Text must be converted to paths.
+
+        Args:
+            svg_path: Path to SVG file
+
+        Returns:
+            VectorDesign
+        """
+        return cls.from_string(Path(svg_path).read_text())
+
+    @classmethod
+    def from_string(cls, svg_text):
+        """Parse an SVG document (see from_svg)"""
+        root = ET.fromstring(svg_text)
+        if _tag(root) != 'svg':
+            raise ValueError("Not an SVG document")
+
+        paths, skipped = [], []
+        style = {'fill': 'black', 'stroke': 'none', 'stroke-width': '1', 'fill-rule': 'nonzero'}
+        _collect(root, np.eye(3), style, paths, skipped)
+
+        canvas = _canvas(root)
+        design = cls(tuple(paths), canvas, tuple(sorted(set(skipped))))
+
+        if canvas is None:
+            design = replace(design, canvas=design.bounds())
+
+        return design
+
+    @classmethod
+    def from_raster(cls, image, tolerance_px=1.0, threshold=128):
+        """
+        Trace line art into filled vector paths
+
+        Dark pixels are traced with cv2.findContours (outer boundaries and
+        their holes from the two-level hierarchy) and simplified with
+        Douglas-Peucker (cv2.approxPolyDP). Outlines follow the pixel edges,
+        so 1-pixel lines keep their width, and are filled with the even-odd
+        rule.
+
+        Args:
+            image: Grey, BGR or BGRA design (transparent pixels are not ink)
+            tolerance_px: Max distance of the simplified outline, in pixels
+            threshold: Grey level below which a pixel is ink
+
+        Returns:
+            VectorDesign with canvas (0, 0, width, height) in pixels
+        """
+        from png_writer import to_monochrome
+
+        ink = to_monochrome(image, method='threshold', threshold=threshold).astype(np.uint8)
+
+        # Trace on a half-pixel lattice: even indices are pixel corners, odd ones
+        # pixel centres. A lattice point is ink if it touches an ink pixel, so the
+        # boundary points findContours returns lie on the pixel edges.
+        height, width = ink.shape
+        lattice = np.zeros((2 * height + 1, 2 * width + 1), dtype=np.uint8)
+        lattice[:-1, :-1] = ink.repeat(2, axis=0).repeat(2, axis=1)
+        lattice[1:] = lattice[1:] | lattice[:-1]
+        lattice[:, 1:] = lattice[:, 1:] | lattice[:, :-1]
+
+        contours, hierarchy = cv2.findContours(lattice, cv2.RETR_CCOMP, cv2.CHAIN_APPROX_SIMPLE)
+
+        # Each outer boundary followed by its holes
+        order = []
+        if hierarchy is not None:
+            links = hierarchy[0]
+            for outer in np.flatnonzero(links[:, 3] < 0):
+                order.append(outer)
+                hole = links[outer, 2]
+                while hole >= 0:
+                    order.append(hole)
+                    hole = links[hole, 0]
+
+        subpaths = []
+        for index in order:
+            outline = cv2.approxPolyDP(contours[index], 2.0 * tolerance_px, True).reshape(-1, 2)
+            if len(outline) >= 3:
+                subpaths.append(Subpath.from_polyline(outline / 2.0, closed=True))
+
+        paths = (VectorPath(subpaths=tuple(subpaths), fill_rule='evenodd'),) if subpaths else ()
+        return cls(paths, (0.0, 0.0, float(ink.shape[1]), float(ink.shape[0])))
+
+    @property
+    def subpath_count(self):
+        return sum(len(path.subpaths) for path in self.paths)
+
+    @property
+    def segment_count(self):
+        return sum(len(sub.lines) for path in self.paths for sub in path.subpaths)
+
+    def bounds(self):
+        """(x, y, width, height) of the control points"""
+        points = [sub.points for path in self.paths for sub in path.subpaths]
+        if not points:
+            return (0.0, 0.0, 0.0, 0.0)
+
+        points = np.concatenate(points)
+        (x0, y0), (x1, y1) = points.min(axis=0), points.max(axis=0)
+        return (float(x0), float(y0), float(x1 - x0), float(y1 - y0))
+
+    def transformed(self, matrix):
+        """
+        Apply a 3x3 affine matrix to every point
+
+        Stroke widths scale with the square root of the area scale.
+
+        Returns:
+            VectorDesign
+        """
+        matrix = np.asarray(matrix, dtype=np.float64)
+
+        # One matrix product for the whole design
+        moved = iter(_transform_subpaths([sub for path in self.paths for sub in path.subpaths], matrix))
+        width_scale = float(np.sqrt(abs(np.linalg.det(matrix[:2, :2]))))
+
+        paths = tuple(
+            replace(path,
+                    subpaths=tuple(next(moved) for _ in path.subpaths),
+                    stroke_width=path.stroke_width * width_scale)
+            for path in self.paths)
+
+        x, y, w, h = self.canvas
+        corners = np.array([[x, y], [x + w, y], [x + w, y + h], [x, y + h]])
+        corners = corners @ matrix[:2, :2].T + matrix[:2, 2]
+        (x0, y0), (x1, y1) = corners.min(axis=0), corners.max(axis=0)
+
+        return replace(self, paths=paths, canvas=(float(x0), float(y0), float(x1 - x0), float(y1 - y0)))
+
+    def fit_to_rect(self, width_mm, height_mm):
+        """
+        Scale and translate the canvas onto (0, 0, width_mm, height_mm)
+
+        Like raster designs, the canvas is stretched to the rectangle.
+
+        Returns:
+            VectorDesign in mm
+        """
+        x, y, w, h = self.canvas
+        if w <= 0 or h <= 0:
+            raise ValueError("Vector design has an empty canvas")
+
+        sx, sy = width_mm / w, height_mm / h
+        matrix = np.array([[sx, 0.0, -x * sx], [0.0, sy, -y * sy], [0.0, 0.0, 1.0]])
+        return self.transformed(matrix)
+
+    def ordered(self, start=(0.0, 0.0), reverse=True):
+        """
+        Reorder stroked subpaths to shorten the travel moves between them
+
+        Unfilled paths are cut along their outlines, so their subpaths are
+        pooled per stroke style (one laser layer each) and ordered with
+        path_order.order_paths (nearest neighbour, then 2-opt), continuing
+        from where the previous style ended. Each pool replaces its first
+        path; filled paths are engraved by scanning and stay as they are.
+
+        Args:
+            start: Head position before the first cut, in design units
+            reverse: Allow open subpaths to be cut from end to start
+
+        Returns:
+            (VectorDesign, report) where report has subpaths, reversed and
+            travel before / after, in design units
+        """
+        from path_order import order_paths, travel_length
+
+        styles = {}
+        for path in self.paths:
+            if path.fill == 'none' and path.stroke != 'none' and path.subpaths:
+                styles.setdefault((path.stroke, path.stroke_width), []).extend(path.subpaths)
+
+        # Travel in document order, for the report
+        cut = [sub for path in self.paths if (path.stroke, path.stroke_width) in styles
+               and path.fill == 'none' for sub in path.subpaths]
+        travel_before = 0.0
+        if cut:
+            travel_before = travel_length(np.array([sub.points[0] for sub in cut]),
+                                          np.array([sub.points[-1] for sub in cut]),
+                                          np.arange(len(cut)), np.zeros(len(cut), dtype=bool), start=start)
+
+        head = np.asarray(start, dtype=np.float64)
+        travel_after = 0.0
+        reversed_count = 0
+        pooled = {}
+
+        for key, subpaths in styles.items():
+            starts = np.array([sub.points[0] for sub in subpaths])
+            ends = np.array([sub.points[-1] for sub in subpaths])
+            closed = np.array([sub.closed for sub in subpaths]) | np.all(np.isclose(starts, ends), axis=1)
+
+            order, flip = order_paths(starts, ends, closed, reverse, start=head)
+            travel_after += travel_length(starts, ends, order, flip, start=head)
+            reversed_count += int(flip.sum())
+
+            pooled[key] = tuple(subpaths[i].reversed() if flip[i] else subpaths[i] for i in order.tolist())
+            head = starts[order[-1]] if flip[order[-1]] else ends[order[-1]]
+
+        paths = []
+        for path in self.paths:
+            key = (path.stroke, path.stroke_width)
+            if path.fill != 'none' or path.stroke == 'none':
+                paths.append(path)
+            elif key in pooled:
+                paths.append(replace(path, subpaths=pooled.pop(key)))
+
+        report = {
+            'subpaths': len(cut),
+            'reversed': reversed_count,
+            'travel_before': travel_before,
+            'travel_after': travel_after,
+        }
+        return replace(self, paths=tuple(paths)), report
+
+    def flatten(self, tolerance=0.05):
+        """
+        Approximate all curves with polylines
+
+        Args:
+            tolerance: Max distance from the curve, in design units
+
+        Returns:
+            list per path of [(polyline (n, 2), closed), ...]
+        """
+        polylines = iter(_flatten_subpaths([sub for path in self.paths for sub in path.subpaths], tolerance))
+        return [[(next(polylines), sub.closed) for sub in path.subpaths] for path in self.paths]
+
+    def rasterize(self, width_px, height_px, background=(255, 255, 255)):
+        """
+        Render the canvas to a BGR image (previews and PNG export)
+
+        Fills use the even-odd rule.
+
+        Returns:
+            (height_px, width_px, 3) uint8 image
+        """
+        return next(self.rasterize_strips(width_px, height_px, height_px, background))[1]
+
+    def rasterize_strips(self, width_px, height_px, strip_rows=64, background=(255, 255, 255)):
+        """
+        Render the canvas strip by strip (see rasterize)
+
+        Curves are flattened once and each strip redraws the shapes shifted
+        by whole rows. OpenCV clips polygons at the image border, so
+        anti-aliased edge pixels can differ slightly from a single full render.
+
+        Yields:
+            (first row, (rows, width_px, 3) uint8 strip)
+        """
+        x, y, w, h = self.canvas
+        sx, sy = width_px / w, height_px / h
+
+        # Polylines in 1/16 px fixed point for sub-pixel accuracy
+        shift = 4
+        to_fixed = np.array([sx, sy]) * (1 << shift)
+        origin = np.array([x, y])
+        tolerance = 0.25 / max(sx, sy)
+
+        shapes = []
+        for path, polylines in zip(self.paths, self.flatten(tolerance)):
+            kept = [(np.round((poly - origin) * to_fixed).astype(np.int32), closed)
+                    for poly, closed in polylines if len(poly) > 1]
+            if not kept:
+                continue
+            thickness = max(1, int(round(path.stroke_width * np.sqrt(sx * sy))))
+            shapes.append((parse_colour(path.fill), parse_colour(path.stroke), thickness, kept))
+
+        for start in range(0, height_px, strip_rows):
+            strip = np.empty((min(strip_rows, height_px - start), width_px, 3), dtype=np.uint8)
+            strip[:] = background
+            offset = np.array([0, start << shift], dtype=np.int32)
+
+            for fill, stroke, thickness, kept in shapes:
+                contours = [contour - offset for contour, _ in kept] if start else [c for c, _ in kept]
+
+                if fill is not None:
+                    cv2.fillPoly(strip, contours, fill, lineType=cv2.LINE_AA, shift=shift)
+
+                if stroke is not None:
+                    for contour, (_, closed) in zip(contours, kept):
+                        cv2.polylines(strip, [contour], closed, stroke, thickness,
+                                      lineType=cv2.LINE_AA, shift=shift)
+
+            yield start, strip
+
+    def to_svg(self, width_mm=None, height_mm=None, precision=4):
+        """
+        Vector SVG document
+
+        Args:
+            width_mm, height_mm: Physical size of the canvas (default: canvas
+                                 size, i.e. the design is already in mm)
+            precision: Decimal places of coordinates
+
+        Returns:
+            str
+        """
+        x, y, w, h = self.canvas
+        width_mm = w if width_mm is None else width_mm
+        height_mm = h if height_mm is None else height_mm
+
+        elements = []
+        for path in self.paths:
+            data = ' '.join(_path_data(sub, precision) for sub in path.subpaths)
+            if not data:
+                continue
+            elements.append(
+                f'  <path d="{data}" fill="{path.fill}" fill-rule="{path.fill_rule}" '
+                f'stroke="{path.stroke}" stroke-width="{_fmt(path.stroke_width, precision)}" />')
+
+        return (
+            '<?xml version="1.0" encoding="UTF-8" standalone="no"?>\n'
+            f'<svg width="{_fmt(width_mm, precision)}mm" height="{_fmt(height_mm, precision)}mm" '
+            f'viewBox="{_fmt(x, precision)} {_fmt(y, precision)} {_fmt(w, precision)} {_fmt(h, precision)}" '
+            f'version="1.1" xmlns="{SVG_NS}">\n'
+            + '\n'.join(elements) + '\n</svg>\n')
+
+    def fingerprint(self):
+        """Bytes identifying the artwork (export cache key input)"""
+        return self.to_svg(precision=6).encode()
+
+
+def parse_colour(value):
+    """
+    SVG colour to a BGR tuple
+
+    Returns:
+        (b, g, r), or None for 'none'/'transparent'
+    """
+    value = (value or 'none').strip().lower()
+    if value in ('none', 'transparent'):
+        return None
+
+    rgb = NAMED_COLOURS.get(value)
+    if rgb is None and value.startswith('#'):
+        digits = value[1:]
+        if len(digits) == 3:
+            digits = ''.join(c * 2 for c in digits)
+        try:
+            rgb = tuple(int(digits[i:i + 2], 16) for i in (0, 2, 4))
+        except ValueError:
+            rgb = None
+    elif rgb is None and value.startswith('rgb('):
+        channels = [float(v) for v in _NUMBER.findall(value)[:3]]
+        if len(channels) == 3:
+            scale = 2.55 if '%' in value else 1.0
+            rgb = tuple(int(round(min(255.0, c * scale))) for c in channels)
+
+    # Gradients, currentColor etc. engrave as black
+    rgb = rgb or (0, 0, 0)
+    return (rgb[2], rgb[1], rgb[0])
+
+
+def parse_transform(text):
+    """SVG transform attribute to a 3x3 matrix"""
+    matrix = np.eye(3)
+
+    for name, args in _TRANSFORM.findall(text or ''):
+        v = [float(a) for a in _NUMBER.findall(args)]
+        m = np.eye(3)
+
+        if name == 'matrix' and len(v) == 6:
+            m[:2] = [[v[0], v[2], v[4]], [v[1], v[3], v[5]]]
+        elif name == 'translate' and v:
+            m[0, 2], m[1, 2] = v[0], (v[1] if len(v) > 1 else 0.0)
+        elif name == 'scale' and v:
+            m[0, 0], m[1, 1] = v[0], (v[1] if len(v) > 1 else v[0])
+        elif name == 'rotate' and v:
+            a = np.radians(v[0])
+            m[:2, :2] = [[np.cos(a), -np.sin(a)], [np.sin(a), np.cos(a)]]
+            if len(v) == 3:
+                cx, cy = v[1], v[2]
+                m = _translate(cx, cy) @ m @ _translate(-cx, -cy)
+        elif name == 'skewX' and v:
+            m[0, 1] = np.tan(np.radians(v[0]))
+        elif name == 'skewY' and v:
+            m[1, 0] = np.tan(np.radians(v[0]))
+
+        matrix = matrix @ m
+
+    return matrix
+
+
+def parse_path_data(d):
+    """
+    SVG path data to subpaths (all commands, absolute and relative)
+
+    Returns:
+        list of Subpath
+    """
+    scanner = _PathScanner(d)
+    builder = _SubpathBuilder()
+    command = None
+    current = np.zeros(2)
+    start = np.zeros(2)
+    last_control = None     # reflected by S/T
+    last_command = None
+
+    while True:
+        token = scanner.command()
+        if token is not None:
+            command = token
+        elif command is None or not scanner.has_number():
+            if scanner.at_end():
+                break
+            raise ValueError(f"Invalid path data near position {scanner.pos}")
+
+        relative = command.islower()
+        op = command.upper()
+        base = current if relative else np.zeros(2)
+
+        if op == 'Z':
+            builder.close(start)
+            current = start.copy()
+            last_control, last_command = None, 'Z'
+            command = None
+            continue
+
+        if op == 'M':
+            current = base + scanner.point()
+            start = current.copy()
+            builder.move(current)
+            # Further coordinate pairs are implicit line-tos
+            command = 'l' if relative else 'L'
+            last_control, last_command = None, 'M'
+            continue
+
+        if op == 'L':
+            end = base + scanner.point()
+            builder.line(current, end)
+            current, last_control = end, None
+
+        elif op == 'H':
+            end = np.array([scanner.number() + (current[0] if relative else 0.0), current[1]])
+            builder.line(current, end)
+            current, last_control = end, None
+
+        elif op == 'V':
+            end = np.array([current[0], scanner.number() + (current[1] if relative else 0.0)])
+            builder.line(current, end)
+            current, last_control = end, None
+
+        elif op in ('C', 'S'):
+            if op == 'C':
+                c1 = base + scanner.point()
+            else:
+                c1 = 2 * current - last_control if last_command in ('C', 'S') else current.copy()
+            c2 = base + scanner.point()
+            end = base + scanner.point()
+            builder.cubic(c1, c2, end)
+            current, last_control = end, c2
+
+        elif op in ('Q', 'T'):
+            if op == 'Q':
+                q = base + scanner.point()
+            else:
+                q = 2 * current - last_control if last_command in ('Q', 'T') else current.copy()
+            end = base + scanner.point()
+            # Degree elevation: quadratic -> cubic
+            builder.cubic(current + 2.0 / 3.0 * (q - current), end + 2.0 / 3.0 * (q - end), end)
+            current, last_control = end, q
+
+        elif op == 'A':
+            rx, ry = abs(scanner.number()), abs(scanner.number())
+            rotation = scanner.number()
+            large_arc, sweep = scanner.flag(), scanner.flag()
+            end = base + scanner.point()
+            for c1, c2, c3 in _arc_to_cubics(current, rx, ry, rotation, large_arc, sweep, end):
+                builder.cubic(c1, c2, c3)
+            current, last_control = end, None
+
+        else:
+            raise ValueError(f"Unknown path command: {command}")
+
+        last_command = op
+
+    return builder.finish()
+
+
+def _tag(element):
+    return element.tag.rsplit('}', 1)[-1]
+
+
+def _translate(x, y):
+    m = np.eye(3)
+    m[0, 2], m[1, 2] = x, y
+    return m
+
+
+def _length(value, default=0.0):
+    """SVG length in user units (percentages are not resolved)"""
+    if value is None:
+        return default
+    match = re.fullmatch(r'\s*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)\s*([a-z%]*)\s*', value)
+    if not match or match.group(2) == '%':
+        return default
+    return float(match.group(1)) * UNITS.get(match.group(2), 1.0)
+
+
+def _canvas(root):
+    """Design area from viewBox, else width/height (None: use the bounds)"""
+    view_box = [float(v) for v in _NUMBER.findall(root.get('viewBox', ''))]
+    if len(view_box) == 4 and view_box[2] > 0 and view_box[3] > 0:
+        return tuple(view_box)
+
+    width, height = _length(root.get('width')), _length(root.get('height'))
+    if width > 0 and height > 0:
+        return (0.0, 0.0, width, height)
+
+    return None
+
+
+def _style(element, inherited):
+    """Inherited fill/stroke properties updated from attributes and style"""
+    style = dict(inherited)
+    for name in ('fill', 'stroke', 'stroke-width', 'fill-rule', 'display', 'visibility'):
+        if element.get(name) is not None:
+            style[name] = element.get(name)
+
+    for declaration in element.get('style', '').split(';'):
+        if ':' in declaration:
+            name, value = declaration.split(':', 1)
+            style[name.strip()] = value.strip()
+
+    return style
+
+
+def _collect(element, matrix, inherited, paths, skipped):
+    """Walk the element tree collecting transformed VectorPaths"""
+    style = _style(element, inherited)
+    if style.get('display') == 'none' or style.get('visibility') == 'hidden':
+        return
+
+    matrix = matrix @ parse_transform(element.get('transform'))
+    tag = _tag(element)
+
+    if tag in ('svg', 'g', 'a'):
+        for child in element:
+            _collect(child, matrix, style, paths, skipped)
+        return
+
+    if tag in _SKIPPED:
+        return
+
+    subpaths = _shape_subpaths(tag, element)
+    if subpaths is None:
+        skipped.append(tag)
+        return
+    if not subpaths:
+        return
+
+    path = VectorPath(subpaths=tuple(subpaths),
+                      fill=style.get('fill', 'black'),
+                      stroke=style.get('stroke', 'none'),
+                      stroke_width=_length(style.get('stroke-width'), 1.0),
+                      fill_rule=style.get('fill-rule', 'nonzero'))
+
+    # Lines and polylines are never filled
+    if tag in ('line', 'polyline'):
+        path = replace(path, fill='none')
+
+    if not np.allclose(matrix, np.eye(3)):
+        path = replace(path, subpaths=tuple(_transform_subpaths(path.subpaths, matrix)),
+                       stroke_width=path.stroke_width * float(np.sqrt(abs(np.linalg.det(matrix[:2, :2])))))
+
+    paths.append(path)
+
+
+def _transform_subpaths(subpaths, matrix):
+    """Subpaths with all points mapped by a 3x3 affine matrix (one product)"""
+    if not subpaths:
+        return []
+
+    points = np.concatenate([sub.points for sub in subpaths])
+    points = points @ matrix[:2, :2].T + matrix[:2, 2]
+    splits = np.cumsum([len(sub.points) for sub in subpaths])[:-1]
+
+    return [replace(sub, points=moved) for sub, moved in zip(subpaths, np.split(points, splits))]
+
+
+def _shape_subpaths(tag, element):
+    """Subpaths of a basic shape, or None if the element is not supported"""
+    get = lambda name: _length(element.get(name))
+
+    if tag == 'path':
+        return parse_path_data(element.get('d', ''))
+
+    if tag == 'rect':
+        x, y, w, h = get('x'), get('y'), get('width'), get('height')
+        if w <= 0 or h <= 0:
+            return []
+        # A missing corner radius defaults to the other one
+        rx, ry = element.get('rx'), element.get('ry')
+        rx, ry = _length(rx if rx is not None else ry), _length(ry if ry is not None else rx)
+        rx, ry = min(rx, w / 2), min(ry, h / 2)
+
+        if rx <= 0 or ry <= 0:
+            d = f"M{x},{y} H{x + w} V{y + h} H{x} Z"
+        else:
+            d = (f"M{x + rx},{y} H{x + w - rx} A{rx},{ry} 0 0 1 {x + w},{y + ry} "
+                 f"V{y + h - ry} A{rx},{ry} 0 0 1 {x + w - rx},{y + h} "
+                 f"H{x + rx} A{rx},{ry} 0 0 1 {x},{y + h - ry} "
+                 f"V{y + ry} A{rx},{ry} 0 0 1 {x + rx},{y} Z")
+        return parse_path_data(d)
+
+    if tag in ('circle', 'ellipse'):
+        cx, cy = get('cx'), get('cy')
+        rx = get('r') if tag == 'circle' else get('rx')
+        ry = get('r') if tag == 'circle' else get('ry')
+        if rx <= 0 or ry <= 0:
+            return []
+        return [_ellipse(cx, cy, rx, ry)]
+
+    if tag == 'line':
+        return parse_path_data(f"M{get('x1')},{get('y1')} L{get('x2')},{get('y2')}")
+
+    if tag in ('polyline', 'polygon'):
+        values = [float(v) for v in _NUMBER.findall(element.get('points', ''))]
+        if len(values) < 4:
+            return []
+        points = np.array(values[:len(values) // 2 * 2]).reshape(-1, 2)
+        d = 'M' + ' L'.join(f"{px},{py}" for px, py in points)
+        return parse_path_data(d + (' Z' if tag == 'polygon' else ''))
+
+    return None
+
+
+def _ellipse(cx, cy, rx, ry):
+    """Closed 4-segment cubic ellipse"""
+    k = KAPPA
+    unit = np.array([
+        [1, 0],
+        [1, k], [k, 1], [0, 1],
+        [-k, 1], [-1, k], [-1, 0],
+        [-1, -k], [-k, -1], [0, -1],
+        [k, -1], [1, -k], [1, 0],
+    ], dtype=np.float64)
+    points = unit * [rx, ry] + [cx, cy]
+    return Subpath(points=points, lines=np.zeros(4, dtype=bool), closed=True)
+
+
+def _arc_to_cubics(p0, rx, ry, rotation, large_arc, sweep, p1):
+    """SVG elliptical arc (endpoint form) to cubic segments of at most 90°"""
+    if np.allclose(p0, p1):
+        return []
+    if rx == 0 or ry == 0:
+        return [(p0 + (p1 - p0) / 3.0, p0 + 2.0 * (p1 - p0) / 3.0, p1)]
+
+    # Endpoint to centre parameterization (SVG 1.1 implementation notes F.6.5)
+    phi = np.radians(rotation)
+    cos_phi, sin_phi = np.cos(phi), np.sin(phi)
+    rot = np.array([[cos_phi, -sin_phi], [sin_phi, cos_phi]])
+
+    x1p, y1p = rot.T @ ((p0 - p1) / 2.0)
+    scale = (x1p / rx) ** 2 + (y1p / ry) ** 2
+    if scale > 1:
+        rx, ry = rx * np.sqrt(scale), ry * np.sqrt(scale)
+
+    numerator = rx ** 2 * ry ** 2 - rx ** 2 * y1p ** 2 - ry ** 2 * x1p ** 2
+    denominator = rx ** 2 * y1p ** 2 + ry ** 2 * x1p ** 2
+    factor = np.sqrt(max(0.0, numerator / denominator))
+    if large_arc == sweep:
+        factor = -factor
+    cxp, cyp = factor * rx * y1p / ry, -factor * ry * x1p / rx
+    centre = rot @ [cxp, cyp] + (p0 + p1) / 2.0
+
+    def angle(u, v):
+        return np.arctan2(u[0] * v[1] - u[1] * v[0], u[0] * v[0] + u[1] * v[1])
+
+    start_vec = np.array([(x1p - cxp) / rx, (y1p - cyp) / ry])
+    end_vec = np.array([(-x1p - cxp) / rx, (-y1p - cyp) / ry])
+    theta = angle([1.0, 0.0], start_vec)
+    delta = angle(start_vec, end_vec)
+    if not sweep and delta > 0:
+        delta -= 2 * np.pi
+    elif sweep and delta < 0:
+        delta += 2 * np.pi
+
+    count = max(1, int(np.ceil(abs(delta) / (np.pi / 2) - 1e-9)))
+    step = delta / count
+    alpha = 4.0 / 3.0 * np.tan(step / 4.0)
+
+    def point(t):
+        return centre + rot @ [rx * np.cos(t), ry * np.sin(t)]
+
+    def tangent(t):
+        return rot @ [-rx * np.sin(t), ry * np.cos(t)]
+
+    cubics = []
+    for i in range(count):
+        t0, t1 = theta + i * step, theta + (i + 1) * step
+        end = p1 if i == count - 1 else point(t1)
+        cubics.append((point(t0) + alpha * tangent(t0), point(t1) - alpha * tangent(t1), end))
+
+    return cubics
+
+
+def _flatten_subpaths(subpaths, tolerance):
+    """Polylines through subpaths, all segments in one pass (Wang's formula for the step count)"""
+    if not subpaths:
+        return []
+
+    points = np.concatenate([sub.points for sub in subpaths])
+    lines = np.concatenate([sub.lines for sub in subpaths])
+    counts = np.array([len(sub.lines) for sub in subpaths])
+    first_point = np.cumsum([0] + [len(sub.points) for sub in subpaths[:-1]])
+
+    # Control point indices of every segment of every subpath
+    owner = np.repeat(np.arange(len(subpaths)), counts)
+    local = np.arange(len(lines)) - np.repeat(np.cumsum(counts) - counts, counts)
+    segments = points[(first_point[owner] + 3 * local)[:, np.newaxis] + np.arange(4)]
+
+    second_diff = np.maximum(
+        np.linalg.norm(segments[:, 0] - 2 * segments[:, 1] + segments[:, 2], axis=1),
+        np.linalg.norm(segments[:, 1] - 2 * segments[:, 2] + segments[:, 3], axis=1))
+    steps = np.ceil(np.sqrt(0.75 * second_diff / tolerance)).astype(np.int64)
+    steps = np.clip(steps, 1, 1024)
+    steps[lines] = 1
+
+    # Evaluate every segment's samples at once
+    segment = np.repeat(np.arange(len(segments)), steps)
+    first = np.cumsum(steps) - steps
+    t = ((np.arange(len(segment)) - first[segment] + 1) / steps[segment])[:, np.newaxis]
+    s = 1.0 - t
+    p = segments[segment]
+    curve = (s ** 3 * p[:, 0] + 3 * s ** 2 * t * p[:, 1]
+             + 3 * s * t ** 2 * p[:, 2] + t ** 3 * p[:, 3])
+
+    # Each polyline is its start point followed by its segments' samples
+    samples = np.bincount(owner, weights=steps, minlength=len(subpaths)).astype(np.int64)
+    out_start = np.cumsum(samples + 1) - (samples + 1)
+    flat = np.empty((len(curve) + len(subpaths), 2))
+    flat[out_start] = points[first_point]
+    flat[np.delete(np.arange(len(flat)), out_start)] = curve
+
+    return [polyline.copy() for polyline in np.split(flat, out_start[1:])]
+
+
+def _fmt(value, precision):
+    text = f"{value:.{precision}f}".rstrip('0').rstrip('.')
+    return '0' if text in ('', '-0') else text
+
+
+def _path_data(subpath, precision):
+    """SVG path data of one subpath (absolute M, L, C, Z)"""
+    points = subpath.points
+    fmt = lambda p: f"{_fmt(p[0], precision)},{_fmt(p[1], precision)}"
+
+    parts = [f"M{fmt(points[0])}"]
+    for i, is_line in enumerate(subpath.lines):
+        c1, c2, end = points[3 * i + 1:3 * i + 4]
+        if is_line:
+            parts.append(f"L{fmt(end)}")
+        else:
+            parts.append(f"C{fmt(c1)} {fmt(c2)} {fmt(end)}")
+
+    if subpath.closed:
+        parts.append('Z')
+
+    return ' '.join(parts)
+
+
+class _PathScanner:
+    """Tokenizer for path data (handles packed arc flags like '0 01 1')"""
+
+    def __init__(self, text):
+        self.text = text
+        self.pos = 0
+
+    def _skip(self):
+        while self.pos < len(self.text) and self.text[self.pos] in ' \t\r\n,':
+            self.pos += 1
+
+    def at_end(self):
+        self._skip()
+        return self.pos >= len(self.text)
+
+    def command(self):
+        self._skip()
+        if self.pos < len(self.text) and self.text[self.pos] in 'MmZzLlHhVvCcSsQqTtAa':
+            self.pos += 1
+            return self.text[self.pos - 1]
+        return None
+
+    def has_number(self):
+        self._skip()
+        return _NUMBER.match(self.text, self.pos) is not None
+
+    def number(self):
+        self._skip()
+        match = _NUMBER.match(self.text, self.pos)
+        if match is None:
+            raise ValueError(f"Expected a number in path data at position {self.pos}")
+        self.pos = match.end()
+        return float(match.group())
+
+    def point(self):
+        return np.array([self.number(), self.number()])
+
+    def flag(self):
+        self._skip()
+        if self.pos >= len(self.text) or self.text[self.pos] not in '01':
+            raise ValueError(f"Expected an arc flag in path data at position {self.pos}")
+        self.pos += 1
+        return self.text[self.pos - 1] == '1'
+
+
+class _SubpathBuilder:
+    """Accumulates cubic segments into Subpaths"""
+
+    def __init__(self):
+        self.subpaths = []
+        self._points = None
+        self._lines = []
+
+    def move(self, point):
+        self._flush(closed=False)
+        self._points = [np.asarray(point, dtype=np.float64)]
+        self._lines = []
+
+    def line(self, start, end):
+        start, end = np.asarray(start, dtype=np.float64), np.asarray(end, dtype=np.float64)
+        self._require_start()
+        self._points += [start + (end - start) / 3.0, start + 2.0 * (end - start) / 3.0, end]
+        self._lines.append(True)
+
+    def cubic(self, c1, c2, end):
+        self._require_start()
+        self._points += [np.asarray(c1, dtype=np.float64), np.asarray(c2, dtype=np.float64),
+                         np.asarray(end, dtype=np.float64)]
+        self._lines.append(False)
+
+    def close(self, start):
+        if self._points is None:
+            return
+        # An explicit closing line keeps Z a pure flag on the output side
+        if not np.allclose(self._points[-1], start):
+            self.line(self._points[-1], start)
+        self._flush(closed=True)
+        self._points = [np.asarray(start, dtype=np.float64)]
+        self._lines = []
+
+    def finish(self):
+        self._flush(closed=False)
+        return self.subpaths
+
+    def _require_start(self):
+        if self._points is None:
+            raise ValueError("Path data must start with a moveto")
+
+    def _flush(self, closed):
+        if self._points is not None and self._lines:
+            self.subpaths.append(Subpath(points=np.array(self._points),
+                                         lines=np.array(self._lines, dtype=bool),
+                                         closed=closed))
+        self._points = None
+        self._lines = []